@@ -2,11 +2,12 @@
 Airdrop Pipeline - Proses data Twitter, analisis dengan AI, dan simpan ke Supabase
 """
 import os
+import re
 import sys
 import json
 import asyncio
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 
 # Add parent directory to path for imports
@@ -18,29 +19,41 @@ from scraper.twitter_scraper import TwitterScraper
 
 # Import OpenRouter manager for AI processing
 from utils.openrouter_manager import OpenRouterManager
+from utils.model_cascade import ModelCascade
 
-# Import Supabase for database storage
-from supabase import create_client, Client
+# Async Postgrest (Supabase) access, shared connection pool
+from utils.db_manager import DatabaseManager, db_manager
 
 # Config
 from utils.config import (
-    SUPABASE_URL,
-    SUPABASE_KEY,
-    AIRDROP_TABLE,
-    API_CALL_DELAY_SECONDS,
+    AI_ANALYSIS_CONCURRENCY,
+    AI_CASCADE_ENABLED,
+    AI_CASCADE_TIERS,
+    AI_CASCADE_CONFIDENCE_THRESHOLD,
+    AI_CASCADE_HIGH_SCORE,
+    AI_CASCADE_LOW_SCORE,
     PIPELINE_RUN_INTERVAL_MINUTES
 )
 
-# Initialize Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
 class AirdropPipeline:
     """Pipeline for processing Twitter data, analyzing with AI, and storing in Supabase"""
     
-    def __init__(self):
-        """Initialize the pipeline components"""
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        """
+        Initialize the pipeline components
+        
+        Args:
+            db: Database manager to store results with, defaults to the shared instance
+        """
         self.twitter_scraper = TwitterScraper()
+        self.db = db or db_manager
         self.ai_processor = OpenRouterManager()  # Default to using paid models
+        # Cheap model first, the "smart" model only for uncertain tweets
+        self.ai_cascade = ModelCascade(
+            self.ai_processor,
+            AI_CASCADE_TIERS if AI_CASCADE_ENABLED else ["smart"],
+            confidence_threshold=AI_CASCADE_CONFIDENCE_THRESHOLD
+        )
         self.processed_count = 0
         self.start_time = datetime.now()
         print(f"[INISIALISASI] Pipeline Airdrop dimulai pada {self.start_time.isoformat()}")
@@ -68,29 +81,33 @@ class AirdropPipeline:
         top_opportunities = twitter_data.get("top_opportunities", [])
         analyzed_opportunities = []
         
+        # Prepare all prompts first, then analyze them concurrently
+        eligible = []
+        requests = []
         for idx, tweet in enumerate(top_opportunities):
+            tweet_id = tweet.get("id", "unknown")
+            author = tweet.get("author", {}).get("username", "unknown")
+            
+            print(f"[ANALISIS TWEET {idx+1}/{len(top_opportunities)}] Menyiapkan tweet dari @{author} (ID: {tweet_id})")
+            
+            # Skip if tweet is too short or lacks substance
+            if len(tweet.get("text", "")) < 10:
+                print(f"[TWEET DILEWATI] Tweet {idx+1}/{len(top_opportunities)} terlalu pendek untuk dianalisis")
+                continue
+            
+            # Create prompt for AI analysis, sized for the first (smallest) cascade tier
+            eligible.append((idx, tweet))
+            requests.append(self._create_ai_request(tweet, self.ai_cascade.tiers[0]))
+        
+        print(f"[ANALISIS DIMULAI] Mengirimkan {len(requests)} tweet ke model AI untuk analisis mendalam...")
+        def check(index: int, ai_result: Dict) -> Optional[str]:
+            return self._check_against_local_score(eligible[index][1], ai_result)
+        
+        async for item in self.ai_cascade.run_many(requests, self._parse_ai_response, check,
+                                                   concurrency=AI_ANALYSIS_CONCURRENCY):
+            idx, tweet = eligible[item["index"]]
             try:
-                tweet_id = tweet.get("id", "unknown")
-                author = tweet.get("author", {}).get("username", "unknown")
-                
-                print(f"[ANALISIS TWEET {idx+1}/{len(top_opportunities)}] Menganalisis tweet dari @{author} (ID: {tweet_id})")
-                
-                # Prepare tweet data for AI analysis
-                tweet_text = tweet.get("text", "")
-                tweet_url = tweet.get("tweet_url", "")
-                followers = tweet.get("author", {}).get("followers", 0)
-                
-                # Skip if tweet is too short or lacks substance
-                if len(tweet_text) < 10:
-                    print(f"[TWEET DILEWATI] Tweet {idx+1}/{len(top_opportunities)} terlalu pendek untuk dianalisis")
-                    continue
-                
-                # Create prompt for AI analysis
-                prompt = self._create_ai_prompt(tweet)
-                
-                # Process with OpenRouter
-                print(f"[ANALISIS DIMULAI] Mengirimkan tweet ke model AI untuk analisis mendalam...")
-                ai_result = await self._process_with_openrouter(prompt)
+                ai_result = item["result"]
                 
                 if not ai_result:
                     print(f"[ANALISIS GAGAL] Gagal mendapatkan analisis AI untuk tweet {idx+1}/{len(top_opportunities)}")
@@ -113,9 +130,7 @@ class AirdropPipeline:
                 print(f"  - Proyek: {project}")
                 print(f"  - Legitimasi: {legitimacy}")
                 print(f"  - Tingkat Risiko: {risk}")
-                
-                # Add a small delay between API calls to respect rate limits
-                await asyncio.sleep(API_CALL_DELAY_SECONDS)
+                print(f"  - Model: {item['tier']}" + (f" (dinaikkan: {item['escalation_reason']})" if item["escalation_reason"] else ""))
                 
             except Exception as e:
                 print(f"[ERROR] Gagal menganalisis tweet {idx+1}/{len(top_opportunities)}: {str(e)}")
@@ -124,245 +139,207 @@ class AirdropPipeline:
         print(f"[LANGKAH 2/3 SELESAI] Analisis AI selesai. Berhasil menganalisis {len(analyzed_opportunities)}/{len(top_opportunities)} tweets")
         return analyzed_opportunities
     
-    def _create_ai_prompt(self, tweet: Dict) -> str:
-        """Create a prompt for AI analysis based on tweet data"""
-        tweet_text = tweet.get("text", "")
-        tweet_url = tweet.get("tweet_url", "")
+    def _create_ai_request(self, tweet: Dict, model: str) -> Dict[str, Any]:
+        """Create the chat_completion arguments for a tweet from the tweet_analysis template"""
         author = tweet.get("author", {})
-        username = author.get("username", "unknown")
+        username = author.get("username")
         verified = "verified" if author.get("verified") else "unverified"
-        followers = author.get("followers", 0)
+        data = {
+            "text": tweet.get("text"),
+            "author": f"@{username} ({verified} account with {author.get('followers', 0)} followers)" if username else None,
+            "tweet_url": tweet.get("tweet_url")
+        }
+        prompt = self.ai_processor.build_prompt("tweet_analysis", data, model=model)
+        return {
+            "messages": prompt["messages"],
+            "temperature": 0.2,
+            "max_tokens": prompt["max_tokens"],
+            "tag": "tweet_analysis",
+            "cache_prefix": 1,
+            "template": prompt["template_id"]
+        }
+    
+    def _check_against_local_score(self, tweet: Dict, ai_result: Dict) -> Optional[str]:
+        """Return an escalation reason if the AI verdict contradicts the local relevance score"""
+        legitimate = str(ai_result.get("is_legitimate", "")).strip().lower()
+        risk = str(ai_result.get("risk_level", "")).strip().lower()
+        score = tweet.get("score")
         
-        return f"""
-Analyze this cryptocurrency tweet for airdrop or token opportunity:
-
-Tweet: "{tweet_text}"
-Author: @{username} ({verified} account with {followers} followers)
-URL: {tweet_url}
-
-Please provide the following assessment:
-1. Is this a legitimate airdrop or token opportunity? (Yes/No/Maybe)
-2. What cryptocurrency or blockchain is this related to?
-3. What action is required? (e.g., follow account, submit wallet, join community)
-4. Risk level (Low/Medium/High) and explanation
-5. Estimated value or potential (if determinable)
-6. Step-by-step guide for claiming (if applicable)
-
-Format the response as a JSON object with the following structure:
-{{
-  "is_legitimate": "Yes/No/Maybe",
-  "related_crypto": "Blockchain/Token name",
-  "required_action": "Description of required actions",
-  "risk_level": "Low/Medium/High",
-  "risk_explanation": "Brief explanation of risks",
-  "estimated_value": "Description or range if applicable",
-  "claim_steps": ["Step 1", "Step 2", ...],
-  "additional_notes": "Any other relevant information"
-}}
-"""
+        if legitimate == "yes" and risk == "high":
+            return "inconsistent_fields"
+        if score is None:
+            return None
+        if score >= AI_CASCADE_HIGH_SCORE and legitimate == "no":
+            return "score_disagreement"
+        if score <= AI_CASCADE_LOW_SCORE and legitimate == "yes":
+            return "score_disagreement"
+        return None
     
-    async def _process_with_openrouter(self, prompt: str) -> Optional[Dict]:
-        """Process the prompt with OpenRouter"""
-        try:
-            # Create message payload for OpenRouter
-            messages = [
-                {"role": "system", "content": "You are a cryptocurrency expert specializing in identifying legitimate airdrops and token opportunities. Be thorough but concise in your analysis."},
-                {"role": "user", "content": prompt}
-            ]
-            
-            # Use the OpenRouterManager to send the request with the "smart" model
-            response = await self.ai_processor.chat_completion(
-                messages=messages,
-                model="smart",  # Uses the smarter model defined in openrouter_config.py
-                temperature=0.2,
-                max_tokens=1000
-            )
-            
-            if "error" in response:
-                print(f"[ERROR] OpenRouter error: {response.get('error')}")
-                return None
-            
-            # Extract the content from response
-            ai_response = response["choices"][0]["message"]["content"].strip()
-            
-            # Extract and parse JSON response
-            try:
-                # Find JSON content if it's within other text
-                json_start = ai_response.find("{")
-                json_end = ai_response.rfind("}") + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_content = ai_response[json_start:json_end]
-                    return json.loads(json_content)
-                else:
-                    return {"error": "No valid JSON found in response", "raw_response": ai_response}
-            except json.JSONDecodeError:
-                return {"error": "Failed to parse AI response as JSON", "raw_response": ai_response}
-                
-        except Exception as e:
-            print(f"[ERROR] AI processing error: {str(e)}")
+    def _parse_ai_response(self, response: Dict) -> Optional[Dict]:
+        """Extract the JSON analysis from an OpenRouter response"""
+        if not response or "error" in response:
+            print(f"[ERROR] OpenRouter error: {response.get('error') if response else 'Empty response'}")
             return None
+        
+        # Extract the content from response
+        ai_response = response["choices"][0]["message"]["content"].strip()
+        
+        # Extract and parse JSON response
+        try:
+            # Find JSON content if it's within other text
+            json_start = ai_response.find("{")
+            json_end = ai_response.rfind("}") + 1
+            if json_start >= 0 and json_end > json_start:
+                json_content = ai_response[json_start:json_end]
+                return json.loads(json_content)
+            else:
+                return {"error": "No valid JSON found in response", "raw_response": ai_response}
+        except json.JSONDecodeError:
+            return {"error": "Failed to parse AI response as JSON", "raw_response": ai_response}
     
     async def store_in_supabase(self, analyzed_data: List[Dict]) -> bool:
-        """Step 3: Store the analyzed data in Supabase using new relational schema"""
+        """
+        Step 3: Store the analyzed data in Supabase using new relational schema
+        
+        All items are written in bulk through the async database manager: one
+        upsert (plus at most one select) to resolve the projects, then one
+        request per table and batch for twitter_data, ai_analysis and
+        tokenomics, independent of the number of items. No request blocks
+        the event loop.
+        """
         if not analyzed_data:
             print("[PERINGATAN] Tidak ada data yang dianalisis untuk disimpan ke database")
             return False
         
         print(f"[LANGKAH 3/3] Menyimpan {len(analyzed_data)} peluang yang sudah dianalisis ke database...")
-        success_count = 0
+        rows = [self._build_storage_rows(item, idx) for idx, item in enumerate(analyzed_data)]
         
-        # Test Supabase connection
-        try:
-            test_response = supabase.table("projects").select("id").limit(1).execute()
-            print(f"[KONEKSI DATABASE] Berhasil terhubung ke database Supabase.")
-        except Exception as e:
-            print(f"[ERROR DATABASE] Gagal terhubung ke Supabase: {str(e)}")
+        # 1. Resolve or create all projects at once
+        projects = await self.db.bulk_upsert_projects([row["project"] for row in rows])
+        if "error" in projects:
+            print(f"[ERROR DATABASE] Gagal menyimpan proyek: {projects['error']}")
+            return False
+        project_ids = projects["data"]
+        if projects["created"]:
+            print(f"[DATABASE] {projects['created']} proyek baru dibuat")
         
-        for idx, item in enumerate(analyzed_data):
-            try:
-                tweet_text = item.get("text", "No text")
-                tweet_id = item.get("id", f"tweet_{idx}")
-                tweet_url = item.get("tweet_url", "")
-                author = item.get("author", {})
-                author_name = author.get("name", "Unknown")
-                author_username = author.get("username", "Unknown")
-                followers = author.get("followers", 0)
-                verified = author.get("verified", False)
-                ai_analysis = item.get("ai_analysis", {})
-                
-                # Get related crypto from AI analysis
-                related_crypto = ai_analysis.get("related_crypto", "Unknown")
-                is_legitimate = ai_analysis.get("is_legitimate", "Unknown")
-                risk_level = ai_analysis.get("risk_level", "High")
-                
-                print(f"[PENYIMPANAN {idx+1}/{len(analyzed_data)}] Menyimpan data untuk tweet dari @{author_username} tentang {related_crypto}")
-                
-                # 1. First check if project exists based on related_crypto from AI analysis
-                project_query = supabase.table("projects") \
-                    .select("id") \
-                    .eq("project_name", related_crypto) \
-                    .execute()
-                
-                project_id = None
-                
-                # 2. If project doesn't exist, create it
-                if not project_query.data:
-                    print(f"[DATABASE] Membuat proyek baru untuk {related_crypto}")
-                    
-                    # Convert token symbol if identified
-                    token_symbol = related_crypto.upper() if len(related_crypto) <= 5 else None
-                    
-                    # Create project record
-                    project_data = {
-                        "project_name": related_crypto,
-                        "token_symbol": token_symbol,
-                        "description": f"Project discovered via Twitter analysis: {tweet_text[:100]}...",
-                        "twitter_handle": author_username
-                    }
-                    
-                    project_response = supabase.table("projects").insert(project_data).execute()
-                    
-                    if project_response.data:
-                        project_id = project_response.data[0]["id"]
-                        print(f"[DATABASE] Proyek baru berhasil dibuat dengan ID: {project_id}")
-                    else:
-                        print(f"[ERROR DATABASE] Gagal membuat proyek untuk {related_crypto}")
-                        continue
-                else:
-                    project_id = project_query.data[0]["id"]
-                    print(f"[DATABASE] Menggunakan proyek yang sudah ada dengan ID: {project_id}")
-                
-                # 3. Insert Twitter data
-                twitter_data = {
-                    "project_id": project_id,
-                    "tweet_id": tweet_id,
-                    "tweet_text": tweet_text,
-                    "tweet_url": tweet_url,
-                    "author_name": author_name,
-                    "author_username": author_username,
-                    "followers_count": followers,
-                    "verified": verified,
-                    "engagement_score": item.get("score", 0)
-                }
-                
-                # Check if tweet already exists to avoid duplicates
-                existing_tweet = supabase.table("twitter_data") \
-                    .select("id") \
-                    .eq("tweet_id", tweet_id) \
-                    .execute()
-                
-                if not existing_tweet.data:
-                    twitter_response = supabase.table("twitter_data").insert(twitter_data).execute()
-                    
-                    if not twitter_response.data:
-                        print(f"[ERROR DATABASE] Gagal menyimpan data Twitter untuk tweet {idx+1}/{len(analyzed_data)}")
-                    else:
-                        print(f"[DATABASE] Data Twitter berhasil disimpan untuk tweet {idx+1}/{len(analyzed_data)}")
-                else:
-                    print(f"[DATABASE] Tweet {tweet_id} sudah ada dalam database, melewati penyimpanan duplikat")
-                
-                # 4. Insert AI analysis
-                # Convert legitimacy from Yes/No/Maybe to score
-                legitimacy_score = 8 if is_legitimate == "Yes" else (5 if is_legitimate == "Maybe" else 2)
-                # Convert risk from Low/Medium/High to potential score
-                potential_score = 8 if risk_level == "Low" else (5 if risk_level == "Medium" else 3)
-                
-                analysis_data = {
-                    "project_id": project_id,
-                    "legitimacy_score": legitimacy_score,
-                    "potential_score": potential_score,
-                    "revenue_estimate": ai_analysis.get("estimated_value", "Unknown"),
-                    "risk_level": risk_level,
-                    "overall_rating": (legitimacy_score + potential_score) // 2,
-                    "analysis_text": json.dumps(ai_analysis),
-                    "ai_model_used": "OpenRouter"
-                }
-                
-                analysis_response = supabase.table("ai_analysis").insert(analysis_data).execute()
-                
-                if analysis_response.data:
-                    print(f"[DATABASE] Analisis AI berhasil disimpan untuk proyek {project_id}")
-                    success_count += 1
-                    print(f"[PENYIMPANAN BERHASIL] Data tweet {idx+1}/{len(analyzed_data)} berhasil disimpan dan dianalisis secara lengkap")
-                else:
-                    print(f"[ERROR DATABASE] Gagal menyimpan analisis AI untuk proyek {project_id}")
-                
-                # 5. Insert tokenomics data if available
-                if "token_utility" in ai_analysis or "airdrop_percentage" in ai_analysis:
-                    try:
-                        # Extract airdrop percentage if mentioned
-                        airdrop_percent = None
-                        if "airdrop_percentage" in ai_analysis:
-                            airdrop_text = ai_analysis["airdrop_percentage"]
-                            # Try to extract percentage
-                            import re
-                            percentage_match = re.search(r'(\d+(?:\.\d+)?)%', airdrop_text)
-                            if percentage_match:
-                                airdrop_percent = float(percentage_match.group(1))
-                        
-                        tokenomics_data = {
-                            "project_id": project_id,
-                            "airdrop_percentage": airdrop_percent,
-                            "token_type": "Unknown",  # Default values
-                            "blockchain": related_crypto.split()[0] if " " in related_crypto else related_crypto
-                        }
-                        
-                        supabase.table("tokenomics").insert(tokenomics_data).execute()
-                        print(f"[DATABASE] Data tokenomics berhasil disimpan untuk proyek {project_id}")
-                    except Exception as token_error:
-                        print(f"[ERROR DATABASE] Gagal menyimpan data tokenomics: {str(token_error)}")
-                
-            except Exception as e:
-                print(f"[ERROR DATABASE] Gagal menyimpan data untuk item {idx+1}/{len(analyzed_data)}: {str(e)}")
-                continue
+        stored = [row for row in rows if row["project"]["project_name"] in project_ids]
+        for name in {row["project"]["project_name"] for row in rows} - set(project_ids):
+            print(f"[ERROR DATABASE] Gagal membuat proyek untuk {name}")
+        for row in stored:
+            project_id = project_ids[row["project"]["project_name"]]
+            for table in ("twitter_data", "ai_analysis", "tokenomics"):
+                if row[table] is not None:
+                    row[table]["project_id"] = project_id
+        
+        # 2. Twitter data, tweets already stored for the project are skipped
+        tweets = await self.db.bulk_upsert_twitter_data([row["twitter_data"] for row in stored])
+        if "error" in tweets:
+            print(f"[ERROR DATABASE] Gagal menyimpan data Twitter: {tweets['error']}")
+        else:
+            print(f"[DATABASE] {tweets['inserted']} data Twitter baru disimpan, "
+                  f"{tweets['skipped']} sudah ada dalam database")
+        
+        # 3. AI analysis, one row per item
+        success_count = 0
+        analyses = await self.db.bulk_add_ai_analysis([row["ai_analysis"] for row in stored])
+        if "error" in analyses:
+            print(f"[ERROR DATABASE] Gagal menyimpan analisis AI: {analyses['error']}")
+        else:
+            success_count = len(analyses["data"])
+            print(f"[DATABASE] {success_count} analisis AI berhasil disimpan")
+            rankings = await self.db.refresh_project_rankings()
+            if "error" in rankings:
+                print(f"[ERROR DATABASE] Gagal memperbarui peringkat proyek: {rankings['error']}")
+        
+        # 4. Tokenomics, one row per project
+        tokenomics_rows = [row["tokenomics"] for row in stored if row["tokenomics"] is not None]
+        if tokenomics_rows:
+            tokenomics = await self.db.bulk_upsert_tokenomics(tokenomics_rows)
+            if "error" in tokenomics:
+                print(f"[ERROR DATABASE] Gagal menyimpan data tokenomics: {tokenomics['error']}")
+            else:
+                print(f"[DATABASE] Data tokenomics berhasil disimpan untuk {len(tokenomics['data'])} proyek")
         
         print(f"[LANGKAH 3/3 SELESAI] Penyimpanan database selesai. Berhasil menyimpan {success_count}/{len(analyzed_data)} item")
         return success_count > 0
     
+    def _build_storage_rows(self, item: Dict, idx: int) -> Dict[str, Optional[Dict]]:
+        """Build the projects, twitter_data, ai_analysis and tokenomics rows of one item (without project_id)"""
+        tweet_text = item.get("text", "No text")
+        author = item.get("author", {})
+        author_username = author.get("username", "Unknown")
+        ai_analysis = item.get("ai_analysis", {})
+        
+        # Get related crypto from AI analysis
+        related_crypto = ai_analysis.get("related_crypto", "Unknown")
+        is_legitimate = ai_analysis.get("is_legitimate", "Unknown")
+        risk_level = ai_analysis.get("risk_level", "High")
+        
+        project_data = {
+            "project_name": related_crypto,
+            # Convert token symbol if identified
+            "token_symbol": related_crypto.upper() if len(related_crypto) <= 5 else None,
+            "description": f"Project discovered via Twitter analysis: {tweet_text[:100]}...",
+            "twitter_handle": author_username
+        }
+        
+        twitter_data = {
+            "tweet_id": item.get("id", f"tweet_{idx}"),
+            "tweet_text": tweet_text,
+            "tweet_url": item.get("tweet_url", ""),
+            "author_name": author.get("name", "Unknown"),
+            "author_username": author_username,
+            "followers_count": author.get("followers", 0),
+            "verified": author.get("verified", False),
+            "engagement_score": item.get("score", 0)
+        }
+        
+        # Convert legitimacy from Yes/No/Maybe to score
+        legitimacy_score = 8 if is_legitimate == "Yes" else (5 if is_legitimate == "Maybe" else 2)
+        # Convert risk from Low/Medium/High to potential score
+        potential_score = 8 if risk_level == "Low" else (5 if risk_level == "Medium" else 3)
+        
+        analysis_data = {
+            "legitimacy_score": legitimacy_score,
+            "potential_score": potential_score,
+            "revenue_estimate": ai_analysis.get("estimated_value", "Unknown"),
+            "risk_level": risk_level,
+            "overall_rating": (legitimacy_score + potential_score) // 2,
+            "analysis_text": json.dumps(ai_analysis),
+            "ai_model_used": "OpenRouter",
+            # (project_id, analysis_date) is unique, rows of one batch must not share a timestamp
+            "analysis_date": (datetime.now() + timedelta(microseconds=idx)).isoformat()
+        }
+        
+        # Tokenomics data if available
+        tokenomics_data = None
+        if "token_utility" in ai_analysis or "airdrop_percentage" in ai_analysis:
+            # Extract airdrop percentage if mentioned
+            airdrop_percent = None
+            percentage_match = re.search(r'(\d+(?:\.\d+)?)%', str(ai_analysis.get("airdrop_percentage", "")))
+            if percentage_match:
+                airdrop_percent = float(percentage_match.group(1))
+            
+            tokenomics_data = {
+                "airdrop_percentage": airdrop_percent,
+                "token_type": "Unknown",  # Default values
+                "blockchain": related_crypto.split()[0] if " " in related_crypto else related_crypto
+            }
+        
+        return {
+            "project": project_data,
+            "twitter_data": twitter_data,
+            "ai_analysis": analysis_data,
+            "tokenomics": tokenomics_data
+        }
+    
     async def run_pipeline(self, tweets_per_hashtag: int = 10) -> bool:
         """Run the complete pipeline: Twitter -> AI -> Supabase"""
         print(f"[PIPELINE DIMULAI] ===== MEMULAI ANALISIS PELUANG AIRDROP =====")
         self.start_time = datetime.now()
+        # Each run gets its own hedge budget and usage totals
+        self.ai_processor.start_run()
         
         try:
             # Step 1: Scrape Twitter data
@@ -409,12 +386,26 @@ Format the response as a JSON object with the following structure:
             print(f"\n[PIPELINE SELESAI] ===== ANALISIS BERHASIL DISELESAIKAN =====")
             print(f"[RINGKASAN] Pipeline selesai dalam {duration:.2f} detik")
             print(f"[RINGKASAN] {len(analyzed_data)} item diproses dalam sesi ini, total {self.processed_count} item")
+            run_usage = self.ai_processor.get_usage_stats()["run"]["totals"]
+            print(f"[RINGKASAN] Penggunaan AI: {run_usage['requests']} permintaan, "
+                  f"{run_usage['prompt_tokens'] + run_usage['completion_tokens']} token, biaya ${run_usage['cost_usd']:.4f}")
+            prompt_cache = self.ai_processor.get_usage_stats()["prompt_cache"]["run"]
+            print(f"[RINGKASAN] Prompt cache: {prompt_cache['cached_tokens']} token dari cache "
+                  f"({prompt_cache['cached_token_ratio'] * 100:.0f}% dari token prompt)")
+            for tier, tier_stats in self.ai_cascade.get_stats()["tiers"].items():
+                print(f"[RINGKASAN] Model {tier}: {tier_stats['calls']} panggilan ({tier_stats['call_share'] * 100:.0f}%), "
+                      f"rata-rata {tier_stats['avg_latency'] or 0:.2f} detik")
             return True
             
         except Exception as e:
             print(f"[ERROR PIPELINE] Terjadi kesalahan: {str(e)}")
             return False
     
+    async def aclose(self):
+        """Close the connection pools of the AI processor and the database"""
+        await self.ai_processor.aclose()
+        await self.db.aclose()
+    
     async def run_periodic_pipeline(self, interval_minutes: int = PIPELINE_RUN_INTERVAL_MINUTES, max_runs: int = None):
         """Run the pipeline periodically"""
         run_count = 0
@@ -458,7 +449,10 @@ async def test_pipeline():
     """Test the airdrop pipeline with a single run"""
     print("[MODE PENGUJIAN] Menjalankan pipeline dalam mode pengujian (satu kali jalan)")
     pipeline = AirdropPipeline()
-    result = await pipeline.run_pipeline(5)
+    try:
+        result = await pipeline.run_pipeline(5)
+    finally:
+        await pipeline.aclose()
     status = "BERHASIL" if result else "GAGAL"
     print(f"[HASIL PENGUJIAN] Pipeline {status}")
 
@@ -467,7 +461,10 @@ async def run_continuous_pipeline():
     print("[MODE BERKELANJUTAN] Menjalankan pipeline dalam mode berkelanjutan dengan interval waktu tertentu")
     pipeline = AirdropPipeline()
     print(f"[KONFIGURASI] Interval antar siklus: {PIPELINE_RUN_INTERVAL_MINUTES} menit")
-    await pipeline.run_periodic_pipeline(interval_minutes=PIPELINE_RUN_INTERVAL_MINUTES, max_runs=None)
+    try:
+        await pipeline.run_periodic_pipeline(interval_minutes=PIPELINE_RUN_INTERVAL_MINUTES, max_runs=None)
+    finally:
+        await pipeline.aclose()
 
 if __name__ == "__main__":
     try:
@@ -9,15 +9,16 @@ from typing import Dict, List, Optional
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from fastapi import FastAPI, HTTPException, Depends, status, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, status, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
 from scraper.data_processor import DataProcessor
 from utils.db_manager import db_manager
+from utils.supabase_config import PROJECT_DETAIL_TWEET_LIMIT, PROJECT_DETAIL_MARKET_LIMIT
 
 # Import OpenRouter endpoints
-from .openrouter_endpoints import router as openrouter_router
+from .openrouter_endpoints import router as openrouter_router, openrouter_manager
 
 # Create FastAPI app
 app = FastAPI(
@@ -38,6 +39,27 @@ app.add_middleware(
 # Include OpenRouter endpoints
 app.include_router(openrouter_router)
 
+# Background refresh of popular cached analyses
+cache_refresher_task: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def start_cache_refresher():
+    """Start re-analyzing popular cache entries before they expire"""
+    global cache_refresher_task
+    cache_refresher_task = asyncio.create_task(openrouter_manager.run_cache_refresher())
+
+@app.on_event("shutdown")
+async def stop_cache_refresher():
+    """Stop the cache refresher, flush buffered writes and close the OpenRouter and database connection pools"""
+    if cache_refresher_task is not None:
+        cache_refresher_task.cancel()
+        try:
+            await cache_refresher_task
+        except asyncio.CancelledError:
+            pass
+    await openrouter_manager.aclose()
+    await db_manager.aclose()
+
 # Models
 class ProjectBase(BaseModel):
     project_name: str
@@ -72,7 +94,8 @@ async def health_check():
     db_connected = db_manager.is_connected()
     return {
         "status": "healthy" if db_connected else "degraded",
-        "database": "connected" if db_connected else "disconnected"
+        "database": "connected" if db_connected else "disconnected",
+        "project_cache": db_manager.get_project_cache_stats()
     }
 
 @app.post("/projects/", response_model=dict)
@@ -95,9 +118,12 @@ async def create_project(project: ProjectBase):
     return result
 
 @app.get("/projects/latest", response_model=dict)
-async def get_latest_projects(limit: int = 10):
+async def get_latest_projects(
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page")
+):
     """Get latest projects"""
-    result = await db_manager.get_latest_projects(limit=limit)
+    result = await db_manager.get_latest_projects(limit=limit, cursor=cursor)
     
     if "error" in result:
         raise HTTPException(
@@ -105,12 +131,21 @@ async def get_latest_projects(limit: int = 10):
             detail=result["error"]
         )
     
+    if result.get("status") == "invalid_cursor":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    
     return result
 
 @app.get("/projects/top", response_model=dict)
-async def get_top_projects(limit: int = 10):
+async def get_top_projects(
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page")
+):
     """Get top rated projects"""
-    result = await db_manager.get_top_rated_projects(limit=limit)
+    result = await db_manager.get_top_rated_projects(limit=limit, cursor=cursor)
     
     if "error" in result:
         raise HTTPException(
@@ -118,12 +153,22 @@ async def get_top_projects(limit: int = 10):
             detail=result["error"]
         )
     
+    if result.get("status") == "invalid_cursor":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    
     return result
 
 @app.get("/projects/{project_id}", response_model=dict)
-async def get_project(project_id: int):
-    """Get project details"""
-    result = await db_manager.get_project_with_details(project_id)
+async def get_project(
+    project_id: int,
+    tweet_limit: int = Query(PROJECT_DETAIL_TWEET_LIMIT, ge=0, le=500),
+    market_limit: int = Query(PROJECT_DETAIL_MARKET_LIMIT, ge=0, le=1000)
+):
+    """Get project details with the latest analysis and the most recent tweets and market data"""
+    result = await db_manager.get_project_with_details(project_id, tweet_limit, market_limit)
     
     if "error" in result:
         raise HTTPException(
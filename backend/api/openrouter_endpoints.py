@@ -21,6 +21,9 @@ from utils.openrouter_config import (
     OPENROUTER_MODELS
 )
 from utils.openrouter_manager import OpenRouterManager
+from utils.cache_warmup import warm_analysis_cache
+from utils.db_manager import db_manager
+from utils.config import CACHE_WARMUP_CONCURRENCY, CACHE_WARMUP_TOKEN_BUDGET
 
 # Setup security
 security = HTTPBearer()
@@ -94,6 +97,23 @@ async def reset_keys(token: str = Depends(verify_admin_token)):
     result = openrouter_manager.reset_api_keys()
     return result
 
+# Endpoint to inspect rate limit state and other runtime metrics
+@router.get("/metrics", summary="Get OpenRouter runtime metrics")
+async def get_metrics(token: str = Depends(verify_admin_token)):
+    """
+    Get active key cooldowns, per-key/per-model rate limit buckets, model health,
+    hedging and request coalescing counters, token/cost usage against the budgets
+    and the learned output limits of the prompt templates
+    """
+    return {
+        "rate_limits": openrouter_manager.get_rate_limit_status(),
+        "model_health": openrouter_manager.get_model_health(),
+        "hedging": openrouter_manager.get_hedge_stats(),
+        "coalescing": openrouter_manager.get_coalescing_stats(),
+        "usage": openrouter_manager.get_usage_stats(),
+        "prompts": openrouter_manager.get_prompt_stats()
+    }
+
 # Endpoint to get available models
 @router.get("/models", summary="Get available OpenRouter models")
 async def get_models():
@@ -120,6 +140,75 @@ async def set_model_preference(
     result = openrouter_manager.set_prefer_free(prefer_free)
     return result
 
+# Cache management endpoints
+@router.get("/cache", summary="Get cache statistics")
+async def get_cache_stats(token: str = Depends(verify_admin_token)):
+    """
+    Get statistics about the analysis cache
+    """
+    stats = openrouter_manager.get_cache_stats()
+    return {"status": "success", "stats": stats}
+
+@router.post("/cache/clear", summary="Clear expired cache entries")
+async def clear_cache(token: str = Depends(verify_admin_token)):
+    """
+    Clear expired entries from the analysis cache
+    """
+    result = openrouter_manager.clear_cache()
+    return result
+
+@router.post("/cache/warmup", summary="Warm the analysis cache")
+async def warmup_cache(
+    concurrency: int = Query(CACHE_WARMUP_CONCURRENCY, ge=1, le=10, description="Analyses running at once"),
+    token_budget: int = Query(CACHE_WARMUP_TOKEN_BUDGET, ge=0, description="Maximum tokens spent by this run"),
+    token: str = Depends(verify_admin_token)
+):
+    """
+    Analyze recently discovered, top rated and watchlisted projects that are
+    not cached yet and report which were warmed and which were skipped
+    """
+    report = await warm_analysis_cache(openrouter_manager, db_manager,
+                                       concurrency=concurrency, token_budget=token_budget)
+    return {"status": "success", "report": report}
+
+@router.post("/cache/invalidate", summary="Invalidate a cache namespace")
+async def invalidate_cache_namespace(
+    namespace: Optional[str] = Body(None, embed=True),
+    token: str = Depends(verify_admin_token)
+):
+    """
+    Invalidate all cached analyses of a namespace (model and prompt template),
+    by default the one currently used for project analyses
+    """
+    result = openrouter_manager.invalidate_cache_namespace(namespace)
+    return result
+
+# Endpoint to analyze a project without using cache
+@router.post("/analyze/fresh", summary="Analyze a crypto project without using cache")
+async def analyze_project_fresh(
+    project_data: Dict[str, Any] = Body(...),
+    model: Optional[str] = None,
+    token: str = Depends(verify_admin_token)
+):
+    """
+    Generate fresh AI analysis for a crypto project bypassing the cache
+    
+    This endpoint requires admin authentication as it forces a new API call
+    """
+    try:
+        # Force fresh analysis by setting use_cache=False
+        # The model preference applies to this request only, never to the shared manager
+        prefer_free = model.startswith("free-") if model else None
+        result = await openrouter_manager.generate_project_analysis(project_data, use_cache=False,
+                                                                    prefer_free=prefer_free)
+
+        return result
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Fresh analysis failed: {str(e)}"
+        )
+
 # Endpoint to test OpenRouter integration with a simple analysis
 @router.post("/test", summary="Test OpenRouter integration")
 async def test_openrouter(
@@ -150,7 +239,8 @@ async def test_openrouter(
 @router.post("/analyze", summary="Analyze a crypto project")
 async def analyze_project(
     project_data: Dict[str, Any] = Body(...),
-    model: Optional[str] = None
+    model: Optional[str] = None,
+    use_cache: bool = Query(True, description="Whether to use cached results if available")
 ):
     """
     Generate AI analysis for a crypto project
@@ -158,15 +248,11 @@ async def analyze_project(
     This endpoint does not require admin authentication as it's used by regular users
     """
     try:
-        # If a specific model is requested and not using default manager setting
-        if model:
-            original_prefer_free = openrouter_manager.prefer_free
-            openrouter_manager.prefer_free = model.startswith("free-")
-            result = await openrouter_manager.generate_project_analysis(project_data)
-            openrouter_manager.prefer_free = original_prefer_free
-        else:
-            result = await openrouter_manager.generate_project_analysis(project_data)
-            
+        # The model preference applies to this request only, never to the shared manager
+        prefer_free = model.startswith("free-") if model else None
+        result = await openrouter_manager.generate_project_analysis(project_data, use_cache=use_cache,
+                                                                    prefer_free=prefer_free)
+
         return result
     except Exception as e:
         raise HTTPException(
@@ -0,0 +1,116 @@
+"""
+Offline benchmark of the AI analysis path against the local mock LLM server
+
+Runs AirdropPipeline.analyze_with_ai on synthetic tweets with throwaway API
+keys, so throughput and fallback behavior can be measured without network
+access or credits.
+
+Usage:
+    python benchmark_analysis.py --tweets 50 --latency lognormal:0.8,0.6 --rate-429 0.05 --rate-402 0.05
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+# Add parent directory to path for imports
+parent_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, parent_dir)
+
+from utils.mock_llm_server import MockLLMServer
+
+
+def make_tweets(count: int, seed: int) -> list:
+    """Create synthetic tweets shaped like the scraper output"""
+    rng = random.Random(seed)
+    texts = [
+        "Huge $SOL airdrop is live, claim your free tokens before the snapshot",
+        "New L2 announces retroactive airdrop for early bridge users",
+        "Send 0.1 ETH to receive 1 ETH back, airdrop ends today!",
+        "Connect wallet to claim your free NFT airdrop now",
+        "BTC price is pumping again, what a week for crypto",
+    ]
+    tweets = []
+    for i in range(count):
+        tweets.append({
+            "id": str(10_000 + i),
+            "text": f"{rng.choice(texts)} #{i}",
+            "tweet_url": f"https://twitter.com/user{i}/status/{10_000 + i}",
+            "author": {
+                "username": f"user{i}",
+                "verified": rng.random() < 0.2,
+                "followers": rng.randint(10, 200_000)
+            },
+            "score": rng.randint(0, 100)
+        })
+    return tweets
+
+
+async def run_benchmark(args) -> dict:
+    # Imported here so the environment below is in place before the config loads
+    from utils.openrouter_config import add_api_key
+    from airdrop_pipeline import AirdropPipeline
+
+    for i in range(args.keys):
+        add_api_key(f"sk-or-mock-{i:04d}-benchmark-key")
+
+    pipeline = AirdropPipeline()
+    pipeline.ai_processor.start_run()
+    tweets = make_tweets(args.tweets, args.seed)
+
+    started = time.monotonic()
+    analyzed = await pipeline.analyze_with_ai({"top_opportunities": tweets})
+    elapsed = time.monotonic() - started
+    await pipeline.ai_processor.aclose()
+
+    return {
+        "tweets": len(tweets),
+        "analyzed": len(analyzed),
+        "seconds": round(elapsed, 2),
+        "tweets_per_second": round(len(analyzed) / elapsed, 2) if elapsed else None,
+        "cascade": pipeline.ai_cascade.get_stats(),
+        "usage": pipeline.ai_processor.get_usage_stats()["run"]["totals"],
+        "prompt_cache": pipeline.ai_processor.get_usage_stats()["prompt_cache"]["run"],
+        "model_health": pipeline.ai_processor.get_model_health(),
+        "rate_limits": {k: v for k, v in pipeline.ai_processor.get_rate_limit_status().items()
+                        if k not in ("cooldowns", "buckets")}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the AI analysis path offline")
+    parser.add_argument("--tweets", type=int, default=40)
+    parser.add_argument("--keys", type=int, default=3)
+    parser.add_argument("--latency", default="lognormal:0.5,0.5")
+    parser.add_argument("--rate-429", type=float, default=0.05)
+    parser.add_argument("--rate-402", type=float, default=0.0)
+    parser.add_argument("--rate-500", type=float, default=0.02)
+    parser.add_argument("--rate-malformed", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="airdrop-benchmark-")
+    server = MockLLMServer(latency=args.latency, rate_429=args.rate_429, rate_402=args.rate_402,
+                           rate_500=args.rate_500, rate_malformed=args.rate_malformed,
+                           seed=args.seed).start()
+    # Throwaway keys and usage file, requests go to the mock server
+    os.environ["OPENROUTER_API_BASE"] = server.url
+    os.environ["OPENROUTER_KEYS_FILE"] = os.path.join(workdir, "keys.json")
+    os.environ["OPENROUTER_USAGE_FILE"] = os.path.join(workdir, "usage.json")
+
+    try:
+        result = asyncio.run(run_benchmark(args))
+    finally:
+        server.stop()
+
+    result["server"] = server.stats
+    print("\n===== BENCHMARK RESULT =====")
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+-- Skema SQLite untuk menjalankan aplikasi tanpa Supabase (lokal/offline)
+-- Padanan dari database/schema.sql, dibuat otomatis oleh utils/sqlite_client.py
+-- Kolom JSONB disimpan sebagai teks bertipe JSON, BOOLEAN sebagai 0/1,
+-- TIMESTAMPTZ sebagai teks ISO 8601 supaya urutan teks sama dengan urutan waktu
+
+PRAGMA foreign_keys = ON;
+
+-- Tabel untuk menyimpan data proyek cryptocurrency
+CREATE TABLE IF NOT EXISTS projects (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  project_name TEXT NOT NULL,
+  token_symbol TEXT,
+  description TEXT,
+  website_url TEXT,
+  twitter_handle TEXT,
+  discovery_date TIMESTAMPTZ DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+  last_updated TIMESTAMPTZ DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+  CONSTRAINT unique_project_name UNIQUE (project_name)
+);
+
+CREATE INDEX IF NOT EXISTS idx_projects_discovery ON projects (discovery_date DESC, id DESC);
+
+-- Tabel untuk menyimpan data dari Twitter
+CREATE TABLE IF NOT EXISTS twitter_data (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  project_id INTEGER REFERENCES projects(id),
+  tweet_id TEXT NOT NULL,
+  tweet_text TEXT NOT NULL,
+  tweet_url TEXT,
+  author_name TEXT,
+  author_username TEXT,
+  followers_count INTEGER,
+  verified BOOLEAN,
+  engagement_score FLOAT,
+  collected_at TIMESTAMPTZ DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+  CONSTRAINT unique_tweet_per_project UNIQUE (project_id, tweet_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_twitter_project_id ON twitter_data (project_id);
+
+-- Tabel untuk menyimpan hasil analisis dari AI
+CREATE TABLE IF NOT EXISTS ai_analysis (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  project_id INTEGER REFERENCES projects(id),
+  legitimacy_score INTEGER CHECK (legitimacy_score BETWEEN 1 AND 10),
+  potential_score INTEGER CHECK (potential_score BETWEEN 1 AND 10),
+  revenue_estimate TEXT,
+  risk_level TEXT,
+  overall_rating INTEGER CHECK (overall_rating BETWEEN 1 AND 10),
+  supporting_entities JSON,
+  analysis_text TEXT,
+  ai_model_used TEXT,
+  analysis_date TIMESTAMPTZ DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+  CONSTRAINT unique_analysis_per_project UNIQUE (project_id, analysis_date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ai_project_id ON ai_analysis (project_id);
+CREATE INDEX IF NOT EXISTS idx_ai_rating ON ai_analysis (overall_rating DESC);
+
+-- Tabel untuk menyimpan data tokenomics dari proyek
+CREATE TABLE IF NOT EXISTS tokenomics (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  project_id INTEGER REFERENCES projects(id),
+  total_supply NUMERIC,
+  circulating_supply NUMERIC,
+  airdrop_percentage NUMERIC,
+  team_allocation_percentage NUMERIC,
+  vesting_details JSON,
+  token_type TEXT,
+  blockchain TEXT,
+  updated_at TIMESTAMPTZ DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+  CONSTRAINT unique_tokenomics_per_project UNIQUE (project_id)
+);
+
+-- Tabel untuk menyimpan data market yang dapat diupdate secara berkala
+CREATE TABLE IF NOT EXISTS market_data (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  project_id INTEGER REFERENCES projects(id),
+  price_usd NUMERIC,
+  market_cap NUMERIC,
+  volume_24h NUMERIC,
+  price_change_24h NUMERIC,
+  exchanges JSON,
+  data_source TEXT,
+  timestamp TIMESTAMPTZ DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_market_project_id ON market_data (project_id);
+
+-- Tabel watchlist pengguna (tanpa RLS, user_id disimpan sebagai teks)
+CREATE TABLE IF NOT EXISTS user_watchlist (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  user_id TEXT NOT NULL,
+  project_id INTEGER REFERENCES projects(id),
+  notes TEXT,
+  created_at TIMESTAMPTZ DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+  CONSTRAINT unique_user_project_watchlist UNIQUE (user_id, project_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_watchlist_user_id ON user_watchlist (user_id);
+CREATE INDEX IF NOT EXISTS idx_watchlist_project_id ON user_watchlist (project_id);
+
+-- Peringkat proyek berdasarkan analisis AI terbaru yang memiliki rating.
+-- SQLite tidak punya materialized view, jadi view ini selalu terkini dan
+-- refresh_project_rankings() tidak melakukan apa-apa
+CREATE VIEW IF NOT EXISTS project_rankings AS
+SELECT
+  p.id,
+  p.project_name,
+  p.token_symbol,
+  a.overall_rating,
+  a.analysis_date
+FROM ai_analysis a
+JOIN projects p ON p.id = a.project_id
+WHERE a.overall_rating IS NOT NULL
+  AND a.analysis_date = (
+    SELECT MAX(latest.analysis_date) FROM ai_analysis latest
+    WHERE latest.project_id = a.project_id AND latest.overall_rating IS NOT NULL
+  );
+
+-- Trigger untuk mengupdate project.last_updated saat ada perubahan data terkait
+CREATE TRIGGER IF NOT EXISTS update_project_last_updated_on_twitter_data_insert
+AFTER INSERT ON twitter_data
+BEGIN
+  UPDATE projects SET last_updated = strftime('%Y-%m-%dT%H:%M:%f', 'now') WHERE id = NEW.project_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS update_project_last_updated_on_twitter_data_update
+AFTER UPDATE ON twitter_data
+BEGIN
+  UPDATE projects SET last_updated = strftime('%Y-%m-%dT%H:%M:%f', 'now') WHERE id = NEW.project_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS update_project_last_updated_on_ai_analysis_insert
+AFTER INSERT ON ai_analysis
+BEGIN
+  UPDATE projects SET last_updated = strftime('%Y-%m-%dT%H:%M:%f', 'now') WHERE id = NEW.project_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS update_project_last_updated_on_ai_analysis_update
+AFTER UPDATE ON ai_analysis
+BEGIN
+  UPDATE projects SET last_updated = strftime('%Y-%m-%dT%H:%M:%f', 'now') WHERE id = NEW.project_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS update_project_last_updated_on_tokenomics_insert
+AFTER INSERT ON tokenomics
+BEGIN
+  UPDATE projects SET last_updated = strftime('%Y-%m-%dT%H:%M:%f', 'now') WHERE id = NEW.project_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS update_project_last_updated_on_tokenomics_update
+AFTER UPDATE ON tokenomics
+BEGIN
+  UPDATE projects SET last_updated = strftime('%Y-%m-%dT%H:%M:%f', 'now') WHERE id = NEW.project_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS update_project_last_updated_on_market_data_insert
+AFTER INSERT ON market_data
+BEGIN
+  UPDATE projects SET last_updated = strftime('%Y-%m-%dT%H:%M:%f', 'now') WHERE id = NEW.project_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS update_project_last_updated_on_market_data_update
+AFTER UPDATE ON market_data
+BEGIN
+  UPDATE projects SET last_updated = strftime('%Y-%m-%dT%H:%M:%f', 'now') WHERE id = NEW.project_id;
+END;
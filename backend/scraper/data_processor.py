@@ -16,6 +16,7 @@ sys.path.insert(0, parent_dir)
 
 from scraper.twitter_scraper import TwitterScraper
 from utils.db_manager import db_manager
+from utils.supabase_config import TABLE_TWITTER_DATA, TABLE_AI_ANALYSIS
 from utils.twitter_config import TWITTER_USERNAME, TWITTER_PASSWORD, TWITTER_EMAIL
 
 class DataProcessor:
@@ -167,14 +168,11 @@ class DataProcessor:
                 project_id = project_result['data']['id']
                 print(f"[DEBUG] Project saved with ID: {project_id}")
                 
-                # Save tweet data
-                print(f"[DEBUG] Saving tweet data for project ID: {project_id}")
-                tweet_result = await db_manager.add_twitter_data(project_id, airdrop)
-                
-                print(f"[DEBUG] Tweet data save result: {tweet_result}")
-                
-                if 'error' in tweet_result:
-                    print(f"[DEBUG] Error saving tweet for {project_name}: {tweet_result['error']}")
+                # Queue tweet data, written in batches by the write-behind buffer
+                print(f"[DEBUG] Queueing tweet data for project ID: {project_id}")
+                await db_manager.write_buffer.put(
+                    TABLE_TWITTER_DATA, db_manager.twitter_data_row(project_id, airdrop)
+                )
                 
                 # Create basic AI analysis based on airdrop_score
                 if 'airdrop_score' in airdrop:
@@ -197,12 +195,9 @@ class DataProcessor:
                     }
                     
                     print(f"[DEBUG] AI analysis data: {analysis}")
-                    ai_result = await db_manager.add_ai_analysis(project_id, analysis)
-                    
-                    print(f"[DEBUG] AI analysis save result: {ai_result}")
-                    
-                    if 'error' in ai_result:
-                        print(f"[DEBUG] Error saving AI analysis for {project_name}: {ai_result['error']}")
+                    await db_manager.write_buffer.put(
+                        TABLE_AI_ANALYSIS, db_manager.ai_analysis_row(project_id, analysis)
+                    )
                 
                 # Add to results
                 results.append({
@@ -314,6 +309,10 @@ class DataProcessor:
         trending = await self.process_trending_projects(limit=trending_limit)
         print(f"[DEBUG] Processed {len(trending)} trending projects")
         
+        # Write the tweets and analyses still queued
+        await db_manager.write_buffer.flush()
+        print(f"[DEBUG] Write buffer stats: {db_manager.write_buffer.get_stats()}")
+        
         print("[DEBUG] ======== DATA PROCESSOR COMPLETE ========")
         return {
             "airdrops": airdrops,
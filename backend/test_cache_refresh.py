@@ -0,0 +1,65 @@
+"""
+Test which analysis cache entries the proactive refresher picks up
+
+An entry qualifies once it was read REFRESH_MIN_HITS times and expires soon.
+Refreshing it restarts that count, so an entry nobody reads any more drops
+out of the candidates instead of being re-analyzed at every expiry.
+
+Usage:
+    python test_cache_refresh.py
+"""
+import os
+import sys
+import time
+import tempfile
+
+# Ensure we can import from the backend
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from utils import cache_manager
+from utils.cache_manager import AnalysisCache, REFRESH_MIN_HITS
+
+# Keep the test entries out of data/cache
+cache_manager.CACHE_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="cache-refresh-test-"), "cache.db")
+
+NAMESPACE = "project_analysis:v1@test/model"
+PROJECT = {"project_name": "Refresh Test", "token_symbol": "RFT"}
+
+
+def expire_soon() -> None:
+    """Move the entry into the refresh window"""
+    with AnalysisCache._lock:
+        AnalysisCache._connection().execute(
+            "UPDATE analysis_cache SET expires_at = ? WHERE namespace = ?", (time.time() + 60, NAMESPACE)
+        )
+
+
+def read(times: int) -> None:
+    for _ in range(times):
+        assert AnalysisCache.get_cached_entry(PROJECT, namespace=NAMESPACE) is not None
+
+
+def candidate_names() -> list:
+    return [c["project_data"]["project_name"] for c in AnalysisCache.get_refresh_candidates(namespace=NAMESPACE)]
+
+
+def test_unread_entry_drops_out_of_refresh_candidates():
+    AnalysisCache.cache_analysis(PROJECT, {"overall_rating": 7}, namespace=NAMESPACE)
+    read(REFRESH_MIN_HITS)
+    expire_soon()
+    assert candidate_names() == ["Refresh Test"]
+
+    # The refresher rewrites the entry; nobody reads it afterwards
+    AnalysisCache.cache_analysis(PROJECT, {"overall_rating": 8}, namespace=NAMESPACE)
+    expire_soon()
+    assert candidate_names() == []
+
+    # Popular again after enough new reads
+    read(REFRESH_MIN_HITS)
+    assert candidate_names() == ["Refresh Test"]
+
+
+if __name__ == "__main__":
+    test_unread_entry_drops_out_of_refresh_candidates()
+    print("Refresh candidates only include entries read since their last refresh")
@@ -0,0 +1,92 @@
+"""
+Test that warmed analysis cache entries are hit by the analyze endpoints
+
+The warm-up reads full project rows (id, timestamps and all) from the
+database, and /analyze receives the same rows from the project endpoints.
+Both must map to the same cache key, otherwise the warm-up pays for
+analyses that no request ever reads.
+
+Usage:
+    python test_cache_warmup.py
+"""
+import os
+import sys
+import json
+import asyncio
+import tempfile
+
+# Ensure we can import from the backend
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+# Keep the key, usage and cache files out of data/
+workdir = tempfile.mkdtemp(prefix="cache-warmup-test-")
+os.environ["OPENROUTER_KEYS_FILE"] = os.path.join(workdir, "keys.json")
+os.environ["OPENROUTER_USAGE_FILE"] = os.path.join(workdir, "usage.json")
+
+from utils import cache_manager
+from utils.cache_warmup import warm_analysis_cache
+from utils.openrouter_manager import OpenRouterManager
+
+cache_manager.CACHE_DB_PATH = os.path.join(workdir, "cache.db")
+
+# A projects row as returned by select("*")
+PROJECT_ROW = {
+    "id": 42,
+    "project_name": "Warm Test",
+    "token_symbol": "WRM",
+    "description": "A project warmed ahead of the first page view",
+    "website_url": "https://warm.example",
+    "twitter_handle": "warmtest",
+    "discovery_date": "2024-01-01T00:00:00+00:00",
+    "last_updated": "2024-01-02T00:00:00+00:00"
+}
+
+
+class FakeDatabase:
+    """Project listings of DatabaseManager with a single project"""
+
+    async def get_watchlisted_projects(self, limit=50):
+        return {"status": "success", "data": [dict(PROJECT_ROW)]}
+
+    async def get_latest_projects(self, limit=10, cursor=None):
+        return {"status": "success", "data": [dict(PROJECT_ROW)], "next_cursor": None}
+
+    async def get_top_rated_projects(self, limit=10, cursor=None):
+        return {"status": "success", "data": [], "next_cursor": None}
+
+    async def get_projects_by_ids(self, project_ids):
+        return {"status": "success", "data": []}
+
+
+async def run_warmup():
+    manager = OpenRouterManager()
+    calls = []
+
+    async def chat_completion(messages, **kwargs):
+        calls.append(messages)
+        content = json.dumps({"legitimacy_score": 7, "recommendation": "watch"})
+        return {"choices": [{"message": {"content": content}}], "usage": {"total_tokens": 100}}
+
+    manager.chat_completion = chat_completion
+    try:
+        report = await warm_analysis_cache(manager, FakeDatabase(), token_budget=None)
+        # What /analyze does with a row from the project endpoints
+        result = await manager.generate_project_analysis(dict(PROJECT_ROW))
+        return report, result, len(calls)
+    finally:
+        await manager.aclose()
+
+
+def test_warmed_entry_is_hit_by_full_project_row():
+    report, result, calls = asyncio.run(run_warmup())
+
+    assert report["warmed"] == 1, report
+    assert result["success"] and result["source"] == "cache", result
+    # Only the warm-up reached the model
+    assert calls == 1
+
+
+if __name__ == "__main__":
+    test_warmed_entry_is_hit_by_full_project_row()
+    print("Warmed entries are hit by requests with full project rows")
@@ -0,0 +1,78 @@
+"""
+Test keyset pagination of the project listings with NULL sort keys
+
+Runs get_latest_projects and get_top_rated_projects against the SQLite
+backend with rows whose discovery_date or analysis_date is NULL. A cursor
+cannot point after a NULL value, so such rows must never end up as a page
+boundary: every page has to load and the listing has to end normally.
+
+Usage:
+    python test_keyset_pagination.py
+"""
+import os
+import sys
+import asyncio
+import tempfile
+
+# Ensure we can import from the backend
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from utils.db_manager import DatabaseManager
+
+PAGE_SIZE = 1
+
+
+async def collect_pages(fetch) -> list:
+    """Follow next_cursor until the last page, failing on any error page"""
+    rows, cursor = [], None
+    while True:
+        page = await fetch(limit=PAGE_SIZE, cursor=cursor)
+        assert page.get("status") == "success", f"Page after cursor {cursor} failed: {page}"
+        rows.extend(page["data"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return rows
+
+
+async def run_listings():
+    """Seed projects and analyses with NULL sort keys and page through both listings"""
+    path = os.path.join(tempfile.mkdtemp(prefix="keyset-pagination-test-"), "test.db")
+    db = DatabaseManager(backend="sqlite", sqlite_path=path)
+    try:
+        projects = await db.client.table("projects").insert([
+            {"project_name": "Alpha", "discovery_date": "2024-01-03T00:00:00"},
+            {"project_name": "Beta", "discovery_date": None},
+            {"project_name": "Gamma", "discovery_date": "2024-01-01T00:00:00"},
+        ]).execute()
+        ids = {row["project_name"]: row["id"] for row in projects.data}
+
+        await db.client.table("ai_analysis").insert([
+            {"project_id": ids["Alpha"], "overall_rating": 7, "analysis_date": "2024-02-01T00:00:00"},
+            # Undated analysis next to a dated one, and a project with only an undated one
+            {"project_id": ids["Beta"], "overall_rating": 9, "analysis_date": None},
+            {"project_id": ids["Beta"], "overall_rating": 6, "analysis_date": "2024-02-02T00:00:00"},
+            {"project_id": ids["Gamma"], "overall_rating": 8, "analysis_date": None},
+        ]).execute()
+
+        latest = await collect_pages(db.get_latest_projects)
+        top = await collect_pages(db.get_top_rated_projects)
+        return latest, top
+    finally:
+        await db.aclose()
+
+
+def test_null_sort_keys_do_not_break_pagination():
+    latest, top = asyncio.run(run_listings())
+
+    print(f"Latest projects: {[row['project_name'] for row in latest]}")
+    print(f"Top rated projects: {[(row['project_name'], row['overall_rating']) for row in top]}")
+
+    assert [row["project_name"] for row in latest] == ["Alpha", "Gamma"]
+    # Rankings use the latest dated analysis only
+    assert [(row["project_name"], row["overall_rating"]) for row in top] == [("Alpha", 7), ("Beta", 6)]
+
+
+if __name__ == "__main__":
+    test_null_sort_keys_do_not_break_pagination()
+    print("Keyset pagination with NULL sort keys works")
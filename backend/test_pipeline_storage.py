@@ -0,0 +1,173 @@
+"""
+Test that storing pipeline results never blocks the event loop
+
+Runs AirdropPipeline.store_in_supabase against a local Postgrest stand-in
+that answers every request after a delay, while a ticker measures how late
+the event loop wakes up. With synchronous database calls the ticker stalls
+for the whole round trip; with the async client it stays on time.
+
+Usage:
+    python test_pipeline_storage.py
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# Ensure we can import from the backend
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+# The pipeline builds an OpenRouterManager, keep its key and usage files out of data/
+workdir = tempfile.mkdtemp(prefix="pipeline-storage-test-")
+os.environ["OPENROUTER_KEYS_FILE"] = os.path.join(workdir, "keys.json")
+os.environ["OPENROUTER_USAGE_FILE"] = os.path.join(workdir, "usage.json")
+
+from utils.db_manager import DatabaseManager
+
+REQUEST_DELAY_SECONDS = 0.3  # Latency of every database round trip
+MAX_LOOP_LAG_SECONDS = 0.1   # Longest acceptable event loop stall
+TICK_SECONDS = 0.01
+
+
+class FakePostgrest:
+    """Minimal Postgrest stand-in for the tables written by the pipeline"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.tables = {"projects": [], "twitter_data": [], "ai_analysis": [], "tokenomics": []}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def handle(self, method: str, path: str, body):
+        parsed = urlparse(path)
+        table = parsed.path.rsplit("/", 1)[-1]
+        query = parse_qs(parsed.query)
+        rows = self.tables.setdefault(table, [])
+        with self._lock:
+            self.requests += 1
+            if method == "GET":
+                # Only the "in" filter on project_name is used
+                names = query.get("project_name", ["in.()"])[0][4:-1].split(",")
+                return [row for row in rows if row.get("project_name") in names]
+            inserted = []
+            conflict = query.get("on_conflict", [""])[0].split(",")
+            for row in body if isinstance(body, list) else [body]:
+                if conflict != [""] and any(all(r.get(c) == row.get(c) for c in conflict) for r in rows):
+                    continue
+                row = {**row, "id": len(rows) + 1}
+                rows.append(row)
+                inserted.append(row)
+            return inserted
+
+    def start(self) -> str:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _respond(self, method: str):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                time.sleep(fake.delay)
+                data = json.dumps(fake.handle(method, self.path, body)).encode("utf-8")
+                self.send_response(200 if method == "GET" else 201)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._respond("GET")
+
+            def do_POST(self):
+                self._respond("POST")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def make_items(count: int):
+    """Analyzed tweets shaped like the output of analyze_with_ai"""
+    projects = ["Solana", "Arbitrum", "LayerZero"]
+    return [
+        {
+            "id": str(1000 + i),
+            "text": f"Airdrop announcement #{i}",
+            "tweet_url": f"https://twitter.com/user{i}/status/{1000 + i}",
+            "author": {"name": f"User {i}", "username": f"user{i}", "followers": 100, "verified": False},
+            "score": 42,
+            "ai_analysis": {
+                "related_crypto": projects[i % len(projects)],
+                "is_legitimate": "Yes",
+                "risk_level": "Low",
+                "airdrop_percentage": "5%"
+            }
+        }
+        for i in range(count)
+    ]
+
+
+async def measure_loop_lag(stop: asyncio.Event) -> float:
+    """Largest delay between when the ticker should wake up and when it does"""
+    loop = asyncio.get_running_loop()
+    max_lag = 0.0
+    while not stop.is_set():
+        expected = loop.time() + TICK_SECONDS
+        await asyncio.sleep(TICK_SECONDS)
+        max_lag = max(max_lag, loop.time() - expected)
+    return max_lag
+
+
+async def run_store():
+    """Store analyzed items through a slow database while measuring the event loop lag"""
+    from airdrop_pipeline import AirdropPipeline
+
+    fake = FakePostgrest(REQUEST_DELAY_SECONDS)
+    url = fake.start()
+    db = DatabaseManager(url=url, key="test-key")
+    pipeline = AirdropPipeline(db=db)
+
+    try:
+        stop = asyncio.Event()
+        ticker = asyncio.create_task(measure_loop_lag(stop))
+        started = time.monotonic()
+        stored = await pipeline.store_in_supabase(make_items(30))
+        elapsed = time.monotonic() - started
+        stop.set()
+        max_lag = await ticker
+    finally:
+        await pipeline.aclose()
+        fake.stop()
+
+    return stored, fake, elapsed, max_lag
+
+
+def test_store_does_not_block_event_loop():
+    """store_in_supabase must leave the event loop free during database round trips"""
+    stored, fake, elapsed, max_lag = asyncio.run(run_store())
+    print(f"Stored: {stored}, {fake.requests} requests in {elapsed:.2f}s, max event loop lag {max_lag * 1000:.1f} ms")
+    assert stored, "Nothing was stored"
+    assert len(fake.tables["projects"]) == 3, "Projects were not deduplicated"
+    assert len(fake.tables["ai_analysis"]) == 30, "Not every analysis was stored"
+    assert fake.requests <= 6, f"Expected a constant number of round trips, got {fake.requests}"
+    assert max_lag < MAX_LOOP_LAG_SECONDS, f"Event loop blocked for {max_lag * 1000:.1f} ms"
+    print("Event loop stayed responsive during storage")
+
+
+if __name__ == "__main__":
+    test_store_does_not_block_event_loop()
@@ -1,5 +1,7 @@
 """
 Test script for Postgrest/Supabase integration
+
+Set DATABASE_BACKEND=sqlite to run it against a local SQLite database instead.
 """
 import os
 import sys
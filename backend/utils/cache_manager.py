@@ -0,0 +1,865 @@
+"""
+Cache manager for storing analysis results to reduce API usage
+"""
+import os
+import copy
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:  # optional, zlib is used without it
+    zstandard = None
+
+# Cache configuration
+DATA_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "cache")
+CACHE_DB_PATH = os.path.join(DATA_CACHE_DIR, "analysis_cache.db")
+CACHE_EXPIRY = 60 * 60 * 24 * 7  # 7 days in seconds
+# Expired entries are still served (marked stale) for this long while a refresh runs
+CACHE_STALE_GRACE = 60 * 60 * 24 * 2  # 2 days
+
+# Proactive refresh of popular entries shortly before they expire
+REFRESH_AHEAD_SECONDS = 60 * 60 * 12  # refresh entries expiring within 12 hours
+REFRESH_MIN_HITS = 3  # only entries read at least this often since they were last written
+REFRESH_BATCH_SIZE = 5  # entries refreshed per cycle
+REFRESH_INTERVAL_SECONDS = 60 * 15  # pause between refresh cycles
+
+# Stored entries are compressed; zstd when the zstandard package is installed
+CACHE_COMPRESSION = "zstd" if zstandard else "zlib"
+CACHE_COMPRESSION_LEVEL = 6
+# Total size of stored (compressed) entries, least valuable entries are evicted beyond it
+CACHE_MAX_BYTES = 64 * 1024 * 1024  # 64 MB
+CACHE_EVICTION_POLICY = "lfu"  # "lru" (least recently read) or "lfu" (least often read)
+
+# In-memory tier in front of the database
+MEMORY_CACHE_MAX_BYTES = 8 * 1024 * 1024  # 8 MB of serialized analyses
+MEMORY_CACHE_TTL = 60 * 5  # 5 minutes
+
+# Namespace of entries cached without a model/template
+DEFAULT_NAMESPACE = "default"
+
+# Fields identifying a project, compared case-insensitively in cache keys
+IDENTITY_FIELDS = ("project_name", "token_symbol", "website_url", "twitter_handle")
+
+# Directories of the old one-JSON-file-per-entry cache; its entries are not
+# migrated (they lack the project data the keys are built from) but deleted
+LEGACY_CACHE_DIRS = [
+    os.path.join(DATA_CACHE_DIR, "analysis"),
+    DATA_CACHE_DIR
+]
+
+# Ensure cache directory exists
+os.makedirs(DATA_CACHE_DIR, exist_ok=True)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis_cache (
+    cache_key TEXT PRIMARY KEY,
+    project_key TEXT NOT NULL,
+    project_name TEXT,
+    token_symbol TEXT,
+    cached_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    analysis TEXT NOT NULL,
+    project_data TEXT,
+    hits INTEGER NOT NULL DEFAULT 0,
+    recent_hits INTEGER NOT NULL DEFAULT 0,
+    last_access REAL,
+    namespace TEXT NOT NULL DEFAULT 'default',
+    namespace_version INTEGER NOT NULL DEFAULT 1,
+    codec TEXT,
+    raw_bytes INTEGER NOT NULL DEFAULT 0,
+    size_bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_analysis_cache_expires_at ON analysis_cache (expires_at);
+CREATE INDEX IF NOT EXISTS idx_analysis_cache_project_key ON analysis_cache (project_key);
+CREATE INDEX IF NOT EXISTS idx_analysis_cache_namespace ON analysis_cache (namespace, namespace_version);
+CREATE TABLE IF NOT EXISTS cache_namespaces (
+    namespace TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 1,
+    updated_at REAL
+);
+"""
+
+# Order in which entries are evicted when the byte budget is exceeded
+EVICTION_ORDER = {
+    "lru": "COALESCE(last_access, cached_at)",
+    "lfu": "hits, COALESCE(last_access, cached_at)"
+}
+
+
+def encode_value(value: Any, codec: str = CACHE_COMPRESSION) -> Tuple[bytes, int]:
+    """
+    Serialize a value as compact JSON and compress it
+
+    Args:
+        value: JSON-serializable value
+        codec: "zlib" or "zstd"
+
+    Returns:
+        Tuple of the compressed bytes and the uncompressed size
+    """
+    raw = json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=CACHE_COMPRESSION_LEVEL).compress(raw), len(raw)
+    return zlib.compress(raw, CACHE_COMPRESSION_LEVEL), len(raw)
+
+
+def decode_value(data: Any, codec: Optional[str]) -> Any:
+    """
+    Decode a value written by encode_value
+
+    Args:
+        data: Stored bytes, or plain JSON text for entries written before compression
+        codec: Codec stored with the entry, None for plain JSON
+
+    Returns:
+        The decoded value
+
+    Raises:
+        ValueError: The data cannot be decoded
+    """
+    if codec is None:
+        return json.loads(data)
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("zstandard is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == "zlib":
+        try:
+            raw = zlib.decompress(data)
+        except zlib.error as e:
+            raise ValueError(str(e)) from e
+    else:
+        raise ValueError(f"Unknown cache codec: {codec}")
+    return json.loads(raw.decode('utf-8'))
+
+
+class MemoryLRU:
+    """
+    Bounded in-process LRU cache with a TTL
+
+    Size is measured as the length of the serialized value, entries expire
+    after the TTL or their own expiry time, whichever comes first.
+    """
+
+    def __init__(self, max_bytes: int = MEMORY_CACHE_MAX_BYTES, ttl: float = MEMORY_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # cache_key -> (value, size, expires_at, project_key)
+        self._entries: "OrderedDict[str, Tuple[Any, int, float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: Any, size: int, expires_at: float, project_key: str = "") -> None:
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, min(expires_at, time.time() + self.ttl), project_key)
+            self.bytes += size
+            while self.bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, size, _, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def delete_project(self, project_key: str) -> int:
+        with self._lock:
+            keys = [k for k, entry in self._entries.items() if entry[3] == project_key]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            keys = [k for k, entry in self._entries.items() if entry[2] <= now]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class AnalysisCache:
+    """
+    Cache manager for storing and retrieving analysis results
+
+    This class provides functionality to cache analysis results to avoid
+    repeated API calls and save API credits when analyzing the same project
+    multiple times within the expiry period.
+
+    Entries live in a single SQLite file. Lookups go through the primary key,
+    expiry sweeps and stats through the index on expires_at, and every write
+    is its own transaction. A bounded in-memory LRU tier sits in front of the
+    database: reads fill it, writes go through both tiers.
+
+    Expired entries stay readable as "stale" for CACHE_STALE_GRACE so callers
+    can answer immediately and refresh in the background. Reads are counted
+    per entry to find popular entries worth refreshing before they expire.
+
+    Entries live in namespaces, one per model and prompt template version
+    (see namespace_for). The namespace and its current version are part of
+    every cache key, so bumping a namespace version invalidates all of its
+    entries at once without touching the others.
+
+    Stored entries are compressed (see encode_value). When their total size
+    exceeds CACHE_MAX_BYTES the least valuable entries are evicted according
+    to CACHE_EVICTION_POLICY.
+    """
+
+    _conn: Optional[sqlite3.Connection] = None
+    _lock = threading.Lock()
+    _memory = MemoryLRU()
+    _hits = {"memory": 0, "disk": 0, "stale": 0}
+    _misses = {"memory": 0, "disk": 0}
+    # Read counts not yet written to the database: cache_key -> (hits, last_access)
+    _pending_hits: Dict[str, Tuple[int, float]] = {}
+    # namespace -> current version, loaded from cache_namespaces on first use
+    _namespace_versions: Dict[str, int] = {}
+    # namespace -> {"hits", "stale_hits", "misses"} since process start
+    _namespace_stats: Dict[str, Dict[str, int]] = {}
+    # Total size of stored entries, kept in sync with the size_bytes column
+    _stored_bytes = 0
+    _evictions = {"entries": 0, "bytes": 0}
+
+    @classmethod
+    def _connection(cls) -> sqlite3.Connection:
+        """Open the cache database on first use, creating it if needed"""
+        if cls._conn is None:
+            conn = sqlite3.connect(CACHE_DB_PATH, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            # Lets evictions return pages to the file system (only applies to new databases)
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            cls._namespace_versions = {
+                row["namespace"]: row["version"]
+                for row in conn.execute("SELECT namespace, version FROM cache_namespaces")
+            }
+            cls._conn = conn
+            for directory in LEGACY_CACHE_DIRS:
+                cls.remove_legacy_json_cache(directory)
+            cls._count_stored_bytes()
+        return cls._conn
+
+    @classmethod
+    def _count_stored_bytes(cls) -> None:
+        """Recompute the stored size after bulk deletes"""
+        cls._stored_bytes = cls._conn.execute(
+            "SELECT COALESCE(SUM(size_bytes), 0) FROM analysis_cache"
+        ).fetchone()[0]
+
+    @staticmethod
+    def namespace_for(model: Optional[str] = None, template_id: Optional[str] = None) -> str:
+        """
+        Build the namespace of analyses produced by a model with a prompt template
+
+        Args:
+            model: Model name, e.g. "anthropic/claude-3-sonnet"
+            template_id: Prompt template id, e.g. "project_analysis:v1"
+
+        Returns:
+            Namespace string such as "project_analysis:v1@anthropic/claude-3-sonnet"
+        """
+        if not model and not template_id:
+            return DEFAULT_NAMESPACE
+        return f"{template_id or 'none'}@{model or 'any'}"
+
+    @classmethod
+    def namespace_version(cls, namespace: str) -> int:
+        """Current version of a namespace (1 until it is first invalidated)"""
+        cls._connection()
+        return cls._namespace_versions.get(namespace, 1)
+
+    @classmethod
+    def _generate_cache_key(cls, project_data: Dict[str, Any], namespace: str = DEFAULT_NAMESPACE) -> str:
+        """
+        Generate a unique cache key based on project data
+
+        The key covers every non-empty input field (not only the identifying
+        ones), the namespace and the namespace version, so a change in
+        tokenomics, model or prompt template never hits an old entry.
+
+        Args:
+            project_data: Dictionary containing project information
+            namespace: Cache namespace (see namespace_for)
+
+        Returns:
+            A unique hash string to use as cache key
+        """
+        content = {}
+        for field, value in project_data.items():
+            if value is None or value == '' or value == [] or value == {}:
+                continue
+            if isinstance(value, str):
+                value = value.strip()
+                if field in IDENTITY_FIELDS:
+                    value = value.lower()
+            content[field] = value
+
+        # Create a stable string representation and hash it
+        identifier = json.dumps(
+            {"namespace": namespace, "version": cls.namespace_version(namespace), "content": content},
+            sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str
+        )
+        return hashlib.sha256(identifier.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _count(cls, namespace: str, field: str) -> None:
+        """Count a hit, stale hit or miss for a namespace"""
+        stats = cls._namespace_stats.setdefault(namespace, {"hits": 0, "stale_hits": 0, "misses": 0})
+        stats[field] += 1
+
+    @staticmethod
+    def _project_key(project_name: Optional[str]) -> str:
+        """Normalized project name used to find all entries of a project"""
+        return str(project_name or '').lower().strip()
+
+    @classmethod
+    def get_cached_analysis(cls, project_data: Dict[str, Any],
+                            namespace: str = DEFAULT_NAMESPACE) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve cached analysis results for a project if available and not expired
+
+        Args:
+            project_data: Project information dictionary
+            namespace: Cache namespace (see namespace_for)
+
+        Returns:
+            Cached analysis results or None if not available
+        """
+        entry = cls.get_cached_entry(project_data, allow_stale=False, namespace=namespace)
+        return entry["analysis"] if entry else None
+
+    @classmethod
+    def get_cached_entry(cls, project_data: Dict[str, Any], allow_stale: bool = True,
+                         namespace: str = DEFAULT_NAMESPACE) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve a cached analysis together with its freshness
+
+        Args:
+            project_data: Project information dictionary
+            allow_stale: Also return entries that expired less than
+                CACHE_STALE_GRACE ago
+            namespace: Cache namespace (see namespace_for)
+
+        Returns:
+            Dictionary with "analysis", "stale" and "expires_at", or None
+        """
+        cache_key = cls._generate_cache_key(project_data, namespace)
+
+        # Hot entries are served from memory without touching the database
+        cached = cls._memory.get(cache_key)
+        if cached is not None:
+            cls._hits["memory"] += 1
+            cls._count(namespace, "hits")
+            cls._record_hit(cache_key)
+            analysis, expires_at = cached
+            return {"analysis": copy.deepcopy(analysis), "stale": False, "expires_at": expires_at}
+        cls._misses["memory"] += 1
+
+        try:
+            with cls._lock:
+                row = cls._connection().execute(
+                    "SELECT analysis, codec, raw_bytes, expires_at FROM analysis_cache WHERE cache_key = ?",
+                    (cache_key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            cls._count(namespace, "misses")
+            print(f"Error reading cache: {e}")
+            return None
+
+        if row is None:
+            cls._misses["disk"] += 1
+            cls._count(namespace, "misses")
+            return None
+
+        # Check if cache has expired
+        now = time.time()
+        stale = row["expires_at"] <= now
+        if stale and (not allow_stale or row["expires_at"] + CACHE_STALE_GRACE <= now):
+            cls._misses["disk"] += 1
+            cls._count(namespace, "misses")
+            print(f"Cache expired for {project_data.get('project_name')}")
+            return None
+
+        try:
+            analysis = decode_value(row["analysis"], row["codec"])
+        except ValueError as e:
+            cls._misses["disk"] += 1
+            cls._count(namespace, "misses")
+            print(f"Error reading cache: {e}")
+            return None
+
+        cls._record_hit(cache_key)
+        if stale:
+            cls._hits["stale"] += 1
+            cls._count(namespace, "stale_hits")
+            print(f"Using stale cached analysis for {project_data.get('project_name')}")
+        else:
+            cls._hits["disk"] += 1
+            cls._count(namespace, "hits")
+            cls._memory.set(cache_key, (analysis, row["expires_at"]), row["raw_bytes"], row["expires_at"],
+                            cls._project_key(project_data.get('project_name')))
+            print(f"Using cached analysis for {project_data.get('project_name')}")
+        return {"analysis": copy.deepcopy(analysis), "stale": stale, "expires_at": row["expires_at"]}
+
+    @classmethod
+    def is_cached(cls, project_data: Dict[str, Any], namespace: str = DEFAULT_NAMESPACE,
+                  min_ttl: float = 0) -> bool:
+        """
+        Check for a fresh entry without counting a read
+
+        Args:
+            project_data: Project information dictionary
+            namespace: Cache namespace (see namespace_for)
+            min_ttl: Seconds the entry must still be fresh for
+
+        Returns:
+            True if an entry exists that expires more than min_ttl seconds from now
+        """
+        cache_key = cls._generate_cache_key(project_data, namespace)
+        with cls._lock:
+            row = cls._connection().execute(
+                "SELECT 1 FROM analysis_cache WHERE cache_key = ? AND expires_at > ?",
+                (cache_key, time.time() + min_ttl)
+            ).fetchone()
+        return row is not None
+
+    @classmethod
+    def _record_hit(cls, cache_key: str) -> None:
+        """Count a read in memory, written to the database in batches"""
+        hits, _ = cls._pending_hits.get(cache_key, (0, 0.0))
+        cls._pending_hits[cache_key] = (hits + 1, time.time())
+
+    @classmethod
+    def _flush_hits(cls) -> None:
+        """Write the buffered read counts to the database"""
+        if not cls._pending_hits:
+            return
+        pending, cls._pending_hits = cls._pending_hits, {}
+        with cls._lock:
+            conn = cls._connection()
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany(
+                    "UPDATE analysis_cache SET hits = hits + ?, recent_hits = recent_hits + ?, last_access = ? "
+                    "WHERE cache_key = ?",
+                    [(hits, hits, last_access, key) for key, (hits, last_access) in pending.items()]
+                )
+
+    @classmethod
+    def cache_analysis(cls, project_data: Dict[str, Any], analysis_result: Dict[str, Any],
+                       namespace: str = DEFAULT_NAMESPACE) -> bool:
+        """
+        Store analysis results in cache
+
+        Args:
+            project_data: Project information dictionary
+            analysis_result: Analysis results to cache
+            namespace: Cache namespace (see namespace_for)
+
+        Returns:
+            True if caching was successful, False otherwise
+        """
+        cache_key = cls._generate_cache_key(project_data, namespace)
+        project_key = cls._project_key(project_data.get('project_name'))
+        now = time.time()
+
+        try:
+            analysis_blob, raw_bytes = encode_value(analysis_result)
+            project_blob, _ = encode_value(project_data)
+            size_bytes = len(analysis_blob) + len(project_blob)
+            with cls._lock:
+                conn = cls._connection()
+                with conn:
+                    conn.execute("BEGIN")
+                    previous = conn.execute(
+                        "SELECT size_bytes FROM analysis_cache WHERE cache_key = ?", (cache_key,)
+                    ).fetchone()
+                    # Upsert keeps the lifetime read count used for eviction, but restarts
+                    # recent_hits so an entry is only refreshed again if it is read again
+                    conn.execute(
+                        "INSERT INTO analysis_cache "
+                        "(cache_key, project_key, project_name, token_symbol, cached_at, expires_at, analysis, "
+                        "project_data, namespace, namespace_version, codec, raw_bytes, size_bytes) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(cache_key) DO UPDATE SET "
+                        "project_key = excluded.project_key, project_name = excluded.project_name, "
+                        "token_symbol = excluded.token_symbol, cached_at = excluded.cached_at, "
+                        "expires_at = excluded.expires_at, analysis = excluded.analysis, "
+                        "project_data = excluded.project_data, codec = excluded.codec, "
+                        "raw_bytes = excluded.raw_bytes, size_bytes = excluded.size_bytes, recent_hits = 0",
+                        (
+                            cache_key,
+                            project_key,
+                            project_data.get('project_name', 'Unknown'),
+                            project_data.get('token_symbol', 'Unknown'),
+                            now,
+                            now + CACHE_EXPIRY,
+                            analysis_blob,
+                            project_blob,
+                            namespace,
+                            cls.namespace_version(namespace),
+                            CACHE_COMPRESSION,
+                            raw_bytes,
+                            size_bytes
+                        )
+                    )
+                    cls._stored_bytes += size_bytes - (previous["size_bytes"] if previous else 0)
+                    if cls._stored_bytes > CACHE_MAX_BYTES:
+                        cls._evict(conn, cls._stored_bytes - CACHE_MAX_BYTES, keep=cache_key)
+            # Write-through: the memory tier only ever holds committed entries
+            cls._memory.set(cache_key, (copy.deepcopy(analysis_result), now + CACHE_EXPIRY), raw_bytes,
+                            now + CACHE_EXPIRY, project_key)
+
+            print(f"Cached analysis for {project_data.get('project_name')}")
+            return True
+
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Error writing to cache: {e}")
+            return False
+
+    @classmethod
+    def _evict(cls, conn: sqlite3.Connection, needed: int, keep: Optional[str] = None) -> None:
+        """
+        Delete the least valuable entries until `needed` bytes are freed
+
+        Runs inside the caller's transaction while holding the lock.
+
+        Args:
+            conn: Database connection
+            needed: Number of bytes to free
+            keep: Cache key that must not be evicted (the entry just written)
+        """
+        # Read counts still buffered in memory decide what is popular
+        pending, cls._pending_hits = cls._pending_hits, {}
+        conn.executemany(
+            "UPDATE analysis_cache SET hits = hits + ?, recent_hits = recent_hits + ?, last_access = ? "
+            "WHERE cache_key = ?",
+            [(hits, hits, last_access, key) for key, (hits, last_access) in pending.items()]
+        )
+
+        order = EVICTION_ORDER.get(CACHE_EVICTION_POLICY, EVICTION_ORDER["lru"])
+        victims = []
+        freed = 0
+        for row in conn.execute(
+            f"SELECT cache_key, size_bytes FROM analysis_cache WHERE cache_key != ? ORDER BY {order}",
+            (keep or '',)
+        ):
+            victims.append(row["cache_key"])
+            freed += row["size_bytes"]
+            if freed >= needed:
+                break
+
+        conn.executemany("DELETE FROM analysis_cache WHERE cache_key = ?", [(key,) for key in victims])
+        for key in victims:
+            cls._memory.delete(key)
+        cls._stored_bytes -= freed
+        cls._evictions["entries"] += len(victims)
+        cls._evictions["bytes"] += freed
+        print(f"Evicted {len(victims)} cache entries ({freed} bytes) to stay within the cache budget")
+
+    @classmethod
+    def invalidate_project(cls, project_name: str) -> int:
+        """
+        Remove all cache entries of a project
+
+        Args:
+            project_name: Name of the project
+
+        Returns:
+            Number of cache entries removed
+        """
+        project_key = cls._project_key(project_name)
+        cls._memory.delete_project(project_key)
+        with cls._lock:
+            conn = cls._connection()
+            with conn:
+                conn.execute("BEGIN")
+                cursor = conn.execute("DELETE FROM analysis_cache WHERE project_key = ?", (project_key,))
+            cls._count_stored_bytes()
+        return cursor.rowcount
+
+    @classmethod
+    def invalidate_namespace(cls, namespace: str) -> int:
+        """
+        Invalidate all entries of a namespace by bumping its version
+
+        Old entries become unreachable immediately (their keys contain the old
+        version) and are deleted by the next clear_expired_cache.
+
+        Args:
+            namespace: Cache namespace (see namespace_for)
+
+        Returns:
+            The new namespace version
+        """
+        with cls._lock:
+            conn = cls._connection()
+            with conn:
+                conn.execute("BEGIN")
+                conn.execute(
+                    "INSERT INTO cache_namespaces (namespace, version, updated_at) VALUES (?, 2, ?) "
+                    "ON CONFLICT(namespace) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at",
+                    (namespace, time.time())
+                )
+                version = conn.execute(
+                    "SELECT version FROM cache_namespaces WHERE namespace = ?", (namespace,)
+                ).fetchone()[0]
+            cls._namespace_versions[namespace] = version
+        return version
+
+    @classmethod
+    def clear_expired_cache(cls) -> int:
+        """
+        Clear expired cache entries that are past the stale grace period, and
+        entries of invalidated namespace versions
+
+        Returns:
+            Number of cache entries cleared
+        """
+        cls._memory.purge_expired()
+        with cls._lock:
+            conn = cls._connection()
+            with conn:
+                conn.execute("BEGIN")
+                cursor = conn.execute("DELETE FROM analysis_cache WHERE expires_at <= ?",
+                                      (time.time() - CACHE_STALE_GRACE,))
+                cleared = cursor.rowcount
+                cursor = conn.execute(
+                    "DELETE FROM analysis_cache WHERE namespace_version < "
+                    "(SELECT version FROM cache_namespaces WHERE cache_namespaces.namespace = analysis_cache.namespace)"
+                )
+            cls._count_stored_bytes()
+            conn.execute("PRAGMA incremental_vacuum")
+        return cleared + cursor.rowcount
+
+    @classmethod
+    def remove_legacy_json_cache(cls, directory: str) -> int:
+        """
+        Delete the entry files of the old one-file-per-entry cache
+
+        Only files that look like cache entries (with "analysis" and
+        "cached_at") are removed, so other JSON files in the directory (such
+        as the Twitter cookies) stay. An emptied legacy directory is removed.
+
+        Args:
+            directory: Directory with <cache_key>.json files
+
+        Returns:
+            Number of files deleted
+        """
+        if not os.path.isdir(directory):
+            return 0
+
+        removed = 0
+        for filename in os.listdir(directory):
+            if not filename.endswith('.json'):
+                continue
+            file_path = os.path.join(directory, filename)
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (json.JSONDecodeError, IOError, UnicodeDecodeError):
+                continue
+            if not isinstance(entry, dict) or 'analysis' not in entry or 'cached_at' not in entry:
+                continue
+            try:
+                os.remove(file_path)
+                removed += 1
+            except OSError:
+                pass
+
+        if directory != DATA_CACHE_DIR and not os.listdir(directory):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass
+        if removed:
+            print(f"Removed {removed} legacy cache files from {directory}")
+        return removed
+
+    @classmethod
+    def get_refresh_candidates(cls, ahead_seconds: float = REFRESH_AHEAD_SECONDS,
+                               min_hits: int = REFRESH_MIN_HITS,
+                               limit: int = REFRESH_BATCH_SIZE,
+                               namespace: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find popular entries that expire soon (or are already stale)
+
+        Args:
+            ahead_seconds: Include entries expiring within this many seconds
+            min_hits: Minimum number of reads since the entry was last written
+            limit: Maximum number of entries
+            namespace: Only entries of this namespace
+
+        Returns:
+            List of dictionaries with "project_data", "namespace", "hits" (reads
+            since the entry was last written) and "expires_at", most read first
+        """
+        cls._flush_hits()
+        now = time.time()
+        with cls._lock:
+            rows = cls._connection().execute(
+                "SELECT project_data, codec, recent_hits, expires_at, namespace FROM analysis_cache "
+                "LEFT JOIN cache_namespaces USING (namespace) "
+                "WHERE expires_at BETWEEN ? AND ? AND recent_hits >= ? AND project_data IS NOT NULL "
+                "AND namespace_version >= COALESCE(version, 1) AND (? IS NULL OR namespace = ?) "
+                "ORDER BY recent_hits DESC LIMIT ?",
+                (now - CACHE_STALE_GRACE, now + ahead_seconds, min_hits, namespace, namespace, limit)
+            ).fetchall()
+
+        candidates = []
+        for row in rows:
+            try:
+                project_data = decode_value(row["project_data"], row["codec"])
+            except ValueError:
+                continue
+            candidates.append({"project_data": project_data, "namespace": row["namespace"],
+                               "hits": row["recent_hits"], "expires_at": row["expires_at"]})
+        return candidates
+
+    @classmethod
+    def clear_memory(cls) -> None:
+        """Drop the in-memory tier (the database is kept)"""
+        cls._memory.clear()
+
+    @classmethod
+    def _tier_stats(cls) -> Dict[str, Any]:
+        """Hit and miss counters per tier"""
+        tiers = {'stale': {'hits': cls._hits["stale"]}}
+        for tier in ("memory", "disk"):
+            hits, misses = cls._hits[tier], cls._misses[tier]
+            tiers[tier] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / (hits + misses), 3) if hits + misses else 0.0
+            }
+        tiers['memory'].update({
+            'entries': len(cls._memory),
+            'bytes': cls._memory.bytes,
+            'max_bytes': cls._memory.max_bytes,
+            'evictions': cls._memory.evictions
+        })
+        return tiers
+
+    @classmethod
+    def _namespace_summary(cls, rows) -> Dict[str, Any]:
+        """Entries, version and hit rate per namespace"""
+        summary = {}
+        for row in rows:
+            summary[row['namespace']] = {'version': row['version'], 'entries': row['entries'] or 0}
+        for namespace, version in cls._namespace_versions.items():
+            summary.setdefault(namespace, {'version': version, 'entries': 0})
+        for namespace, counts in cls._namespace_stats.items():
+            entry = summary.setdefault(namespace, {'version': cls._namespace_versions.get(namespace, 1), 'entries': 0})
+            lookups = counts['hits'] + counts['stale_hits'] + counts['misses']
+            entry.update(counts)
+            entry['hit_rate'] = round((counts['hits'] + counts['stale_hits']) / lookups, 3) if lookups else 0.0
+        return summary
+
+    @classmethod
+    def get_cache_stats(cls, limit: int = 100) -> Dict[str, Any]:
+        """
+        Get statistics about the cache
+
+        Args:
+            limit: Maximum number of projects listed (most recently cached first)
+
+        Returns:
+            Dictionary with cache statistics
+        """
+        current_time = time.time()
+        cls._flush_hits()
+
+        with cls._lock:
+            conn = cls._connection()
+            total_files = conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+            expired_count = conn.execute(
+                "SELECT COUNT(*) FROM analysis_cache WHERE expires_at <= ?", (current_time,)
+            ).fetchone()[0]
+            storage = conn.execute(
+                "SELECT COALESCE(SUM(raw_bytes), 0) AS raw_bytes, COALESCE(SUM(size_bytes), 0) AS size_bytes "
+                "FROM analysis_cache"
+            ).fetchone()
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            rows = conn.execute(
+                "SELECT project_name, token_symbol, cached_at, expires_at, hits, namespace FROM analysis_cache "
+                "ORDER BY expires_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+            namespace_rows = conn.execute(
+                "SELECT namespace, COALESCE(version, 1) AS version, "
+                "SUM(namespace_version >= COALESCE(version, 1)) AS entries "
+                "FROM analysis_cache LEFT JOIN cache_namespaces USING (namespace) GROUP BY namespace"
+            ).fetchall()
+
+        projects = [
+            {
+                'project_name': row['project_name'],
+                'token_symbol': row['token_symbol'],
+                'cached_at': datetime.fromtimestamp(row['cached_at']).isoformat(),
+                'expires_at': datetime.fromtimestamp(row['expires_at']).isoformat(),
+                'is_expired': row['expires_at'] <= current_time,
+                'hits': row['hits'],
+                'namespace': row['namespace']
+            }
+            for row in rows
+        ]
+
+        return {
+            'total_cached': total_files,
+            'active_cache_entries': total_files - expired_count,
+            'expired_entries': expired_count,
+            'total_size_bytes': page_count * page_size,
+            'storage': {
+                'codec': CACHE_COMPRESSION,
+                'raw_bytes': storage['raw_bytes'],
+                'stored_bytes': storage['size_bytes'],
+                'compression_ratio': round(storage['raw_bytes'] / storage['size_bytes'], 2)
+                if storage['size_bytes'] else 0.0,
+                'max_bytes': CACHE_MAX_BYTES,
+                'eviction_policy': CACHE_EVICTION_POLICY,
+                'evicted_entries': cls._evictions['entries'],
+                'evicted_bytes': cls._evictions['bytes']
+            },
+            'tiers': cls._tier_stats(),
+            'namespaces': cls._namespace_summary(namespace_rows),
+            'projects': projects
+        }
@@ -0,0 +1,186 @@
+"""
+Warm-up job for the project analysis cache
+
+Analyzes recently discovered, top rated and watchlisted projects ahead of the
+first page view, so users are not the ones waiting for the LLM after a deploy
+or cache expiry.
+
+Usage:
+    python -m utils.cache_warmup --concurrency 3 --token-budget 60000
+"""
+import json
+import time
+import asyncio
+import argparse
+from typing import Dict, Any, Optional
+
+from .cache_manager import AnalysisCache, REFRESH_AHEAD_SECONDS
+from .config import (
+    CACHE_WARMUP_LATEST_LIMIT,
+    CACHE_WARMUP_TOP_LIMIT,
+    CACHE_WARMUP_WATCHLIST_LIMIT,
+    CACHE_WARMUP_CONCURRENCY,
+    CACHE_WARMUP_TOKEN_BUDGET
+)
+
+async def collect_warmup_projects(db, latest_limit: int = CACHE_WARMUP_LATEST_LIMIT,
+                                  top_limit: int = CACHE_WARMUP_TOP_LIMIT,
+                                  watchlist_limit: int = CACHE_WARMUP_WATCHLIST_LIMIT) -> Dict[str, Any]:
+    """
+    Read the projects to warm from the database
+
+    Args:
+        db: DatabaseManager instance
+        latest_limit: Number of most recently discovered projects
+        top_limit: Number of top rated projects
+        watchlist_limit: Number of most watchlisted projects
+
+    Returns:
+        Dictionary with "projects" (list of (source, project) tuples,
+        watchlisted first) and "errors" per source
+    """
+    watchlist, latest, top = await asyncio.gather(
+        db.get_watchlisted_projects(limit=watchlist_limit),
+        db.get_latest_projects(limit=latest_limit),
+        db.get_top_rated_projects(limit=top_limit)
+    )
+
+    errors = {}
+    sources = {}
+    for name, result in (("watchlist", watchlist), ("latest", latest), ("top", top)):
+        if "error" in result:
+            errors[name] = result["error"]
+        sources[name] = result.get("data") or []
+
+    # Top rated rows only carry a few columns, the full rows are needed for the cache key
+    top_ids = [p["id"] for p in sources["top"] if p.get("id") is not None]
+    if top_ids:
+        full = await db.get_projects_by_ids(top_ids)
+        if "error" in full:
+            errors["top"] = full["error"]
+        sources["top"] = full.get("data") or []
+
+    projects = [(name, project) for name in ("watchlist", "latest", "top") for project in sources[name]]
+    return {"projects": projects, "errors": errors}
+
+
+async def warm_analysis_cache(manager, db, latest_limit: int = CACHE_WARMUP_LATEST_LIMIT,
+                              top_limit: int = CACHE_WARMUP_TOP_LIMIT,
+                              watchlist_limit: int = CACHE_WARMUP_WATCHLIST_LIMIT,
+                              concurrency: int = CACHE_WARMUP_CONCURRENCY,
+                              token_budget: Optional[int] = CACHE_WARMUP_TOKEN_BUDGET) -> Dict[str, Any]:
+    """
+    Pre-populate the analysis cache for trending and watchlisted projects
+
+    Projects with an entry that stays fresh for longer than the refresh
+    window are skipped. Once the tokens spent (plus the expected usage of the
+    analyses still running) reach the budget, the remaining projects are
+    skipped instead of analyzed.
+
+    Args:
+        manager: OpenRouterManager used for the analyses
+        db: DatabaseManager to read projects from
+        latest_limit: Number of most recently discovered projects
+        top_limit: Number of top rated projects
+        watchlist_limit: Number of most watchlisted projects
+        concurrency: Maximum number of analyses running at once
+        token_budget: Maximum tokens spent by this run, None for no limit
+
+    Returns:
+        Report with warmed and skipped counts and one line per project
+    """
+    started = time.monotonic()
+    collected = await collect_warmup_projects(db, latest_limit, top_limit, watchlist_limit)
+    namespace = manager.project_analysis_namespace()
+
+    report = {
+        "namespace": namespace,
+        "sources": {},
+        "warmed": 0,
+        "skipped": {"cached": 0, "duplicate": 0, "token_budget": 0, "failed": 0},
+        "tokens_used": 0,
+        "token_budget": token_budget,
+        "errors": collected["errors"],
+        "entries": []
+    }
+
+    # Watchlisted projects come first, so they are warmed before the budget runs out
+    pending = []
+    seen = set()
+    for source, project in collected["projects"]:
+        report["sources"][source] = report["sources"].get(source, 0) + 1
+        # Same projection as generate_project_analysis, so /analyze with a project row hits the entry
+        project_data = manager.project_analysis_input(project)
+        name = project_data.get("project_name")
+        if not name or name.lower() in seen:
+            report["skipped"]["duplicate"] += 1
+            continue
+        seen.add(name.lower())
+        if AnalysisCache.is_cached(project_data, namespace, min_ttl=REFRESH_AHEAD_SECONDS):
+            report["skipped"]["cached"] += 1
+            report["entries"].append({"project_name": name, "source": source, "status": "cached"})
+            continue
+        pending.append((source, project_data))
+
+    semaphore = asyncio.Semaphore(concurrency)
+    # Analyses in flight count against the budget with the average seen so far
+    progress = {"in_flight": 0, "done": 0}
+
+    async def warm(source: str, project_data: Dict[str, Any]) -> None:
+        async with semaphore:
+            entry = {"project_name": project_data["project_name"], "source": source}
+            report["entries"].append(entry)
+            average = report["tokens_used"] / progress["done"] if progress["done"] else 0
+            if token_budget is not None and report["tokens_used"] + progress["in_flight"] * average >= token_budget:
+                report["skipped"]["token_budget"] += 1
+                entry["status"] = "token_budget"
+                return
+            progress["in_flight"] += 1
+            try:
+                # Stale entries are re-analyzed too, not served
+                result = await manager.refresh_project_analysis(project_data, namespace)
+            finally:
+                progress["in_flight"] -= 1
+            progress["done"] += 1
+            usage = (result.get("raw_response") or {}).get("usage") or {}
+            report["tokens_used"] += int(usage.get("total_tokens") or 0)
+            if result.get("success"):
+                report["warmed"] += 1
+                entry["status"] = "warmed"
+            else:
+                report["skipped"]["failed"] += 1
+                entry["status"] = "failed"
+                entry["error"] = result.get("error")
+
+    await asyncio.gather(*(warm(source, project_data) for source, project_data in pending))
+    report["seconds"] = round(time.monotonic() - started, 2)
+    print(f"[WARMUP] {report['warmed']} proyek di-cache, dilewati: {report['skipped']}, "
+          f"token: {report['tokens_used']}")
+    return report
+
+
+def main():
+    from .db_manager import db_manager
+    from .openrouter_manager import OpenRouterManager
+
+    parser = argparse.ArgumentParser(description="Warm the project analysis cache")
+    parser.add_argument("--latest", type=int, default=CACHE_WARMUP_LATEST_LIMIT)
+    parser.add_argument("--top", type=int, default=CACHE_WARMUP_TOP_LIMIT)
+    parser.add_argument("--watchlist", type=int, default=CACHE_WARMUP_WATCHLIST_LIMIT)
+    parser.add_argument("--concurrency", type=int, default=CACHE_WARMUP_CONCURRENCY)
+    parser.add_argument("--token-budget", type=int, default=CACHE_WARMUP_TOKEN_BUDGET)
+    args = parser.parse_args()
+
+    async def run():
+        manager = OpenRouterManager()
+        try:
+            return await warm_analysis_cache(manager, db_manager, args.latest, args.top, args.watchlist,
+                                             args.concurrency, args.token_budget)
+        finally:
+            await manager.aclose()
+
+    print(json.dumps(asyncio.run(run()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
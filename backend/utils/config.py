@@ -37,6 +37,24 @@ DEFAULT_TWEETS_PER_HASHTAG = 10
 # Define sleep times between API calls to avoid rate limits
 API_CALL_DELAY_SECONDS = 1.5
 
+# Number of tweets analyzed by the AI in parallel
+AI_ANALYSIS_CONCURRENCY = 4
+
+# Model cascade for tweet analysis: every tweet goes to the first tier, only
+# uncertain or implausible answers are escalated to the next one
+AI_CASCADE_ENABLED = True
+AI_CASCADE_TIERS = ["free-analysis", "smart"]   # Aliases from OPENROUTER_MODELS, cheapest first
+AI_CASCADE_CONFIDENCE_THRESHOLD = 0.7           # Minimum confidence to accept an answer
+AI_CASCADE_HIGH_SCORE = 50                      # Relevance score at which "not legitimate" is suspicious
+AI_CASCADE_LOW_SCORE = 10                       # Relevance score at which "legitimate" is suspicious
+
+# Analysis cache warm-up: projects analyzed ahead of the first page view
+CACHE_WARMUP_LATEST_LIMIT = 20        # Most recently discovered projects
+CACHE_WARMUP_TOP_LIMIT = 20           # Top rated projects
+CACHE_WARMUP_WATCHLIST_LIMIT = 50     # Most watchlisted projects
+CACHE_WARMUP_CONCURRENCY = 3          # Analyses running at once
+CACHE_WARMUP_TOKEN_BUDGET = 60000     # Tokens one warm-up run may spend
+
 # Pipeline configuration
 PIPELINE_RUN_INTERVAL_MINUTES = 60
 
@@ -3,6 +3,9 @@ Database manager for Postgrest integration (Supabase)
 """
 import os
 import json
+import time
+import base64
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Union
 
@@ -11,27 +14,169 @@ from postgrest import AsyncPostgrestClient
 from .supabase_config import (
     SUPABASE_URL, 
     SUPABASE_KEY,
+    DATABASE_BACKEND,
+    SQLITE_DATABASE_PATH,
     TABLE_PROJECTS,
     TABLE_TWITTER_DATA,
     TABLE_AI_ANALYSIS,
     TABLE_TOKENOMICS,
     TABLE_MARKET_DATA,
-    TABLE_USER_WATCHLIST
+    TABLE_USER_WATCHLIST,
+    VIEW_PROJECT_RANKINGS,
+    DB_BATCH_SIZE,
+    PROJECT_CACHE_TTL_SECONDS,
+    PROJECT_CACHE_NEGATIVE_TTL_SECONDS,
+    PROJECT_CACHE_MAX_ENTRIES,
+    PROJECT_DETAIL_TWEET_LIMIT,
+    PROJECT_DETAIL_MARKET_LIMIT
 )
+from .write_behind import WriteBehindBuffer
+from .sqlite_client import AsyncSQLiteClient
+
+# Marker for names cached as not existing
+MISSING = object()
+
+# Sort keys of the keyset paginated listings, all descending
+LATEST_PROJECTS_ORDER = ("discovery_date", "id")
+TOP_PROJECTS_ORDER = ("overall_rating", "analysis_date", "id")
+
+
+def encode_cursor(row: Dict, columns: tuple) -> str:
+    """Opaque cursor pointing after the given row"""
+    values = [row.get(column) for column in columns]
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: tuple) -> List[Any]:
+    """Sort key values of a cursor, raises ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(values, list) or len(values) != len(columns) or any(v is None for v in values):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def keyset_filter(columns: tuple, values: List[Any]) -> str:
+    """
+    Postgrest "or" filter selecting the rows after a cursor in descending
+    (columns) order, e.g. a < x OR (a = x AND b < y)
+    """
+    def literal(value):
+        # Quote values so timestamps and text are not split on reserved characters
+        return json.dumps(value) if isinstance(value, str) else str(value)
+
+    branches = []
+    for i, column in enumerate(columns):
+        conditions = [f"{columns[j]}.eq.{literal(values[j])}" for j in range(i)]
+        conditions.append(f"{column}.lt.{literal(values[i])}")
+        branches.append(conditions[0] if len(conditions) == 1 else f"and({','.join(conditions)})")
+    return ",".join(branches)
+
+
+
+class ProjectCache:
+    """
+    In-process cache of project rows by project_name
+
+    Names that were looked up and not found are cached too (for a shorter
+    time), so repeated lookups of unknown names cost no round trip either.
+    """
+
+    def __init__(self, ttl: float = PROJECT_CACHE_TTL_SECONDS,
+                 negative_ttl: float = PROJECT_CACHE_NEGATIVE_TTL_SECONDS,
+                 max_entries: int = PROJECT_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        # project_name -> (row or MISSING, expires_at)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def get(self, project_name: str) -> Optional[Any]:
+        """Cached row, MISSING for names known not to exist, or None if unknown"""
+        entry = self._entries.get(project_name)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[project_name]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(project_name)
+        if entry[0] is MISSING:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+        return entry[0]
+
+    def _put(self, project_name: str, value: Any, ttl: float) -> None:
+        self._entries[project_name] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(project_name)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def set(self, row: Dict) -> None:
+        """Cache a project row (needs "project_name" and "id")"""
+        if row.get("project_name") is not None and row.get("id") is not None:
+            self._put(row["project_name"], row, self.ttl)
+
+    def set_missing(self, project_name: str) -> None:
+        """Cache that no project has this name"""
+        self._put(project_name, MISSING, self.negative_ttl)
+
+    def invalidate(self, project_name: str) -> None:
+        self._entries.pop(project_name, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.negative_hits) / lookups, 3) if lookups else 0.0
+        }
+
 
 class DatabaseManager:
-    """Manager class for database operations with Postgrest (Supabase)"""
+    """Manager class for database operations with Postgrest (Supabase) or a local SQLite database"""
     
-    def __init__(self, url: str = None, key: str = None):
-        """Initialize Postgrest client"""
+    def __init__(self, url: str = None, key: str = None, backend: str = None, sqlite_path: str = None):
+        """
+        Initialize the database client
+        
+        Args:
+            url: Supabase project URL
+            key: Supabase API key
+            backend: "supabase" or "sqlite", defaults to DATABASE_BACKEND
+            sqlite_path: Database file of the sqlite backend, defaults to SQLITE_DATABASE_PATH
+        """
         self.url = url or SUPABASE_URL
         self.key = key or SUPABASE_KEY
+        self.backend = backend or DATABASE_BACKEND
+        self.sqlite_path = sqlite_path or SQLITE_DATABASE_PATH
         self.client = None
+        # Project rows by name, so resolving known projects needs no round trip
+        self.project_cache = ProjectCache()
+        # Batched background inserts, see write_buffer
+        self._write_buffer: Optional[WriteBehindBuffer] = None
         self.initialize_client()
     
     def initialize_client(self) -> bool:
-        """Initialize Postgrest client"""
+        """Initialize Postgrest client (or its SQLite equivalent)"""
         try:
+            if self.backend == "sqlite":
+                # Same query builder API on the local schema in database/sqlite_schema.sql
+                self.client = AsyncSQLiteClient(self.sqlite_path)
+                print(f"SQLite client initialized on {self.sqlite_path}")
+                return True
+            
             if self.url == "YOUR_SUPABASE_URL" or self.key == "YOUR_SUPABASE_KEY":
                 print("WARNING: Supabase credentials not set. Using dummy client.")
                 self.client = None
@@ -59,6 +204,58 @@ class DatabaseManager:
         """Check if connected to Postgrest"""
         return self.client is not None
     
+    @property
+    def write_buffer(self) -> WriteBehindBuffer:
+        """
+        Write-behind buffer for twitter_data, ai_analysis and tokenomics rows
+        
+        Rows put into it are written in batches in the background, the
+        buffer is flushed by aclose().
+        """
+        if self._write_buffer is None:
+            self._write_buffer = WriteBehindBuffer(self)
+        return self._write_buffer
+    
+    async def aclose(self):
+        """Flush buffered writes and close the connection pool of the Postgrest client"""
+        if self._write_buffer is not None:
+            await self._write_buffer.aclose()
+        if self.client is not None:
+            await self.client.aclose()
+            # A new client (and pool) is created on the next use
+            self.initialize_client()
+    
+    def _check_project_references(self, error: Exception) -> None:
+        """Drop cached project ids when the database rejects one as unknown (foreign key violation)"""
+        if "23503" in str(error) or "foreign key" in str(error).lower():
+            self.project_cache.clear()
+    
+    async def preload_projects(self, limit: int = PROJECT_CACHE_MAX_ENTRIES) -> Dict:
+        """Fill the project cache with the most recently updated projects in one request"""
+        if not self.is_connected():
+            print("Not connected to Postgrest")
+            return {"error": "Not connected to Postgrest"}
+        
+        try:
+            result = await self.client.table(TABLE_PROJECTS).select("*") \
+                .order("last_updated", desc=True).limit(limit).execute()
+            for project in result.data or []:
+                self.project_cache.set(project)
+            return {"status": "success", "loaded": len(result.data or [])}
+                
+        except Exception as e:
+            print(f"Error preloading projects: {e}")
+            return {"error": str(e)}
+    
+    def get_project_cache_stats(self) -> Dict[str, Any]:
+        """Hit rate of the project name cache"""
+        return self.project_cache.get_stats()
+    
+    @staticmethod
+    def _batches(rows: List[Dict]) -> List[List[Dict]]:
+        """Split rows into request-sized batches"""
+        return [rows[i:i + DB_BATCH_SIZE] for i in range(0, len(rows), DB_BATCH_SIZE)]
+    
     async def add_project(self, project_name: str, token_symbol: str = None, 
                    description: str = None, website_url: str = None,
                    twitter_handle: str = None) -> Dict:
@@ -69,11 +266,17 @@ class DatabaseManager:
         
         try:
             # Check if project already exists
-            existing = await self.client.table(TABLE_PROJECTS).select("*").eq("project_name", project_name).execute()
+            cached = self.project_cache.get(project_name)
+            if cached is not None and cached is not MISSING:
+                return {"status": "exists", "data": cached}
             
-            if existing.data and len(existing.data) > 0:
-                # Project exists, return it
-                return {"status": "exists", "data": existing.data[0]}
+            if cached is None:
+                existing = await self.client.table(TABLE_PROJECTS).select("*").eq("project_name", project_name).execute()
+                
+                if existing.data and len(existing.data) > 0:
+                    # Project exists, return it
+                    self.project_cache.set(existing.data[0])
+                    return {"status": "exists", "data": existing.data[0]}
             
             # Add new project
             now = datetime.now().isoformat()
@@ -88,14 +291,54 @@ class DatabaseManager:
             }).execute()
             
             if result.data and len(result.data) > 0:
+                self.project_cache.set(result.data[0])
                 return {"status": "created", "data": result.data[0]}
             else:
                 return {"error": "Failed to create project", "details": result}
                 
         except Exception as e:
+            # A conflict means the cached "missing" was outdated
+            self.project_cache.invalidate(project_name)
             print(f"Error adding project: {e}")
             return {"error": str(e)}
     
+    @staticmethod
+    def twitter_data_row(project_id: int, tweet_data: Dict) -> Dict:
+        """twitter_data row of a scraped tweet"""
+        return {
+            "project_id": project_id,
+            "tweet_id": tweet_data.get("id"),
+            "tweet_text": tweet_data.get("text"),
+            "tweet_url": f"https://twitter.com/i/web/status/{tweet_data.get('id')}",
+            "author_name": tweet_data.get("author", {}).get("name"),
+            "author_username": tweet_data.get("author", {}).get("username"),
+            "followers_count": tweet_data.get("author", {}).get("followers_count", 0),
+            "verified": tweet_data.get("author", {}).get("verified", False),
+            "engagement_score": tweet_data.get("like_count", 0) + (tweet_data.get("retweet_count", 0) * 2),
+            "collected_at": datetime.now().isoformat()
+        }
+    
+    @staticmethod
+    def ai_analysis_row(project_id: int, analysis: Dict) -> Dict:
+        """ai_analysis row of an analysis result"""
+        # Convert supporting_entities to JSON string if it's a list
+        supporting_entities = analysis.get("supporting_entities", [])
+        if isinstance(supporting_entities, list):
+            supporting_entities = json.dumps(supporting_entities)
+        
+        return {
+            "project_id": project_id,
+            "legitimacy_score": analysis.get("legitimacy_score"),
+            "potential_score": analysis.get("potential_score"),
+            "revenue_estimate": analysis.get("revenue_estimate"),
+            "risk_level": analysis.get("risk_level"),
+            "overall_rating": analysis.get("overall_rating"),
+            "supporting_entities": supporting_entities,
+            "analysis_text": analysis.get("analysis_text"),
+            "ai_model_used": analysis.get("ai_model_used"),
+            "analysis_date": datetime.now().isoformat()
+        }
+    
     async def add_twitter_data(self, project_id: int, tweet_data: Dict) -> Dict:
         """Add Twitter data for a project"""
         if not self.is_connected():
@@ -103,18 +346,7 @@ class DatabaseManager:
             return {"error": "Not connected to Postgrest"}
         
         try:
-            data = {
-                "project_id": project_id,
-                "tweet_id": tweet_data.get("id"),
-                "tweet_text": tweet_data.get("text"),
-                "tweet_url": f"https://twitter.com/i/web/status/{tweet_data.get('id')}",
-                "author_name": tweet_data.get("author", {}).get("name"),
-                "author_username": tweet_data.get("author", {}).get("username"),
-                "followers_count": tweet_data.get("author", {}).get("followers_count", 0),
-                "verified": tweet_data.get("author", {}).get("verified", False),
-                "engagement_score": tweet_data.get("like_count", 0) + (tweet_data.get("retweet_count", 0) * 2),
-                "collected_at": datetime.now().isoformat()
-            }
+            data = self.twitter_data_row(project_id, tweet_data)
             
             result = await self.client.table(TABLE_TWITTER_DATA).insert(data).execute()
             
@@ -134,23 +366,7 @@ class DatabaseManager:
             return {"error": "Not connected to Postgrest"}
         
         try:
-            # Convert supporting_entities to JSON string if it's a list
-            supporting_entities = analysis.get("supporting_entities", [])
-            if isinstance(supporting_entities, list):
-                supporting_entities = json.dumps(supporting_entities)
-            
-            data = {
-                "project_id": project_id,
-                "legitimacy_score": analysis.get("legitimacy_score"),
-                "potential_score": analysis.get("potential_score"),
-                "revenue_estimate": analysis.get("revenue_estimate"),
-                "risk_level": analysis.get("risk_level"),
-                "overall_rating": analysis.get("overall_rating"),
-                "supporting_entities": supporting_entities,
-                "analysis_text": analysis.get("analysis_text"),
-                "ai_model_used": analysis.get("ai_model_used"),
-                "analysis_date": datetime.now().isoformat()
-            }
+            data = self.ai_analysis_row(project_id, analysis)
             
             result = await self.client.table(TABLE_AI_ANALYSIS).insert(data).execute()
             
@@ -198,59 +414,217 @@ class DatabaseManager:
             print(f"Error adding tokenomics data: {e}")
             return {"error": str(e)}
     
+    async def bulk_upsert_projects(self, projects: List[Dict]) -> Dict:
+        """
+        Resolve project ids by name, creating missing projects
+        
+        Existing projects are left unchanged: the upsert on project_name only
+        inserts new names and returns their rows, the ids of the others are
+        read in one select. The first row of a name wins.
+        
+        Returns:
+            {"status": "success", "data": {project_name: id}, "created": n}
+        """
+        if not self.is_connected():
+            print("Not connected to Postgrest")
+            return {"error": "Not connected to Postgrest"}
+        
+        try:
+            unique = {}
+            for project in projects:
+                unique.setdefault(project["project_name"], project)
+            
+            # Known projects need no round trip
+            project_ids = {}
+            for name in list(unique):
+                cached = self.project_cache.get(name)
+                if cached is not None and cached is not MISSING:
+                    project_ids[name] = cached["id"]
+                    del unique[name]
+            cached_count = len(project_ids)
+            
+            for batch in self._batches(list(unique.values())):
+                result = await self.client.table(TABLE_PROJECTS) \
+                    .upsert(batch, on_conflict="project_name", ignore_duplicates=True) \
+                    .execute()
+                for project in result.data or []:
+                    project_ids[project["project_name"]] = project["id"]
+                    self.project_cache.set(project)
+            created = len(project_ids) - cached_count
+            
+            existing = [name for name in unique if name not in project_ids]
+            for i in range(0, len(existing), DB_BATCH_SIZE):
+                result = await self.client.table(TABLE_PROJECTS) \
+                    .select("*") \
+                    .in_("project_name", existing[i:i + DB_BATCH_SIZE]) \
+                    .execute()
+                for project in result.data or []:
+                    project_ids[project["project_name"]] = project["id"]
+                    self.project_cache.set(project)
+            
+            return {"status": "success", "data": project_ids, "created": created, "cached": cached_count}
+                
+        except Exception as e:
+            for name in unique:
+                self.project_cache.invalidate(name)
+            print(f"Error upserting projects: {e}")
+            return {"error": str(e)}
+    
+    async def bulk_upsert_twitter_data(self, rows: List[Dict]) -> Dict:
+        """
+        Store Twitter data rows, skipping tweets already stored for their project
+        
+        Returns:
+            {"status": "success", "inserted": n, "skipped": m}
+        """
+        if not self.is_connected():
+            print("Not connected to Postgrest")
+            return {"error": "Not connected to Postgrest"}
+        
+        try:
+            # One row per (project_id, tweet_id)
+            unique = list({(row["project_id"], row["tweet_id"]): row for row in rows}.values())
+            inserted = 0
+            for batch in self._batches(unique):
+                result = await self.client.table(TABLE_TWITTER_DATA) \
+                    .upsert(batch, on_conflict="project_id,tweet_id", ignore_duplicates=True) \
+                    .execute()
+                inserted += len(result.data or [])
+            return {"status": "success", "inserted": inserted, "skipped": len(unique) - inserted}
+                
+        except Exception as e:
+            self._check_project_references(e)
+            print(f"Error upserting Twitter data: {e}")
+            return {"error": str(e)}
+    
+    async def bulk_add_ai_analysis(self, rows: List[Dict]) -> Dict:
+        """
+        Insert AI analysis rows in batches
+        
+        Rows already stored for their (project_id, analysis_date) are skipped,
+        so a batch can be retried after a partial failure.
+        
+        Returns:
+            {"status": "success", "data": [inserted rows]}
+        """
+        if not self.is_connected():
+            print("Not connected to Postgrest")
+            return {"error": "Not connected to Postgrest"}
+        
+        try:
+            inserted = []
+            for batch in self._batches(rows):
+                result = await self.client.table(TABLE_AI_ANALYSIS) \
+                    .upsert(batch, on_conflict="project_id,analysis_date", ignore_duplicates=True) \
+                    .execute()
+                inserted.extend(result.data or [])
+            return {"status": "success", "data": inserted}
+                
+        except Exception as e:
+            self._check_project_references(e)
+            print(f"Error adding AI analyses: {e}")
+            return {"error": str(e)}
+    
+    async def bulk_upsert_tokenomics(self, rows: List[Dict]) -> Dict:
+        """
+        Insert or update tokenomics rows, one per project (the last row of a project wins)
+        
+        Returns:
+            {"status": "success", "data": [stored rows]}
+        """
+        if not self.is_connected():
+            print("Not connected to Postgrest")
+            return {"error": "Not connected to Postgrest"}
+        
+        try:
+            unique = list({row["project_id"]: row for row in rows}.values())
+            stored = []
+            for batch in self._batches(unique):
+                result = await self.client.table(TABLE_TOKENOMICS).upsert(batch, on_conflict="project_id").execute()
+                stored.extend(result.data or [])
+            return {"status": "success", "data": stored}
+                
+        except Exception as e:
+            self._check_project_references(e)
+            print(f"Error upserting tokenomics data: {e}")
+            return {"error": str(e)}
+    
     async def get_project_by_name(self, project_name: str) -> Dict:
         """Get project by name"""
         if not self.is_connected():
             print("Not connected to Postgrest")
             return {"error": "Not connected to Postgrest"}
         
+        cached = self.project_cache.get(project_name)
+        if cached is MISSING:
+            return {"status": "not_found"}
+        if cached is not None:
+            return {"status": "success", "data": cached}
+        
         try:
             result = await self.client.table(TABLE_PROJECTS).select("*").eq("project_name", project_name).execute()
             
             if result.data and len(result.data) > 0:
+                self.project_cache.set(result.data[0])
                 return {"status": "success", "data": result.data[0]}
             else:
+                self.project_cache.set_missing(project_name)
                 return {"status": "not_found"}
                 
         except Exception as e:
             print(f"Error getting project: {e}")
             return {"error": str(e)}
     
-    async def get_project_with_details(self, project_id: int) -> Dict:
-        """Get project with all related data"""
+    async def get_project_with_details(self, project_id: int,
+                                       tweet_limit: int = PROJECT_DETAIL_TWEET_LIMIT,
+                                       market_limit: int = PROJECT_DETAIL_MARKET_LIMIT) -> Dict:
+        """
+        Get project with all related data in a single request
+        
+        Related tables are embedded in the project select. Only the latest
+        AI analysis and the most recent tweets and market data points are
+        returned, so the payload stays bounded however much data a project has.
+        
+        Args:
+            project_id: Project ID
+            tweet_limit: Maximum number of tweets, most recently collected first
+            market_limit: Maximum number of market data points, newest first
+        """
         if not self.is_connected():
             print("Not connected to Postgrest")
             return {"error": "Not connected to Postgrest"}
         
         try:
-            # Get project details
-            project = await self.client.table(TABLE_PROJECTS).select("*").eq("id", project_id).execute()
+            project = await self.client.table(TABLE_PROJECTS) \
+                .select(f"*, {TABLE_TWITTER_DATA}(*), {TABLE_AI_ANALYSIS}(*), "
+                        f"{TABLE_TOKENOMICS}(*), {TABLE_MARKET_DATA}(*)") \
+                .eq("id", project_id) \
+                .order("collected_at", desc=True, foreign_table=TABLE_TWITTER_DATA) \
+                .limit(tweet_limit, foreign_table=TABLE_TWITTER_DATA) \
+                .order("analysis_date", desc=True, foreign_table=TABLE_AI_ANALYSIS) \
+                .limit(1, foreign_table=TABLE_AI_ANALYSIS) \
+                .order("timestamp", desc=True, foreign_table=TABLE_MARKET_DATA) \
+                .limit(market_limit, foreign_table=TABLE_MARKET_DATA) \
+                .execute()
             
             if not project.data or len(project.data) == 0:
                 return {"status": "not_found"}
             
-            project_data = project.data[0]
-            
-            # Get Twitter data
-            twitter_data = await self.client.table(TABLE_TWITTER_DATA).select("*").eq("project_id", project_id).execute()
-            
-            # Get AI analysis
-            ai_analysis = await self.client.table(TABLE_AI_ANALYSIS).select("*").eq("project_id", project_id).execute()
-            
-            # Get tokenomics
-            tokenomics = await self.client.table(TABLE_TOKENOMICS).select("*").eq("project_id", project_id).execute()
-            
-            # Get market data
-            market_data = await self.client.table(TABLE_MARKET_DATA).select("*").eq("project_id", project_id).execute()
+            project_data = dict(project.data[0])
+            twitter_data = project_data.pop(TABLE_TWITTER_DATA, None)
+            ai_analysis = project_data.pop(TABLE_AI_ANALYSIS, None)
+            tokenomics = project_data.pop(TABLE_TOKENOMICS, None)
+            market_data = project_data.pop(TABLE_MARKET_DATA, None)
             
             return {
                 "status": "success", 
                 "data": {
                     "project": project_data,
-                    "twitter_data": twitter_data.data if twitter_data.data else [],
-                    "ai_analysis": ai_analysis.data[0] if ai_analysis.data and len(ai_analysis.data) > 0 else None,
-                    "tokenomics": tokenomics.data[0] if tokenomics.data and len(tokenomics.data) > 0 else None,
-                    "market_data": market_data.data if market_data.data else []
+                    "twitter_data": twitter_data or [],
+                    "ai_analysis": self._first(ai_analysis),
+                    # One-to-one embeds come back as an object instead of a list
+                    "tokenomics": self._first(tokenomics),
+                    "market_data": market_data or []
                 }
             }
                 
@@ -258,55 +632,134 @@ class DatabaseManager:
             print(f"Error getting project details: {e}")
             return {"error": str(e)}
     
-    async def get_latest_projects(self, limit: int = 10) -> Dict:
-        """Get latest projects"""
-        if not self.is_connected():
+    @staticmethod
+    def _first(embedded: Union[List[Dict], Dict, None]) -> Optional[Dict]:
+        """First row of an embedded resource"""
+        if isinstance(embedded, list):
+            return embedded[0] if embedded else None
+        return embedded
+    
+    async def get_latest_projects(self, limit: int = 10, cursor: Optional[str] = None) -> Dict:
+        """
+        Get latest projects, newest discovery first
+        
+        Args:
+            limit: Maximum number of projects
+            cursor: next_cursor of the previous page, None for the first page
+        
+        Returns:
+            Dictionary with "data" and "next_cursor" (None on the last page)
+        """
+        query = self.client.table(TABLE_PROJECTS).select("*") if self.is_connected() else None
+        return await self._keyset_page(query, LATEST_PROJECTS_ORDER, limit, cursor, "latest projects")
+
+    async def get_top_rated_projects(self, limit: int = 10, cursor: Optional[str] = None) -> Dict:
+        """
+        Get top rated projects based on their latest AI analysis
+        
+        Reads the project_rankings materialized view, which is ordered and
+        indexed server-side, so the cost does not grow with the project count.
+        
+        Args:
+            limit: Maximum number of projects
+            cursor: next_cursor of the previous page, None for the first page
+        
+        Returns:
+            Dictionary with "data" and "next_cursor" (None on the last page)
+        """
+        query = self.client.table(VIEW_PROJECT_RANKINGS) \
+            .select("id, project_name, token_symbol, overall_rating, analysis_date") if self.is_connected() else None
+        return await self._keyset_page(query, TOP_PROJECTS_ORDER, limit, cursor, "top rated projects")
+
+    async def _keyset_page(self, query, columns: tuple, limit: int, cursor: Optional[str], label: str) -> Dict:
+        """
+        Fetch one page of a listing sorted descending on columns
+        
+        Pages start after the cursor row instead of skipping rows, so every
+        page costs the same index range scan however deep it is. Rows with a
+        NULL sort key are left out, a cursor cannot point after them.
+        """
+        if query is None:
             print("Not connected to Postgrest")
             return {"error": "Not connected to Postgrest"}
         
+        if cursor:
+            try:
+                query = query.or_(keyset_filter(columns, decode_cursor(cursor, columns)))
+            except ValueError:
+                return {"status": "invalid_cursor"}
+        
         try:
-            result = await self.client.table(TABLE_PROJECTS).select("*").order("discovery_date", desc=True).limit(limit).execute()
+            for column in columns:
+                query = query.not_.is_(column, "null").order(column, desc=True)
+            # One extra row tells whether there is a next page
+            result = await query.limit(limit + 1).execute()
+            rows = result.data or []
             
-            return {"status": "success", "data": result.data}
+            next_cursor = encode_cursor(rows[limit - 1], columns) if len(rows) > limit else None
+            return {"status": "success", "data": rows[:limit], "next_cursor": next_cursor}
                 
         except Exception as e:
-            print(f"Error getting latest projects: {e}")
+            print(f"Error getting {label}: {e}")
             return {"error": str(e)}
 
-    async def get_top_rated_projects(self, limit: int = 10) -> Dict:
-        """Get top rated projects based on AI analysis"""
+    async def refresh_project_rankings(self) -> Dict:
+        """
+        Recompute the project_rankings materialized view
+        
+        The database skips the refresh if the previous one ran less than
+        30 seconds ago, since the function can be called with the anon key.
+        """
         if not self.is_connected():
             print("Not connected to Postgrest")
             return {"error": "Not connected to Postgrest"}
         
         try:
-            # Use join via filtering and select
-            projects = await self.client.table(TABLE_PROJECTS).select("*").execute()
-            analyses = await self.client.table(TABLE_AI_ANALYSIS).select("*").order("overall_rating", desc=True).limit(limit).execute()
-            
-            if not analyses.data:
-                return {"status": "success", "data": []}
-            
-            # Manually join the data
-            result = []
-            projects_dict = {p["id"]: p for p in projects.data}
-            
-            for analysis in analyses.data:
-                project_id = analysis["project_id"]
-                if project_id in projects_dict:
-                    project = projects_dict[project_id]
-                    result.append({
-                        "id": project["id"],
-                        "project_name": project["project_name"],
-                        "token_symbol": project["token_symbol"],
-                        "overall_rating": analysis["overall_rating"],
-                        "analysis_date": analysis["analysis_date"]
-                    })
+            await self.client.rpc("refresh_project_rankings", {}).execute()
+            return {"status": "success"}
+                
+        except Exception as e:
+            print(f"Error refreshing project rankings: {e}")
+            return {"error": str(e)}
+
+    async def get_projects_by_ids(self, project_ids: List[int]) -> Dict:
+        """Get projects by id, in the order of the given ids"""
+        if not self.is_connected():
+            print("Not connected to Postgrest")
+            return {"error": "Not connected to Postgrest"}
+        
+        if not project_ids:
+            return {"status": "success", "data": []}
+        
+        try:
+            result = await self.client.table(TABLE_PROJECTS).select("*").in_("id", list(project_ids)).execute()
             
-            return {"status": "success", "data": result}
+            projects_dict = {p["id"]: p for p in result.data or []}
+            return {"status": "success", "data": [projects_dict[i] for i in project_ids if i in projects_dict]}
+                
+        except Exception as e:
+            print(f"Error getting projects: {e}")
+            return {"error": str(e)}
+
+    async def get_watchlisted_projects(self, limit: int = 50) -> Dict:
+        """
+        Get the projects on the most user watchlists
+        
+        Watchlists are protected by row level security, so the watchers are
+        counted server-side by get_watchlisted_project_ids, which runs with the
+        owner's rights and returns only project ids and counts.
+        """
+        if not self.is_connected():
+            print("Not connected to Postgrest")
+            return {"error": "Not connected to Postgrest"}
+        
+        try:
+            result = await self.client.rpc("get_watchlisted_project_ids", {"max_count": limit}).execute()
+            project_ids = [row["project_id"] for row in result.data or []]
+            return await self.get_projects_by_ids(project_ids)
                 
         except Exception as e:
-            print(f"Error getting top rated projects: {e}")
+            print(f"Error getting watchlisted projects: {e}")
             return {"error": str(e)}
 
 # Initialize global database manager instance
@@ -0,0 +1,112 @@
+"""
+Request hedging helpers to cut tail latency of LLM calls
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class HedgeBudget:
+    """
+    Cap the number of duplicate (hedge) requests sent during one run
+
+    A hedge is only allowed while both the absolute limit and the ratio of
+    hedges to primary requests stay within bounds, so hedging never adds
+    more than a known amount of extra cost.
+    """
+
+    def __init__(self, max_hedges: int, max_ratio: float = 1.0):
+        """
+        Initialize the budget
+
+        Args:
+            max_hedges: Maximum hedges per run
+            max_ratio: Maximum hedges as a fraction of primary requests
+        """
+        self.max_hedges = max_hedges
+        self.max_ratio = max_ratio
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new run with a full budget"""
+        with self._lock:
+            self.requests = 0
+            self.hedges_sent = 0
+            self.hedge_wins = 0
+            self.primary_wins = 0
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def try_spend(self) -> bool:
+        """Reserve one hedge, returns False if the budget is exhausted"""
+        with self._lock:
+            if self.hedges_sent >= self.max_hedges:
+                return False
+            if self.hedges_sent + 1 > self.max_ratio * max(1, self.requests):
+                return False
+            self.hedges_sent += 1
+            return True
+
+    def record_winner(self, hedge_won: bool) -> None:
+        with self._lock:
+            if hedge_won:
+                self.hedge_wins += 1
+            else:
+                self.primary_wins += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedges_sent": self.hedges_sent,
+                "hedges_remaining": max(0, self.max_hedges - self.hedges_sent),
+                "hedge_wins": self.hedge_wins,
+                "primary_wins": self.primary_wins
+            }
+
+
+async def hedged_call(primary: Callable[[], Awaitable[Any]],
+                      hedge: Callable[[], Awaitable[Any]],
+                      delay: float,
+                      is_valid: Callable[[Any], bool],
+                      allow_hedge: Callable[[], bool]) -> Tuple[Any, bool]:
+    """
+    Run `primary` and start `hedge` if it has not answered after `delay`
+
+    The first valid result wins and the other request is cancelled. When
+    neither result is valid the primary's result is returned.
+
+    Args:
+        primary: Factory for the primary request coroutine
+        hedge: Factory for the duplicate request coroutine
+        delay: Seconds to wait for the primary before hedging
+        is_valid: Predicate deciding whether a result can be used
+        allow_hedge: Called right before hedging, e.g. to spend the budget
+
+    Returns:
+        Tuple of (result, hedge_won)
+    """
+    primary_task = asyncio.ensure_future(primary())
+    done, _ = await asyncio.wait({primary_task}, timeout=delay)
+    if done or not allow_hedge():
+        return await primary_task, False
+
+    hedge_task = asyncio.ensure_future(hedge())
+    pending = {primary_task, hedge_task}
+    primary_result: Optional[Any] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if is_valid(result):
+                    return result, task is hedge_task
+                if task is primary_task:
+                    primary_result = result
+        return primary_result, False
+    finally:
+        for task in pending:
+            task.cancel()
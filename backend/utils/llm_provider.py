@@ -0,0 +1,113 @@
+"""
+LLM provider interface used by the OpenRouter manager
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional
+
+import httpx
+
+
+class ProviderTimeout(Exception):
+    """Raised by a provider when a request exceeds its timeout"""
+
+
+class LLMProvider(ABC):
+    """
+    Transport for chat completion requests
+
+    A provider only sends requests and returns the raw HTTP response; key
+    rotation, retries, rate limits and error classification stay in the
+    manager. Responses follow the OpenAI wire format (status code, headers
+    and a JSON body with "choices" or "error").
+    """
+
+    name = "base"
+    api_base = ""
+
+    @abstractmethod
+    async def send(self, endpoint: str, payload: Dict[str, Any], key: str,
+                   method: str = "POST", timeout: Optional[float] = None) -> httpx.Response:
+        """
+        Send a single request
+
+        Args:
+            endpoint: Path below the API base, e.g. "chat/completions"
+            payload: JSON body for POST, query parameters for GET
+            key: API key for the request
+            method: HTTP method
+            timeout: Timeout for this request in seconds
+
+        Returns:
+            The HTTP response
+
+        Raises:
+            ProviderTimeout: The request timed out
+        """
+
+    async def aclose(self) -> None:
+        """Release connections held by the provider"""
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """
+    Provider for any OpenAI-compatible API (OpenRouter, local mock server)
+
+    Keeps one pooled HTTP client per event loop so connections are reused
+    across requests.
+    """
+
+    def __init__(self, api_base: str, headers: Optional[Dict[str, str]] = None,
+                 max_connections: int = 20, max_keepalive_connections: int = 10,
+                 timeout: float = 45.0, name: str = "openai-compatible"):
+        """
+        Initialize the provider
+
+        Args:
+            api_base: Base URL, e.g. "https://openrouter.ai/api/v1"
+            headers: Headers sent with every request (without Authorization)
+            max_connections: Connection pool size
+            max_keepalive_connections: Idle connections kept open
+            timeout: Default request timeout in seconds
+            name: Name shown in logs and metrics
+        """
+        self.name = name
+        self.api_base = api_base.rstrip("/")
+        self.headers = dict(headers or {})
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client, creating it for the current event loop if needed"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections
+                ),
+                timeout=self.timeout
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def send(self, endpoint: str, payload: Dict[str, Any], key: str,
+                   method: str = "POST", timeout: Optional[float] = None) -> httpx.Response:
+        url = f"{self.api_base}/{endpoint}"
+        headers = {**self.headers, "Authorization": f"Bearer {key}"}
+        client = self._get_client()
+        try:
+            if method.upper() == "POST":
+                return await client.post(url, json=payload, headers=headers, timeout=timeout or self.timeout)
+            return await client.get(url, params=payload, headers=headers, timeout=timeout or self.timeout)
+        except httpx.TimeoutException as e:
+            raise ProviderTimeout(str(e) or "Request timed out") from e
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
@@ -0,0 +1,346 @@
+"""
+Local OpenAI-compatible mock server for offline load tests and benchmarks
+
+Usage:
+    python -m utils.mock_llm_server --port 8089 --latency lognormal:0.8,0.5 --rate-429 0.05
+    OPENROUTER_API_BASE=http://127.0.0.1:8089/v1 python airdrop_pipeline.py
+"""
+import json
+import math
+import random
+import threading
+import time
+import hashlib
+import argparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Optional, Callable, Iterable
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Build a latency sampler from a spec string
+
+    Supported specs (all values in seconds):
+        fixed:S              always S
+        uniform:A,B          uniformly between A and B
+        normal:MEAN,STD      normal distribution, clamped at 0
+        lognormal:MEDIAN,SIGMA  long-tailed, typical for LLM APIs
+        exponential:MEAN     exponential distribution
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v.strip()] if args else []
+    kind = kind.strip().lower()
+
+    if kind == "fixed":
+        seconds = values[0] if values else 0.0
+        return lambda rng: seconds
+    if kind == "uniform":
+        low, high = values
+        return lambda rng: rng.uniform(low, high)
+    if kind == "normal":
+        mean, std = values
+        return lambda rng: max(0.0, rng.gauss(mean, std))
+    if kind == "lognormal":
+        median, sigma = values
+        mu = math.log(median) if median > 0 else 0.0
+        return lambda rng: rng.lognormvariate(mu, sigma)
+    if kind == "exponential":
+        mean = values[0]
+        return lambda rng: rng.expovariate(1.0 / mean) if mean > 0 else 0.0
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def _estimate_tokens(messages: Iterable[Dict[str, Any]]) -> int:
+    chars = 0
+    for message in messages:
+        content = message.get("content", "")
+        if isinstance(content, list):
+            content = "".join(part.get("text", "") for part in content if isinstance(part, dict))
+        chars += len(str(content))
+    return max(1, chars // 4)
+
+
+def _prefix_text(messages: Iterable[Dict[str, Any]]) -> str:
+    """Text of the leading system messages, i.e. what a provider could cache"""
+    parts = []
+    for message in messages:
+        if message.get("role") != "system":
+            break
+        content = message.get("content", "")
+        if isinstance(content, list):
+            content = "".join(part.get("text", "") for part in content if isinstance(part, dict))
+        parts.append(str(content))
+    return "".join(parts)
+
+
+class MockLLMServer:
+    """
+    OpenAI-compatible chat completion server with fault injection
+
+    Answers /v1/chat/completions with a JSON analysis that satisfies the
+    tweet and project analysis prompts, reports usage (including cached
+    prompt tokens for repeated system prompts) and rate-limit headers, and
+    injects 429, 402, 5xx and malformed JSON responses at configurable rates.
+    Counters are available at /mock/stats.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 latency: str = "fixed:0.2",
+                 model_latency: Optional[Dict[str, str]] = None,
+                 rate_429: float = 0.0, rate_402: float = 0.0,
+                 rate_500: float = 0.0, rate_malformed: float = 0.0,
+                 failing_models: Iterable[str] = (),
+                 retry_after: float = 1.0,
+                 seed: Optional[int] = None):
+        """
+        Initialize the server
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            latency: Latency spec for all models (see parse_latency)
+            model_latency: Latency specs for specific models
+            rate_429: Share of requests answered with 429 Too Many Requests
+            rate_402: Share of requests answered with 402 Payment Required
+                (paid models only, like exhausted credits)
+            rate_500: Share of requests answered with 502 Bad Gateway
+            rate_malformed: Share of 200 responses with a body that is not JSON
+            failing_models: Models that always answer with a model error
+            retry_after: Retry-After seconds sent with 429 responses
+            seed: Random seed for reproducible runs
+        """
+        self.host = host
+        self.port = port
+        self.latency = parse_latency(latency)
+        self.model_latency = {m: parse_latency(s) for m, s in (model_latency or {}).items()}
+        self.rate_429 = rate_429
+        self.rate_402 = rate_402
+        self.rate_500 = rate_500
+        self.rate_malformed = rate_malformed
+        self.failing_models = set(failing_models)
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._seen_prefixes = set()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self.reset_stats()
+
+    @property
+    def url(self) -> str:
+        """API base to use as OPENROUTER_API_BASE"""
+        return f"http://{self.host}:{self.port}/v1"
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats = {
+                "requests": 0,
+                "success": 0,
+                "rate_limited": 0,
+                "payment_required": 0,
+                "server_errors": 0,
+                "malformed": 0,
+                "model_errors": 0,
+                "models": {}
+            }
+
+    def _count(self, field: str, model: Optional[str] = None) -> None:
+        with self._lock:
+            self.stats[field] += 1
+            if model:
+                self.stats["models"][model] = self.stats["models"].get(model, 0) + 1
+
+    def _roll(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def _sample_latency(self, model: str) -> float:
+        sampler = self.model_latency.get(model, self.latency)
+        with self._lock:
+            return sampler(self._rng)
+
+    def _completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        model = payload.get("model", "mock-model")
+        messages = payload.get("messages", [])
+        with self._lock:
+            confidence = round(self._rng.uniform(0.4, 1.0), 2)
+            legitimate = self._rng.choice(["Yes", "No", "Maybe"])
+            risk = self._rng.choice(["Low", "Medium", "High"])
+        content = json.dumps({
+            "is_legitimate": legitimate,
+            "related_crypto": "MockChain",
+            "required_action": "Follow the account and join the community",
+            "risk_level": risk,
+            "risk_explanation": "Generated by the mock server",
+            "estimated_value": "Unknown",
+            "claim_steps": ["Step 1", "Step 2"],
+            "additional_notes": "",
+            "confidence": confidence,
+            "legitimacy_score": 6,
+            "recommendation": "Monitor"
+        })
+
+        prompt_tokens = _estimate_tokens(messages)
+        prefix = _prefix_text(messages)
+        cached_tokens = 0
+        if prefix:
+            digest = hashlib.sha256(f"{model}:{prefix}".encode("utf-8")).hexdigest()
+            with self._lock:
+                if digest in self._seen_prefixes:
+                    cached_tokens = min(prompt_tokens, len(prefix) // 4)
+                self._seen_prefixes.add(digest)
+        completion_tokens = max(1, len(content) // 4)
+        return {
+            "id": f"mock-{int(time.time() * 1000)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens}
+            }
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+                data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    models = sorted(set(server.stats["models"]) | {"mock-model"})
+                    self._send(200, {"data": [{"id": m} for m in models]})
+                elif self.path.startswith("/mock/stats"):
+                    with server._lock:
+                        self._send(200, json.loads(json.dumps(server.stats)))
+                else:
+                    self._send(404, {"error": {"code": 404, "message": "Not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                if self.path.startswith("/mock/reset"):
+                    server.reset_stats()
+                    self._send(200, {"success": True})
+                    return
+                if not self.path.rstrip("/").endswith("chat/completions"):
+                    self._send(404, {"error": {"code": 404, "message": "Not found"}})
+                    return
+                try:
+                    payload = json.loads(raw or b"{}")
+                except ValueError:
+                    self._send(400, {"error": {"code": 400, "message": "Invalid JSON body"}})
+                    return
+
+                model = payload.get("model", "mock-model")
+                server._count("requests", model)
+                time.sleep(server._sample_latency(model))
+                reset_ms = str(int((time.time() + 60) * 1000))
+
+                if model in server.failing_models:
+                    server._count("model_errors")
+                    self._send(404, {"error": {"code": 404, "message": f"No endpoints found for model {model}"}})
+                    return
+                roll = server._roll()
+                if roll < server.rate_429:
+                    server._count("rate_limited")
+                    self._send(429, {"error": {"code": 429, "message": "Rate limit exceeded: too many requests"}},
+                               {"Retry-After": str(server.retry_after),
+                                "X-RateLimit-Limit": "20",
+                                "X-RateLimit-Remaining": "0",
+                                "X-RateLimit-Reset": reset_ms})
+                    return
+                roll -= server.rate_429
+                if roll < server.rate_402 and not model.endswith(":free"):
+                    server._count("payment_required")
+                    self._send(402, {"error": {"code": 402, "message": "Insufficient credits for this request"}})
+                    return
+                roll -= server.rate_402
+                if roll < server.rate_500:
+                    server._count("server_errors")
+                    self._send(502, {"error": {"code": 502, "message": "Upstream provider error"}})
+                    return
+                roll -= server.rate_500
+                if roll < server.rate_malformed:
+                    server._count("malformed")
+                    self._send(200, b'{"choices": [{"message": {"content": "trunc')
+                    return
+
+                server._count("success")
+                self._send(200, server._completion(payload),
+                           {"X-RateLimit-Limit": "1000",
+                            "X-RateLimit-Remaining": "999",
+                            "X-RateLimit-Reset": reset_ms})
+
+        return Handler
+
+    def start(self) -> "MockLLMServer":
+        """Start serving in a background thread"""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "MockLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default="fixed:0.2", help="e.g. fixed:0.2, uniform:0.1,1, lognormal:0.8,0.5")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-402", type=float, default=0.0)
+    parser.add_argument("--rate-500", type=float, default=0.0)
+    parser.add_argument("--rate-malformed", type=float, default=0.0)
+    parser.add_argument("--failing-model", action="append", default=[])
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = MockLLMServer(args.host, args.port, latency=args.latency,
+                           rate_429=args.rate_429, rate_402=args.rate_402,
+                           rate_500=args.rate_500, rate_malformed=args.rate_malformed,
+                           failing_models=args.failing_model, seed=args.seed).start()
+    print(f"Mock LLM server listening on {server.url}")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Difficulty-based model cascade for OpenRouter requests
+"""
+from typing import Dict, List, Any, Optional, Callable, Iterable, AsyncIterator
+
+
+class ModelCascade:
+    """
+    Answer every prompt with the cheapest tier first and escalate only the
+    uncertain ones
+
+    A response is accepted when it parses, carries a confidence at or above
+    the threshold and passes the caller's consistency check. Everything else
+    is sent again to the next tier; the last tier's answer is always kept.
+    """
+
+    def __init__(self, manager, tiers: List[str], confidence_threshold: float = 0.7):
+        """
+        Initialize the cascade
+
+        Args:
+            manager: OpenRouterManager used for the requests
+            tiers: Model aliases or names, cheapest first
+            confidence_threshold: Minimum confidence (0-1) to accept an answer
+        """
+        self.manager = manager
+        self.tiers = list(tiers)
+        self.confidence_threshold = confidence_threshold
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Reset the per-tier counters"""
+        self.stats = {
+            tier: {"calls": 0, "accepted": 0, "escalated": 0, "failed": 0, "latency_total": 0.0}
+            for tier in self.tiers
+        }
+        self.escalation_reasons: Dict[str, int] = {}
+        self.requests = 0
+
+    @staticmethod
+    def _confidence(result: Dict[str, Any]) -> Optional[float]:
+        """Read the confidence field, accepting 0-1 as well as percentages"""
+        try:
+            confidence = float(result.get("confidence"))
+        except (TypeError, ValueError):
+            return None
+        return confidence / 100.0 if confidence > 1 else confidence
+
+    @staticmethod
+    def _latency(response: Dict[str, Any]) -> float:
+        """Time spent on a response according to its attempt log"""
+        attempts = response.get("attempt_log", []) if isinstance(response, dict) else []
+        return sum(a.get("latency", 0.0) + a.get("delay", 0.0) for a in attempts)
+
+    def _escalation_reason(self, result: Optional[Dict[str, Any]],
+                           check: Optional[Callable[[Dict[str, Any]], Optional[str]]]) -> Optional[str]:
+        if not result or "error" in result:
+            return "invalid_response"
+        confidence = self._confidence(result)
+        if confidence is None:
+            return "missing_confidence"
+        if confidence < self.confidence_threshold:
+            return "low_confidence"
+        return check(result) if check else None
+
+    async def run_many(self,
+                       requests: Iterable[Dict[str, Any]],
+                       parse: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+                       check: Optional[Callable[[int, Dict[str, Any]], Optional[str]]] = None,
+                       concurrency: int = 4) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run a batch of prompts through the cascade
+
+        Each tier is sent as one concurrent batch, so escalations of a tier
+        are processed together after it finished.
+
+        Args:
+            requests: Keyword arguments for chat_completion without "model"
+            parse: Turns a response into the result dict (None if unusable)
+            check: Optional consistency check per request index, returns an
+                escalation reason or None when the result is plausible
+            concurrency: Maximum number of requests in flight per tier
+
+        Yields:
+            Dictionaries with "index", "result", the answering "tier" and the
+            "escalation_reason" that led there (None for the first tier)
+        """
+        requests = list(requests)
+        self.requests += len(requests)
+        pending = list(range(len(requests)))
+        reasons: Dict[int, str] = {}
+
+        for level, tier in enumerate(self.tiers):
+            if not pending:
+                break
+            last_tier = level == len(self.tiers) - 1
+            batch = [{**requests[i], "model": tier} for i in pending]
+            escalate = []
+
+            async for item in self.manager.chat_completion_many(batch, concurrency=concurrency):
+                index = pending[item["index"]]
+                response = item["response"]
+                tier_stats = self.stats[tier]
+                tier_stats["calls"] += 1
+                tier_stats["latency_total"] += self._latency(response)
+                result = parse(response)
+
+                if not last_tier:
+                    reason = self._escalation_reason(
+                        result, (lambda r, i=index: check(i, r)) if check else None
+                    )
+                    if reason:
+                        tier_stats["escalated"] += 1
+                        self.escalation_reasons[reason] = self.escalation_reasons.get(reason, 0) + 1
+                        reasons[index] = reason
+                        escalate.append(index)
+                        continue
+
+                if result and "error" not in result:
+                    tier_stats["accepted"] += 1
+                else:
+                    tier_stats["failed"] += 1
+                yield {"index": index, "result": result, "tier": tier, "escalation_reason": reasons.get(index)}
+
+            if escalate:
+                print(f"[KASKADE] {len(escalate)} permintaan dinaikkan dari model {tier} ke tingkat berikutnya")
+            pending = sorted(escalate)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get call share, acceptance and latency per tier"""
+        total_calls = sum(s["calls"] for s in self.stats.values())
+        escalated = sum(s["escalated"] for s in self.stats.values())
+        tiers = {}
+        for tier, s in self.stats.items():
+            tiers[tier] = {
+                "calls": s["calls"],
+                "call_share": round(s["calls"] / total_calls, 3) if total_calls else 0.0,
+                "accepted": s["accepted"],
+                "escalated": s["escalated"],
+                "failed": s["failed"],
+                "avg_latency": round(s["latency_total"] / s["calls"], 3) if s["calls"] else None
+            }
+        return {
+            "requests": self.requests,
+            "escalation_rate": round(escalated / self.requests, 3) if self.requests else 0.0,
+            "escalation_reasons": dict(self.escalation_reasons),
+            "tiers": tiers
+        }
@@ -0,0 +1,231 @@
+"""
+Model health tracking and circuit breaker for OpenRouter models
+"""
+import time
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Any, Iterable
+
+# Circuit breaker states
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class ModelHealth:
+    """Rolling latency and error statistics for a single model"""
+
+    def __init__(self, model: str, alpha: float = 0.3, window: int = 50):
+        """
+        Initialize health statistics
+
+        Args:
+            model: Full model name
+            alpha: Smoothing factor for the latency EWMA
+            window: Number of recent requests kept for percentiles and error rate
+        """
+        self.model = model
+        self.alpha = alpha
+        self.ewma_latency: Optional[float] = None
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.total_requests = 0
+        self.total_failures = 0
+        self.state = CIRCUIT_CLOSED
+        self.opened_at = 0.0
+        self.probe_started_at: Optional[float] = None
+
+    def record_success(self, latency: float) -> None:
+        self.total_requests += 1
+        self.consecutive_failures = 0
+        self.outcomes.append(True)
+        self.latencies.append(latency)
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency = self.alpha * latency + (1 - self.alpha) * self.ewma_latency
+
+    def record_failure(self, latency: Optional[float] = None) -> None:
+        self.total_requests += 1
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        self.outcomes.append(False)
+        if latency is not None:
+            # Slow failures still tell us something about the model's latency
+            self.latencies.append(latency)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1 - (sum(1 for ok in self.outcomes if ok) / len(self.outcomes))
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Latency at the given percentile (0-100) over the rolling window"""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+        return ordered[index]
+
+
+class ModelRouter:
+    """
+    Rank models by expected latency and success rate
+
+    Each model has a circuit breaker: after `failure_threshold` consecutive
+    failures the circuit opens and the model is skipped. Once `open_seconds`
+    have passed a single probe request is let through (half-open); a success
+    closes the circuit again, a failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 3, open_seconds: float = 120.0,
+                 default_latency: float = 10.0, alpha: float = 0.3, window: int = 50):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.default_latency = default_latency
+        self.alpha = alpha
+        self.window = window
+        self._models: Dict[str, ModelHealth] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, model: str) -> ModelHealth:
+        health = self._models.get(model)
+        if health is None:
+            health = ModelHealth(model, alpha=self.alpha, window=self.window)
+            self._models[model] = health
+        return health
+
+    def is_available(self, model: str) -> bool:
+        """Check without side effects whether the model may receive traffic"""
+        with self._lock:
+            health = self._models.get(model)
+            if health is None or health.state == CIRCUIT_CLOSED:
+                return True
+            now = time.time()
+            if health.state == CIRCUIT_OPEN:
+                return now - health.opened_at >= self.open_seconds
+            # Half-open: only one probe at a time, unless the probe got lost
+            return health.probe_started_at is None or now - health.probe_started_at >= self.open_seconds
+
+    def allow_request(self, model: str) -> bool:
+        """Check whether a request may be sent, claiming the half-open probe if needed"""
+        with self._lock:
+            health = self._get(model)
+            if health.state == CIRCUIT_CLOSED:
+                return True
+            now = time.time()
+            if health.state == CIRCUIT_OPEN:
+                if now - health.opened_at < self.open_seconds:
+                    return False
+                health.state = CIRCUIT_HALF_OPEN
+                health.probe_started_at = now
+                print(f"[SISTEM] Menguji kembali model {model} setelah jeda (half-open)")
+                return True
+            if health.probe_started_at is None or now - health.probe_started_at >= self.open_seconds:
+                health.probe_started_at = now
+                return True
+            return False
+
+    def probe_started(self, model: str) -> Optional[float]:
+        """Start time of the half-open probe in flight, None while the circuit is closed"""
+        with self._lock:
+            health = self._models.get(model)
+            if health is None or health.state != CIRCUIT_HALF_OPEN:
+                return None
+            return health.probe_started_at
+
+    def release_probe(self, model: str, started_at: Optional[float]) -> None:
+        """
+        Free the half-open probe slot claimed at started_at without an outcome
+
+        Used when the probe ends in a way that says nothing about the model
+        (rate or credit limits, auth errors, cancellation), so the next request
+        can probe right away instead of waiting another open_seconds.
+        """
+        if started_at is None:
+            return
+        with self._lock:
+            health = self._models.get(model)
+            if health is not None and health.state == CIRCUIT_HALF_OPEN and health.probe_started_at == started_at:
+                health.probe_started_at = None
+
+    def record_success(self, model: str, latency: float) -> None:
+        with self._lock:
+            health = self._get(model)
+            health.record_success(latency)
+            if health.state != CIRCUIT_CLOSED:
+                print(f"[SISTEM] Model {model} kembali sehat. Circuit ditutup")
+            health.state = CIRCUIT_CLOSED
+            health.probe_started_at = None
+
+    def record_failure(self, model: str, latency: Optional[float] = None) -> None:
+        with self._lock:
+            health = self._get(model)
+            health.record_failure(latency)
+            if health.state == CIRCUIT_HALF_OPEN or (
+                health.state == CIRCUIT_CLOSED and health.consecutive_failures >= self.failure_threshold
+            ):
+                health.state = CIRCUIT_OPEN
+                health.opened_at = time.time()
+                health.probe_started_at = None
+                print(f"[SISTEM] Model {model} gagal {health.consecutive_failures}x berturut-turut. Circuit dibuka selama {self.open_seconds:.0f} detik")
+
+    def expected_latency(self, model: str) -> float:
+        """Expected time to a successful answer, penalized by the error rate"""
+        with self._lock:
+            health = self._models.get(model)
+            if health is None or health.ewma_latency is None:
+                latency = self.default_latency
+                error_rate = health.error_rate if health else 0.0
+            else:
+                latency = health.ewma_latency
+                error_rate = health.error_rate
+        success_rate = max(0.05, 1 - error_rate)
+        return latency / success_rate
+
+    def latency_percentile(self, model: str, pct: float) -> Optional[float]:
+        """Observed latency percentile for a model, None without samples"""
+        with self._lock:
+            health = self._models.get(model)
+            return health.percentile(pct) if health else None
+
+    def sample_count(self, model: str) -> int:
+        """Number of latency samples in the rolling window"""
+        with self._lock:
+            health = self._models.get(model)
+            return len(health.latencies) if health else 0
+
+    def rank(self, candidates: Iterable[str]) -> List[str]:
+        """Order available candidates by expected latency, fastest first"""
+        unique = list(dict.fromkeys(candidates))
+        available = [m for m in unique if self.is_available(m)]
+        return sorted(available, key=lambda m: (self.expected_latency(m), unique.index(m)))
+
+    def order(self, primary: str, fallbacks: Iterable[str]) -> List[str]:
+        """
+        Candidate list for a request: the requested model first while its
+        circuit allows traffic, then the healthy fallbacks ranked
+        """
+        ranked = self.rank(m for m in fallbacks if m != primary)
+        if self.is_available(primary):
+            return [primary] + ranked
+        return ranked
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get health statistics for all models seen so far"""
+        with self._lock:
+            models = list(self._models.values())
+        return {
+            health.model: {
+                "state": health.state,
+                "ewma_latency": round(health.ewma_latency, 3) if health.ewma_latency is not None else None,
+                "p95_latency": round(health.percentile(95), 3) if health.latencies else None,
+                "error_rate": round(health.error_rate, 3),
+                "consecutive_failures": health.consecutive_failures,
+                "total_requests": health.total_requests,
+                "total_failures": health.total_failures
+            }
+            for health in models
+        }
@@ -3,19 +3,26 @@ OpenRouter configuration and API key management
 """
 import os
 import json
+import atexit
 import random
+import asyncio
+import threading
 from typing import Dict, List, Optional, Any
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Create data directory if it doesn't exist
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
 os.makedirs(DATA_DIR, exist_ok=True)
 
 # Path to the API keys file
-API_KEYS_FILE = os.path.join(DATA_DIR, "openrouter_keys.json")
+API_KEYS_FILE = os.environ.get("OPENROUTER_KEYS_FILE", os.path.join(DATA_DIR, "openrouter_keys.json"))
 
-# Default configuration for OpenRouter API
-OPENROUTER_API_BASE = "https://openrouter.ai/api/v1"
+# Path to the local token/cost usage store
+USAGE_STATS_FILE = os.environ.get("OPENROUTER_USAGE_FILE", os.path.join(DATA_DIR, "usage_stats.json"))
+
+# Default configuration for OpenRouter API. Point OPENROUTER_API_BASE at any
+# OpenAI-compatible server (e.g. utils/mock_llm_server.py) for offline runs.
+OPENROUTER_API_BASE = os.environ.get("OPENROUTER_API_BASE", "https://openrouter.ai/api/v1")
 
 # Model configurations including free models
 OPENROUTER_MODELS = {
@@ -39,6 +46,74 @@ OPENROUTER_MODELS = {
     "free-code": "mistralai/mistral-7b-instruct:free",          # For code generation
 }
 
+# Pricing in USD per million tokens, used when a response carries no cost.
+# Free models (":free") are always counted as zero.
+MODEL_PRICING = {
+    "anthropic/claude-3-haiku": {"prompt": 0.25, "completion": 1.25},
+    "anthropic/claude-3-sonnet": {"prompt": 3.0, "completion": 15.0},
+    "anthropic/claude-3-opus": {"prompt": 15.0, "completion": 75.0},
+    "openai/gpt-3.5-turbo": {"prompt": 0.5, "completion": 1.5},
+    "openai/gpt-4-turbo": {"prompt": 10.0, "completion": 30.0},
+}
+
+# Spending budgets. Once usage reaches BUDGET_DOWNGRADE_RATIO of any budget,
+# paid models are replaced by free ones instead of waiting for a 402.
+DAILY_COST_BUDGET_USD = 2.0
+RUN_COST_BUDGET_USD = 0.5
+DAILY_TOKEN_BUDGET = None          # None = no token limit
+BUDGET_DOWNGRADE_RATIO = 0.9
+
+# Maximum estimated tokens of variable prompt input (tweet text, project data)
+# per model; longer inputs are truncated, longest fields first
+MODEL_INPUT_TOKEN_BUDGETS = {
+    "anthropic/claude-3-haiku": 4000,
+    "anthropic/claude-3-sonnet": 6000,
+    "anthropic/claude-3-opus": 6000,
+    "openai/gpt-3.5-turbo": 3000,
+    "openai/gpt-4-turbo": 6000,
+}
+DEFAULT_INPUT_TOKEN_BUDGET = 3000
+FREE_MODEL_INPUT_TOKEN_BUDGET = 2000
+
+# Model prefixes that need explicit cache_control breakpoints for prompt
+# caching. Other providers cache repeated prompt prefixes automatically.
+PROMPT_CACHE_CONTROL_PREFIXES = ("anthropic/", "google/gemini")
+
+# Free models tried as fallback when the requested model fails.
+# The order here is only a tie-breaker, the model router ranks them by health.
+FALLBACK_MODELS = [
+    OPENROUTER_MODELS["free-mistral"],
+    OPENROUTER_MODELS["free-llama"],
+    OPENROUTER_MODELS["free-gemini"],
+    OPENROUTER_MODELS["free-deepseek-v3"],
+]
+
+# Circuit breaker settings for the model router
+CIRCUIT_FAILURE_THRESHOLD = 3     # Consecutive failures before a model is skipped
+CIRCUIT_OPEN_SECONDS = 120        # How long to skip a model before probing it again
+
+# Retry plan for a single call: attempts across models x keys are bounded by
+# an attempt budget and one total deadline
+RETRY_MAX_ATTEMPTS = 6
+RETRY_TOTAL_DEADLINE_SECONDS = 90
+RETRY_BASE_BACKOFF_SECONDS = 0.5
+RETRY_MAX_BACKOFF_SECONDS = 8
+REQUEST_TIMEOUT_SECONDS = 45       # Upper bound for one request to OpenRouter
+
+# Shared HTTP connection pool and bulk completion defaults
+HTTP_MAX_CONNECTIONS = 20
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 10
+BULK_DEFAULT_CONCURRENCY = 4       # Parallel requests in chat_completion_many
+
+# Request hedging: send a duplicate to another healthy model when the
+# primary is slower than its usual latency percentile
+HEDGE_ENABLED = False
+HEDGE_LATENCY_PERCENTILE = 95      # Hedge once the primary exceeds this percentile
+HEDGE_MIN_SAMPLES = 5              # Samples needed before the learned percentile is trusted
+HEDGE_DEFAULT_DELAY_SECONDS = 15   # Delay used until enough samples are collected
+HEDGE_MAX_PER_RUN = 20             # Maximum duplicate requests per pipeline run
+HEDGE_MAX_RATIO = 0.1              # Maximum duplicates as a fraction of requests
+
 # Default headers for OpenRouter API requests
 DEFAULT_HEADERS = {
     "Content-Type": "application/json",
@@ -52,33 +127,91 @@ DEFAULT_HEADERS = {
     "Data-Policy-4": "on"   # Allow responses to be shared with model providers
 }
 
+# Cooldown durations (in seconds) for throttled API keys
+# Transient 429 responses recover quickly, exhausted credits need much longer
+RATE_LIMIT_COOLDOWN_SECONDS = 60
+CREDIT_EXHAUSTED_COOLDOWN_SECONDS = 60 * 60 * 6
+
 # Initialize with provided API key
 DEFAULT_API_KEYS = [
     {
         "key": "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",
         "limit_reached": False,
+        "limited_until": None,
+        "limit_reason": None,
         "last_used": None,
         "usage_count": 0
     }
 ]
 
+# Key state lives in memory; changes reach the file at most this often
+KEYS_SAVE_DELAY_SECONDS = 2.0
+
+_keys_lock = threading.Lock()
+_keys: Optional[List[Dict[str, Any]]] = None
+_keys_dirty = False
+_keys_save_scheduled = False
+
+def flush_api_keys() -> None:
+    """Write the key state to the file now if it changed"""
+    global _keys_dirty, _keys_save_scheduled
+    with _keys_lock:
+        _keys_save_scheduled = False
+        if not _keys_dirty or _keys is None:
+            return
+        snapshot = json.dumps(_keys, indent=2)
+        _keys_dirty = False
+    try:
+        with open(API_KEYS_FILE, "w") as f:
+            f.write(snapshot)
+    except IOError as e:
+        print(f"Error writing API keys: {e}")
+
+atexit.register(flush_api_keys)
+
 def save_api_keys(keys: List[Dict[str, Any]]) -> None:
-    """Save API keys to file"""
-    with open(API_KEYS_FILE, "w") as f:
-        json.dump(keys, f, indent=2)
+    """
+    Replace the key state
+
+    Inside an event loop the file is written shortly afterwards by a timer
+    thread, so a burst of changes (usage counts on every request) costs one
+    write and never blocks the loop. The timer does not depend on the loop,
+    so the write still happens when the loop closes first. Outside of a loop
+    the file is written right away.
+    """
+    global _keys, _keys_dirty, _keys_save_scheduled
+    with _keys_lock:
+        _keys = keys
+        _keys_dirty = True
+        try:
+            asyncio.get_running_loop()
+            in_loop = True
+        except RuntimeError:
+            in_loop = False
+        if in_loop:
+            if not _keys_save_scheduled:
+                _keys_save_scheduled = True
+                timer = threading.Timer(KEYS_SAVE_DELAY_SECONDS, flush_api_keys)
+                timer.daemon = True
+                timer.start()
+            return
+    flush_api_keys()
 
 def load_api_keys() -> List[Dict[str, Any]]:
-    """Load API keys from file or initialize with default"""
-    if not os.path.exists(API_KEYS_FILE):
-        save_api_keys(DEFAULT_API_KEYS)
-        return DEFAULT_API_KEYS
-    
-    try:
-        with open(API_KEYS_FILE, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        save_api_keys(DEFAULT_API_KEYS)
-        return DEFAULT_API_KEYS
+    """Get the key state, read from the file (or initialized with the default) on first use"""
+    global _keys
+    with _keys_lock:
+        if _keys is not None:
+            return _keys
+        try:
+            with open(API_KEYS_FILE, "r") as f:
+                _keys = json.load(f)
+            return _keys
+        except (json.JSONDecodeError, FileNotFoundError):
+            pass
+    keys = [dict(k) for k in DEFAULT_API_KEYS]
+    save_api_keys(keys)
+    return keys
 
 def add_api_key(key: str) -> None:
     """Add a new API key to the rotation"""
@@ -91,6 +224,8 @@ def add_api_key(key: str) -> None:
     keys.append({
         "key": key,
         "limit_reached": False,
+        "limited_until": None,
+        "limit_reason": None,
         "last_used": None,
         "usage_count": 0
     })
@@ -103,20 +238,61 @@ def remove_api_key(key: str) -> None:
     keys = [k for k in keys if k["key"] != key]
     save_api_keys(keys)
 
-def mark_key_limit_reached(key: str) -> None:
-    """Mark a key as having reached its limit"""
+def mark_key_limit_reached(key: str, cooldown_seconds: Optional[float] = None,
+                           reason: Optional[str] = None) -> None:
+    """
+    Mark a key as having reached its limit
+
+    Args:
+        key: The API key to mark
+        cooldown_seconds: When set, the key recovers automatically after this
+            many seconds. Without it the key stays limited until reset.
+        reason: Short description of the limit (e.g. "rate_limit", "credits")
+    """
     keys = load_api_keys()
+    limited_until = None
+    if cooldown_seconds is not None:
+        limited_until = (datetime.now() + timedelta(seconds=cooldown_seconds)).isoformat()
     for k in keys:
         if k["key"] == key:
             k["limit_reached"] = True
+            k["limited_until"] = limited_until
+            k["limit_reason"] = reason
     save_api_keys(keys)
 
-def get_next_available_key() -> Optional[str]:
-    """Get the next available API key for rotation"""
+def _recover_expired_keys(keys: List[Dict[str, Any]]) -> bool:
+    """Clear the limit of keys whose cooldown has passed, returns True if any changed"""
+    now = datetime.now()
+    changed = False
+    for k in keys:
+        limited_until = k.get("limited_until")
+        if not k.get("limit_reached") or not limited_until:
+            continue
+        try:
+            expired = datetime.fromisoformat(limited_until) <= now
+        except ValueError:
+            expired = True
+        if expired:
+            k["limit_reached"] = False
+            k["limited_until"] = None
+            k["limit_reason"] = None
+            changed = True
+    return changed
+
+def get_next_available_key(exclude: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Get the next available API key for rotation
+
+    Args:
+        exclude: Keys to skip (e.g. keys that are throttled for the current model)
+    """
     keys = load_api_keys()
-    available_keys = [k for k in keys if not k["limit_reached"]]
+    _recover_expired_keys(keys)
+    excluded = set(exclude or [])
+    available_keys = [k for k in keys if not k["limit_reached"] and k["key"] not in excluded]
     
     if not available_keys:
+        save_api_keys(keys)
         return None
     
     # Sort by usage count and last used
@@ -132,22 +308,35 @@ def get_next_available_key() -> Optional[str]:
     save_api_keys(keys)
     return selected_key["key"]
 
+def get_available_keys() -> List[str]:
+    """Get all keys that are currently not limited"""
+    keys = load_api_keys()
+    if _recover_expired_keys(keys):
+        save_api_keys(keys)
+    return [k["key"] for k in keys if not k["limit_reached"]]
+
 def reset_all_keys() -> None:
     """Reset all keys to not limited state"""
     keys = load_api_keys()
     for k in keys:
         k["limit_reached"] = False
+        k["limited_until"] = None
+        k["limit_reason"] = None
     save_api_keys(keys)
 
 def get_all_keys_status() -> List[Dict[str, Any]]:
     """Get status of all API keys"""
     keys = load_api_keys()
+    if _recover_expired_keys(keys):
+        save_api_keys(keys)
     # Return without actual API keys for security
     return [
         {
             "id": i+1,
             "key_hint": f"{k['key'][:8]}...{k['key'][-4:]}",
             "limit_reached": k["limit_reached"],
+            "limited_until": k.get("limited_until"),
+            "limit_reason": k.get("limit_reason"),
             "last_used": k["last_used"],
             "usage_count": k["usage_count"]
         } for i, k in enumerate(keys)
@@ -3,31 +3,76 @@ OpenRouter API Manager with API key rotation
 """
 import os
 import json
-import httpx
 import asyncio
-from typing import Dict, List, Optional, Any, Union
+import time
+from typing import Dict, List, Optional, Any, Union, AsyncIterator, Iterable
 from datetime import datetime
 
 from .openrouter_config import (
     OPENROUTER_API_BASE,
     OPENROUTER_MODELS,
     DEFAULT_HEADERS,
+    RATE_LIMIT_COOLDOWN_SECONDS,
+    CREDIT_EXHAUSTED_COOLDOWN_SECONDS,
+    FALLBACK_MODELS,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_OPEN_SECONDS,
+    HEDGE_ENABLED,
+    HEDGE_LATENCY_PERCENTILE,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_DEFAULT_DELAY_SECONDS,
+    HEDGE_MAX_PER_RUN,
+    HEDGE_MAX_RATIO,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_TOTAL_DEADLINE_SECONDS,
+    RETRY_BASE_BACKOFF_SECONDS,
+    RETRY_MAX_BACKOFF_SECONDS,
+    REQUEST_TIMEOUT_SECONDS,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    BULK_DEFAULT_CONCURRENCY,
+    USAGE_STATS_FILE,
+    MODEL_PRICING,
+    DAILY_COST_BUDGET_USD,
+    RUN_COST_BUDGET_USD,
+    DAILY_TOKEN_BUDGET,
+    BUDGET_DOWNGRADE_RATIO,
+    PROMPT_CACHE_CONTROL_PREFIXES,
+    MODEL_INPUT_TOKEN_BUDGETS,
+    DEFAULT_INPUT_TOKEN_BUDGET,
+    FREE_MODEL_INPUT_TOKEN_BUDGET,
     get_next_available_key,
+    get_available_keys,
+    flush_api_keys,
     mark_key_limit_reached,
     reset_all_keys
 )
+from .rate_limiter import RateLimitTracker
+from .model_router import ModelRouter
+from .hedging import HedgeBudget, hedged_call
+from .single_flight import SingleFlight, make_request_key
+from .retry_planner import RetryPlanner
+from .usage_tracker import UsageTracker
+from .prompt_templates import create_default_registry
+from .llm_provider import LLMProvider, OpenAICompatibleProvider, ProviderTimeout
+from .cache_manager import AnalysisCache, REFRESH_BATCH_SIZE, REFRESH_INTERVAL_SECONDS
+
+# Attempt outcomes that _send_once records in the model's health statistics
+MODEL_HEALTH_OUTCOMES = ("success", "error", "timeout", "model_error")
 
 class OpenRouterManager:
     """Manager for OpenRouter API with key rotation capability"""
     
-    def __init__(self, prefer_free=False):
+    def __init__(self, prefer_free=False, hedge=HEDGE_ENABLED, provider: Optional[LLMProvider] = None):
         """
         Initialize the OpenRouter manager
         
         Args:
             prefer_free: Whether to prefer using free models by default
+            hedge: Whether slow chat completions are hedged by default
+            provider: Transport for the requests, defaults to an
+                OpenAI-compatible provider on OPENROUTER_API_BASE
         """
-        self.api_base = OPENROUTER_API_BASE
         self.headers = DEFAULT_HEADERS.copy()
         
         # Tambahkan data policy headers berdasarkan dokumentasi
@@ -44,28 +89,142 @@ class OpenRouterManager:
         
         self.current_key = None
         self.prefer_free = prefer_free
-        # Track successful models to maintain consistency
-        self.last_successful_models = {}
+        # Requests go through the provider, which owns the connection pool
+        self.provider = provider or OpenAICompatibleProvider(
+            OPENROUTER_API_BASE,
+            headers={k: v for k, v in self.headers.items() if k != "Authorization"},
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            timeout=REQUEST_TIMEOUT_SECONDS,
+            name="openrouter"
+        )
+        self.api_base = self.provider.api_base
+        # Rolling latency/error statistics and circuit breaker per model
+        self.model_router = ModelRouter(
+            failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+            open_seconds=CIRCUIT_OPEN_SECONDS
+        )
+        # Per-key and per-model rate limit state, recovers on its own
+        self.rate_limiter = RateLimitTracker()
+        # Hedged requests, capped per run
+        self.hedge_enabled = hedge
+        self.hedge_budget = HedgeBudget(HEDGE_MAX_PER_RUN, HEDGE_MAX_RATIO)
+        # Identical concurrent requests share one in-flight call
+        self.single_flight = SingleFlight()
+        # At most one background refresh per cached project analysis
+        self._refresh_flight = SingleFlight()
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+        self.refresh_stats = {"stale_served": 0, "background": 0, "proactive": 0, "failed": 0}
+        # Every call runs a bounded attempt plan instead of recursive retries
+        self.retry_planner = RetryPlanner(
+            max_attempts=RETRY_MAX_ATTEMPTS,
+            total_deadline=RETRY_TOTAL_DEADLINE_SECONDS,
+            attempt_timeout=REQUEST_TIMEOUT_SECONDS,
+            base_backoff=RETRY_BASE_BACKOFF_SECONDS,
+            max_backoff=RETRY_MAX_BACKOFF_SECONDS
+        )
+        # Token/cost accounting with per-run and per-day budgets
+        self.usage_tracker = UsageTracker(
+            USAGE_STATS_FILE,
+            MODEL_PRICING,
+            daily_cost_budget=DAILY_COST_BUDGET_USD,
+            run_cost_budget=RUN_COST_BUDGET_USD,
+            daily_token_budget=DAILY_TOKEN_BUDGET,
+            downgrade_ratio=BUDGET_DOWNGRADE_RATIO
+        )
+        # Versioned prompts with learned output limits
+        self.prompt_registry = create_default_registry()
         self._refresh_api_key()
     
-    def _refresh_api_key(self) -> bool:
-        """Refresh the API key from the rotation pool"""
-        self.current_key = get_next_available_key()
-        if self.current_key:
-            self.headers["Authorization"] = f"Bearer {self.current_key}"
-            return True
-        return False
+    def _refresh_api_key(self, model: Optional[str] = None) -> bool:
+        """
+        Refresh the API key from the rotation pool
+        
+        Args:
+            model: When given, keys that are throttled for this model are skipped
+        """
+        exclude = []
+        while True:
+            self.current_key = get_next_available_key(exclude=exclude)
+            if not self.current_key:
+                return False
+            if self.rate_limiter.is_available(self.current_key, model):
+                self.headers["Authorization"] = f"Bearer {self.current_key}"
+                return True
+            exclude.append(self.current_key)
     
-    def _get_model_name(self, model: str) -> str:
+    @staticmethod
+    def _classify_limit_error(status_code: int, error_msg: str) -> Optional[str]:
+        """
+        Classify an error response as a rate limit, exhausted credits or a key limit
+        
+        Returns:
+            "key_limit", "credits", "rate_limit" or None when the error is not limit related
+        """
+        message = error_msg.lower()
+        if "key limit" in message or ("api key" in message and "limit" in message):
+            return "key_limit"
+        if status_code == 402 or any(msg in message for msg in ["credits", "afford", "quota"]):
+            return "credits"
+        if status_code == 429 or any(msg in message for msg in ["rate limit", "limit", "exceeded"]):
+            return "rate_limit"
+        return None
+    
+    def _handle_limit_error(self, kind: str, key: str, model: str, headers: Dict[str, Any],
+                            error_data: Dict[str, Any], error_msg: str) -> float:
+        """
+        Put a key on cooldown according to the type of limit
+        
+        Returns:
+            The cooldown in seconds
+        """
+        if kind == "key_limit":
+            # The key itself is capped, so every model of this key is affected
+            self.rate_limiter.start_cooldown(key, None, CREDIT_EXHAUSTED_COOLDOWN_SECONDS, "key_limit")
+            mark_key_limit_reached(key, cooldown_seconds=CREDIT_EXHAUSTED_COOLDOWN_SECONDS, reason="key_limit")
+            print(f"[SISTEM] API key mencapai batasnya. Key diistirahatkan selama {CREDIT_EXHAUSTED_COOLDOWN_SECONDS // 3600} jam")
+            return CREDIT_EXHAUSTED_COOLDOWN_SECONDS
+        
+        if kind == "credits":
+            # Without credits the key can still serve free models
+            self.rate_limiter.start_cooldown(key, RateLimitTracker.PAID_MODELS, CREDIT_EXHAUSTED_COOLDOWN_SECONDS, "credits")
+            print(f"[SISTEM] Kredit API key habis. Model berbayar dengan key ini diistirahatkan selama {CREDIT_EXHAUSTED_COOLDOWN_SECONDS // 3600} jam")
+            return CREDIT_EXHAUSTED_COOLDOWN_SECONDS
+        
+        cooldown = self.rate_limiter.cooldown_from_error(headers, error_data, RATE_LIMIT_COOLDOWN_SECONDS)
+        if "per-day" in error_msg.lower() or "daily" in error_msg.lower():
+            # Daily limits (e.g. free-models-per-day) do not reset within a minute
+            cooldown = max(cooldown, CREDIT_EXHAUSTED_COOLDOWN_SECONDS)
+        self.rate_limiter.start_cooldown(key, model, cooldown, "rate_limit")
+        print(f"[SISTEM] Batas permintaan tercapai untuk model {model}. Istirahat {cooldown:.0f} detik")
+        return cooldown
+    
+    def _get_model_name(self, model: str, force_free: bool = False) -> str:
         """
         Get the actual model name based on preferences
         
         Args:
             model: The model key or direct model name
+            force_free: Map to a free model regardless of preferences
             
         Returns:
             The actual model name to use
         """
+        if force_free:
+            free_model = {
+                "default": OPENROUTER_MODELS.get("free-mistral"),
+                "smart": OPENROUTER_MODELS.get("free-analysis"),
+                "fast": OPENROUTER_MODELS.get("free-mistral"),
+                "powerful": OPENROUTER_MODELS.get("free-code"),
+            }.get(model)
+            if free_model:
+                return free_model
+            resolved = OPENROUTER_MODELS.get(model, model)
+            if ":free" in resolved:
+                return resolved
+            # Any other paid model: the healthiest free fallback
+            return (self.model_router.rank(FALLBACK_MODELS) or FALLBACK_MODELS)[0]
+        
         # Prefer paid models by default unless explicitly set to use free models
         if self.prefer_free:
             if model == "default":
@@ -78,68 +237,238 @@ class OpenRouterManager:
         # Otherwise use the standard mapping or the direct name
         return OPENROUTER_MODELS.get(model, model)
     
+    async def aclose(self):
+        """Close the provider's connection pool and persist usage statistics and key state"""
+        await asyncio.to_thread(self.usage_tracker.save)
+        await asyncio.to_thread(flush_api_keys)
+        await self.provider.aclose()
+    
+    def _candidate_keys(self) -> List[str]:
+        """Available keys for a call, the current key first to keep rotation sticky"""
+        keys = get_available_keys()
+        if self.current_key in keys:
+            keys.remove(self.current_key)
+            keys.insert(0, self.current_key)
+        return keys
+    
+    @staticmethod
+    def _key_hint(key: str) -> str:
+        return f"{key[:8]}...{key[-4:]}" if key and len(key) > 12 else key
+    
+    async def _send_once(self, endpoint: str, payload: Dict[str, Any], key: str,
+                         method: str, timeout: float) -> Dict[str, Any]:
+        """
+        Send a single request with the given key, without any retry
+        
+        Returns:
+            Dictionary with the attempt outcome ("success", "rate_limit",
+            "credits", "auth", "model_error", "bad_request", "timeout" or
+            "error"), the parsed result or error message and the latency
+        """
+        model_name = payload.get("model", "Unknown")
+        started = time.monotonic()
+        
+        try:
+            response = await self.provider.send(endpoint, payload, key, method, timeout)
+        except ProviderTimeout:
+            latency = time.monotonic() - started
+            self.model_router.record_failure(model_name, latency)
+            return {"outcome": "timeout", "error": f"Request timed out after {timeout:.1f}s",
+                    "latency": latency, "status": None}
+        except Exception as e:
+            latency = time.monotonic() - started
+            self.model_router.record_failure(model_name, latency)
+            return {"outcome": "error", "error": f"Request failed: {str(e)}",
+                    "latency": latency, "status": None}
+        
+        latency = time.monotonic() - started
+        self.rate_limiter.update_from_headers(key, model_name, response.headers)
+        
+        if response.status_code == 200:
+            try:
+                result = response.json()
+            except ValueError:
+                self.model_router.record_failure(model_name, latency)
+                return {"outcome": "model_error", "error": "Invalid JSON in response",
+                        "latency": latency, "status": 200}
+            if isinstance(result, dict) and "error" in result and "choices" not in result:
+                # OpenRouter can report provider errors with a 200 status
+                self.model_router.record_failure(model_name, latency)
+                return {"outcome": "model_error", "error": str(result.get("error")),
+                        "latency": latency, "status": 200}
+            self.model_router.record_success(model_name, latency)
+            return {"outcome": "success", "result": result, "latency": latency, "status": 200}
+        
+        try:
+            error_data = response.json() if response.content else {}
+        except ValueError:
+            error_data = {}
+        error_info = error_data.get("error", {}) if isinstance(error_data, dict) else {}
+        error_msg = error_info.get("message", "") if isinstance(error_info, dict) else str(error_info)
+        error_msg = error_msg or response.text
+        
+        # Credit or limit issues
+        if response.status_code in [401, 402, 403, 429]:
+            print(f"[AI MODEL ERROR] Model {model_name} tidak tersedia: {error_msg}")
+            limit_kind = self._classify_limit_error(response.status_code, error_msg)
+            if limit_kind:
+                cooldown = self._handle_limit_error(limit_kind, key, model_name, response.headers, error_data, error_msg)
+                return {"outcome": limit_kind, "error": error_msg, "latency": latency,
+                        "status": response.status_code, "cooldown": round(cooldown, 1)}
+            if response.status_code in [401, 403]:
+                return {"outcome": "auth", "error": error_msg, "latency": latency,
+                        "status": response.status_code}
+        
+        print(f"[AI MODEL ERROR] OpenRouter error {response.status_code}: {response.text}")
+        if response.status_code >= 500 or response.status_code == 408:
+            self.model_router.record_failure(model_name, latency)
+            return {"outcome": "error", "error": error_msg, "latency": latency,
+                    "status": response.status_code}
+        if "model" in payload and "model" in response.text.lower():
+            self.model_router.record_failure(model_name, latency)
+            return {"outcome": "model_error", "error": error_msg, "latency": latency,
+                    "status": response.status_code}
+        return {"outcome": "bad_request", "error": error_msg, "latency": latency,
+                "status": response.status_code}
+    
     async def _make_request(self, endpoint: str, payload: Dict[str, Any], 
-                           method: str = "POST", attempt: int = 0) -> Optional[Dict[str, Any]]:
-        """Make a request to OpenRouter API with retry and key rotation"""
-        if attempt >= 5:  # Maximum 5 attempts (increased from 3)
-            return {"error": f"Maximum attempts reached ({attempt})", "last_model": payload.get("model", "")}
+                           method: str = "POST",
+                           models: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Make a request to OpenRouter API following a bounded retry plan
         
-        if not self.current_key and not self._refresh_api_key():
+        The attempt sequence (models x keys, with jittered backoff) is computed
+        up front by the retry planner. Attempts that are known to fail are
+        skipped: keys without credits, throttled key/model pairs and models
+        whose circuit is open or that returned a model error. The call never
+        exceeds the planner's attempt budget or total deadline.
+        
+        Args:
+            endpoint: API endpoint
+            payload: Request payload, its model is used when models is not given
+            method: HTTP method
+            models: Candidate models in order of preference
+            
+        Returns:
+            The API response with an "attempt_log", or an error dictionary
+        """
+        if models is None:
+            models = [payload["model"]] if "model" in payload else [None]
+        
+        keys = self._candidate_keys()
+        if not keys:
             # No available keys
-            return {"error": "No available API keys. All keys have reached their limit."}
+            return {"error": "No available API keys. All keys have reached their limit.", "attempt_log": []}
         
-        url = f"{self.api_base}/{endpoint}"
+        plan = self.retry_planner.plan(models, keys)
+        deadline = time.monotonic() + self.retry_planner.total_deadline
+        attempt_log = []
+        failed_models = set()
+        failed_keys = set()
+        attempts = 0
+        last_error = None
+        last_outcome = None
         
-        try:
-            async with httpx.AsyncClient() as client:
-                if method.upper() == "POST":
-                    response = await client.post(url, json=payload, headers=self.headers)
-                else:
-                    response = await client.get(url, params=payload, headers=self.headers)
-                
-                if response.status_code == 200:
-                    return response.json()
-                
-                # Handle API key limit errors for paid models first
-                if response.status_code in [401, 402, 403, 429]:
-                    error_data = response.json() if response.content else {}
-                    error_msg = error_data.get("error", {}).get("message", "")
-                    model_name = payload.get("model", "Unknown")
-                    print(f"[AI MODEL ERROR] Model {model_name} tidak tersedia: {error_msg}")
-                    
-                    # Credit or limit issues
-                    if any(msg in error_msg.lower() for msg in ["limit", "exceeded", "quota", "credits", "afford"]):
-                        # Try to rotate API key first if that's the issue
-                        if "api key" in error_msg.lower() and self.current_key:
-                            mark_key_limit_reached(self.current_key)
-                            if self._refresh_api_key():
-                                print(f"[SISTEM] API key diganti. Mencoba kembali dengan key baru...")
-                                return await self._make_request(endpoint, payload, method, attempt + 1)
-                        
-                        # If not using free model yet, try systematic fallback to other models
-                        if ":free" not in payload.get("model", ""):
-                            print(f"[SISTEM] Model berbayar {model_name} tidak tersedia atau kredit tidak cukup. Beralih ke model gratis...")
-                            return await self._try_fallback_models(endpoint, payload, method, attempt)
-                
-                # Fallback for any other API error
-                if response.status_code >= 400:
-                    print(f"[AI MODEL ERROR] OpenRouter error {response.status_code}: {response.text}")
-                    # For model-related errors, try alternatives
-                    if "model" in payload and "model" in response.text.lower():
-                        print(f"[SISTEM] Terjadi kesalahan pada model {payload.get('model', 'Unknown')}. Mencoba model alternatif...")
-                        return await self._try_fallback_models(endpoint, payload, method, attempt)
-                
-                return {"error": f"API request failed: {response.status_code} - {response.text}"}
-                
-        except Exception as e:
-            return {"error": f"Request failed: {str(e)}"}
+        for step in plan:
+            model, key = step["model"], step["key"]
+            entry = {"step": step["step"], "model": model, "key_hint": self._key_hint(key)}
+            
+            skip_reason = None
+            if model in failed_models:
+                skip_reason = "model_failed"
+            elif key in failed_keys:
+                skip_reason = "key_unavailable"
+            elif not self.rate_limiter.is_available(key, model):
+                skip_reason = "rate_limited"
+            if skip_reason:
+                attempt_log.append({**entry, "outcome": "skipped", "reason": skip_reason})
+                continue
+            
+            if attempts >= self.retry_planner.max_attempts:
+                attempt_log.append({**entry, "outcome": "skipped", "reason": "attempt_budget"})
+                break
+            
+            # Back off only after transient failures, switching model or key needs no wait
+            if last_outcome in ("error", "timeout", "rate_limit") and step["delay"] > 0:
+                await asyncio.sleep(min(step["delay"], max(0.0, deadline - time.monotonic())))
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                attempt_log.append({**entry, "outcome": "skipped", "reason": "deadline"})
+                break
+            
+            # Circuit first, so requests it rejects do not spend rate limit tokens
+            if model and not self.model_router.allow_request(model):
+                failed_models.add(model)
+                attempt_log.append({**entry, "outcome": "skipped", "reason": "circuit_open"})
+                continue
+            probe = self.model_router.probe_started(model) if model else None
+            if not self.rate_limiter.try_acquire(key, model):
+                self.model_router.release_probe(model, probe)
+                attempt_log.append({**entry, "outcome": "skipped", "reason": "rate_limited"})
+                continue
+            
+            if attempts > 0:
+                model_display_name = (model or "").split("/")[0].capitalize()
+                print(f"[SISTEM] Percobaan {attempts + 1}/{self.retry_planner.max_attempts}: model {model_display_name} dengan key {self._key_hint(key)}")
+            
+            attempts += 1
+            attempt_payload = payload if model is None or payload.get("model") == model else {**payload, "model": model}
+            recorded = False
+            try:
+                outcome = await self._send_once(endpoint, attempt_payload, key, method,
+                                                min(self.retry_planner.attempt_timeout, remaining))
+                recorded = outcome["outcome"] in MODEL_HEALTH_OUTCOMES
+            finally:
+                if not recorded:
+                    # Limits, auth errors and cancellation say nothing about the model
+                    self.model_router.release_probe(model, probe)
+            attempt_log.append({
+                **entry,
+                "outcome": outcome["outcome"],
+                "status": outcome.get("status"),
+                "latency": round(outcome["latency"], 3),
+                "delay": step["delay"] if last_outcome in ("error", "timeout", "rate_limit") else 0.0
+            })
+            last_outcome = outcome["outcome"]
+            
+            if last_outcome == "success":
+                result = outcome["result"]
+                if key != self.current_key:
+                    self.current_key = key
+                    self.headers["Authorization"] = f"Bearer {key}"
+                if isinstance(result, dict):
+                    result["attempt_log"] = attempt_log
+                return result
+            
+            last_error = outcome.get("error")
+            if last_outcome in ("key_limit", "auth"):
+                failed_keys.add(key)
+            elif last_outcome == "model_error":
+                failed_models.add(model)
+            elif last_outcome == "bad_request":
+                # The request itself is invalid, no other model or key will help
+                break
+        
+        tried_models = list(dict.fromkeys(e["model"] for e in attempt_log if e["outcome"] != "skipped"))
+        print(f"[SISTEM GAGAL] Semua percobaan gagal ({attempts} permintaan, {len(tried_models)} model). Silakan coba lagi nanti atau hubungi administrator sistem.")
+        return {
+            "error": last_error or "Semua model alternatif gagal digunakan",
+            "tried_models": tried_models,
+            "last_model": tried_models[-1] if tried_models else payload.get("model", ""),
+            "attempt_log": attempt_log
+        }
     
     async def chat_completion(self, 
                              messages: List[Dict[str, str]], 
                              model: str = "default",
                              temperature: float = 0.7,
                              max_tokens: int = 1000,
-                             stream: bool = False) -> Dict[str, Any]:
+                             stream: bool = False,
+                             hedge: Optional[bool] = None,
+                             tag: str = "default",
+                             cache_prefix: int = 0,
+                             template: Optional[str] = None) -> Dict[str, Any]:
         """
         Send a chat completion request to OpenRouter
         
@@ -149,6 +478,14 @@ class OpenRouterManager:
             temperature: Sampling temperature (0-1)
             max_tokens: Maximum tokens to generate
             stream: Whether to stream the response
+            hedge: Send a duplicate to another healthy model if the primary is
+                slow. Defaults to the manager setting.
+            tag: Caller category for usage accounting
+            cache_prefix: Number of leading messages that are identical across
+                calls (e.g. the system instructions). They are marked for
+                provider prompt caching where OpenRouter supports it.
+            template: Id of the prompt template the messages were built from,
+                its output length is recorded to derive future max_tokens
             
         Returns:
             Response dictionary from API
@@ -156,49 +493,252 @@ class OpenRouterManager:
         # Get model type for better display
         model_type = "analisis" if model == "smart" else "cepat" if model == "fast" else "standar"
         
-        # Check if we've had a successful model for this type before
-        if model in self.last_successful_models:
-            saved_model = self.last_successful_models[model]
-            model_display_name = saved_model.split("/")[0].capitalize()
-            model_version = saved_model.split("/")[1].split(":")[0] if "/" in saved_model else saved_model
-            print(f"[AI MODEL] Menggunakan model {model_display_name} {model_version} yang sebelumnya berhasil untuk proses {model_type}")
-            actual_model = self.last_successful_models[model]
+        # Get actual model string based on preferences, unless its circuit is open
+        preferred_model = self._get_model_name(model)
+        if ":free" not in preferred_model and self.usage_tracker.should_downgrade():
+            budget = self.usage_tracker.budget_status()
+            preferred_model = self._get_model_name(model, force_free=True)
+            print(f"[SISTEM] Anggaran penggunaan AI hampir habis ({budget['usage_ratio'] * 100:.0f}%). Beralih ke model gratis {preferred_model}")
+        candidates = self.model_router.order(preferred_model, FALLBACK_MODELS)
+        actual_model = candidates[0] if candidates else preferred_model
+        
+        model_display_name = actual_model.split("/")[0].capitalize()
+        if actual_model != preferred_model:
+            model_version = actual_model.split("/")[1].split(":")[0] if "/" in actual_model else actual_model
+            print(f"[AI MODEL] Model {preferred_model} sedang tidak sehat. Menggunakan model {model_display_name} {model_version} yang tercepat untuk proses {model_type}")
+        elif ":free" in actual_model:
+            model_version = actual_model.split("/")[1].split(":")[0] if "/" in actual_model else actual_model
+            print(f"[AI MODEL] Menggunakan model gratis {model_display_name} {model_version} untuk proses {model_type}")
         else:
-            # Get actual model string based on preferences
-            actual_model = self._get_model_name(model)
-            if ":free" in actual_model:
-                model_display_name = actual_model.split("/")[0].capitalize()
-                model_version = actual_model.split("/")[1].split(":")[0] if "/" in actual_model else actual_model
-                print(f"[AI MODEL] Menggunakan model gratis {model_display_name} {model_version} untuk proses {model_type}")
-            else:
-                model_display_name = actual_model.split("/")[0].capitalize()
-                model_version = actual_model.split("/")[1] if "/" in actual_model else actual_model
-                print(f"[AI MODEL] Menggunakan model berbayar {model_display_name} {model_version} untuk proses {model_type}")
+            model_version = actual_model.split("/")[1] if "/" in actual_model else actual_model
+            print(f"[AI MODEL] Menggunakan model berbayar {model_display_name} {model_version} untuk proses {model_type}")
         
         payload = {
             "model": actual_model,
-            "messages": messages,
+            "messages": self._apply_prompt_cache(messages, cache_prefix, actual_model),
             "temperature": temperature,
             "max_tokens": max_tokens,
-            "stream": stream
+            "stream": stream,
+            # Ask OpenRouter to report token usage and cost in the response
+            "usage": {"include": True}
         }
         
         print(f"[PROSES] Mengirim permintaan ke model AI, harap tunggu...")
-        response = await self._make_request("chat/completions", payload)
+        use_hedge = self.hedge_enabled if hedge is None else hedge
+        
+        async def send() -> Dict[str, Any]:
+            started = time.monotonic()
+            if use_hedge and not stream and len(candidates) > 1:
+                result = await self._hedged_request("chat/completions", payload, candidates)
+            else:
+                result = await self._make_request("chat/completions", payload, models=candidates)
+            if result and "error" not in result and "choices" in result:
+                self._record_usage(result, payload["model"], time.monotonic() - started, tag)
+                if template:
+                    choices = result.get("choices") or [{}]
+                    self.prompt_registry.record_output(
+                        template,
+                        int((result.get("usage") or {}).get("completion_tokens") or 0),
+                        hit_limit=choices[0].get("finish_reason") == "length"
+                    )
+            return result
+        
+        if stream:
+            response = await send()
+        else:
+            # Concurrent identical requests (same model, messages, temperature) share one call
+            response = await self.single_flight.do(make_request_key(payload), send)
         
-        # If request was successful, store this model as successful for future use
         if response and "error" not in response and "choices" in response:
             print(f"[PROSES SUKSES] Model AI berhasil memproses permintaan")
-            if actual_model != self._get_model_name(model):  # Only store if different from default
-                model_display_name = actual_model.split("/")[0].capitalize()
-                print(f"[SISTEM] Menyimpan model sukses '{model_display_name}' untuk proses {model_type} selanjutnya")
-                self.last_successful_models[model] = actual_model
         else:
             error_msg = response.get("error", "Unknown error") if isinstance(response, dict) else "Connection failed"
             print(f"[PROSES GAGAL] Model AI gagal memproses: {error_msg}")
         
         return response
     
+    def input_token_budget(self, model: str) -> int:
+        """Maximum estimated tokens of variable prompt input for a model key or name"""
+        model_name = self._get_model_name(model)
+        if model_name in MODEL_INPUT_TOKEN_BUDGETS:
+            return MODEL_INPUT_TOKEN_BUDGETS[model_name]
+        return FREE_MODEL_INPUT_TOKEN_BUDGET if ":free" in model_name else DEFAULT_INPUT_TOKEN_BUDGET
+    
+    def build_prompt(self, name: str, data: Dict[str, Any], model: str = "default",
+                     version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Render a registered prompt template for a model
+        
+        Args:
+            name: Template name, e.g. "tweet_analysis" or "project_analysis"
+            data: Field values, empty fields are left out
+            model: Model key or name, determines the input token budget
+            version: Template version (latest if omitted)
+            
+        Returns:
+            Dictionary with "messages", "max_tokens", "template_id",
+            "input_tokens" and the "truncated" fields
+        """
+        prompt = self.prompt_registry.build(name, data, self.input_token_budget(model), version)
+        if prompt["truncated"]:
+            print(f"[PROMPT] Input {name} dipotong agar muat di anggaran token model: {', '.join(prompt['truncated'])}")
+        return prompt
+    
+    @staticmethod
+    def _apply_prompt_cache(messages: List[Dict[str, Any]], cache_prefix: int, model: str) -> List[Dict[str, Any]]:
+        """
+        Mark the end of the static message prefix as a prompt-cache breakpoint
+        
+        Anthropic and Gemini models only cache up to an explicit cache_control
+        marker. Other providers (OpenAI, DeepSeek) cache matching prefixes
+        automatically, so their messages are sent unchanged.
+        """
+        if cache_prefix <= 0 or not messages or not model.startswith(PROMPT_CACHE_CONTROL_PREFIXES):
+            return messages
+        
+        marked = [dict(message) for message in messages]
+        breakpoint_message = marked[min(cache_prefix, len(marked)) - 1]
+        content = breakpoint_message.get("content")
+        if isinstance(content, str):
+            breakpoint_message["content"] = [
+                {"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}
+            ]
+        return marked
+    
+    def _record_usage(self, response: Dict[str, Any], requested_model: str, latency: float, tag: str) -> None:
+        """Record the usage block of a successful response"""
+        attempts = [a for a in response.get("attempt_log", []) if a.get("outcome") == "success"]
+        key_hint = attempts[-1]["key_hint"] if attempts else None
+        model = attempts[-1]["model"] if attempts else response.get("model", requested_model)
+        entry = self.usage_tracker.record(model, response.get("usage"), latency, key_hint=key_hint, tag=tag)
+        cached = f" ({entry['cached_tokens']} dari cache)" if entry["cached_tokens"] else ""
+        print(f"[PENGGUNAAN] {entry['prompt_tokens']} token prompt{cached}, {entry['completion_tokens']} token jawaban, biaya ${entry['cost_usd']:.4f}")
+    
+    async def chat_completion_many(self,
+                                   requests: Iterable[Dict[str, Any]],
+                                   concurrency: int = BULK_DEFAULT_CONCURRENCY,
+                                   deadline: Optional[float] = None,
+                                   ordered: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run many chat completions concurrently and yield results as they finish
+        
+        All requests share the connection pool, key pool, rate limiter and
+        model router of this manager.
+        
+        Args:
+            requests: Keyword arguments for chat_completion, one dict per prompt
+            concurrency: Maximum number of requests in flight
+            deadline: Seconds for the whole batch, unfinished requests are
+                cancelled and reported with an error
+            ordered: Yield in submission order instead of completion order
+            
+        Yields:
+            Dictionaries with the request "index" and its "response"
+        """
+        requests = list(requests)
+        if not requests:
+            return
+        
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        loop = asyncio.get_running_loop()
+        end_time = loop.time() + deadline if deadline else None
+        
+        async def run(index: int, request: Dict[str, Any]):
+            async with semaphore:
+                try:
+                    return index, await self.chat_completion(**request)
+                except Exception as e:
+                    # chat_completion handles request errors, this only guards the batch
+                    return index, {"error": f"Request failed: {str(e)}"}
+        
+        print(f"[PROSES] Mengirim {len(requests)} permintaan ke model AI dengan {concurrency} permintaan paralel...")
+        pending = {asyncio.ensure_future(run(i, r)) for i, r in enumerate(requests)}
+        finished = set()
+        buffered = {}
+        next_index = 0
+        
+        try:
+            while pending:
+                timeout = None if end_time is None else max(0.0, end_time - loop.time())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    print(f"[PERINGATAN] Batas waktu {deadline} detik tercapai. {len(pending)} permintaan dibatalkan")
+                    break
+                for task in done:
+                    index, response = task.result()
+                    finished.add(index)
+                    if not ordered:
+                        yield {"index": index, "response": response}
+                        continue
+                    buffered[index] = response
+                    while next_index in buffered:
+                        yield {"index": next_index, "response": buffered.pop(next_index)}
+                        next_index += 1
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        # Report requests that did not finish before the deadline
+        for index in range(len(requests)):
+            if index in finished and index not in buffered:
+                continue
+            response = buffered.pop(index, None) or {"error": f"Deadline of {deadline}s exceeded"}
+            yield {"index": index, "response": response}
+    
+    def _hedge_delay(self, model: str) -> float:
+        """Delay before hedging, learned from the model's latency percentile"""
+        if self.model_router.sample_count(model) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY_SECONDS
+        return self.model_router.latency_percentile(model, HEDGE_LATENCY_PERCENTILE)
+    
+    async def _hedged_request(self, endpoint: str, payload: Dict[str, Any], candidates: List[str]) -> Dict[str, Any]:
+        """
+        Send the request and, if it is slower than usual, a duplicate to a second model
+        
+        Args:
+            endpoint: API endpoint
+            payload: Request payload for the primary model
+            candidates: Ranked candidate models, the second one is used for the duplicate
+        """
+        primary_model = payload.get("model", "")
+        hedge_model = candidates[1]
+        delay = self._hedge_delay(primary_model)
+        self.hedge_budget.record_request()
+        hedged = []
+        
+        def allow_hedge() -> bool:
+            if not self.model_router.is_available(hedge_model) or not self.hedge_budget.try_spend():
+                return False
+            hedged.append(hedge_model)
+            print(f"[SISTEM] Model {primary_model} belum menjawab setelah {delay:.1f} detik. Mengirim permintaan cadangan ke {hedge_model}...")
+            return True
+        
+        hedge_payload = payload.copy()
+        hedge_payload["model"] = hedge_model
+        response, hedge_won = await hedged_call(
+            lambda: self._make_request(endpoint, payload, models=candidates),
+            lambda: self._make_request(endpoint, hedge_payload, models=[hedge_model]),
+            delay,
+            lambda result: bool(result) and "error" not in result and "choices" in result,
+            allow_hedge
+        )
+        if hedged:
+            self.hedge_budget.record_winner(hedge_won)
+        if hedge_won:
+            print(f"[SISTEM] Permintaan cadangan ke {hedge_model} menang, permintaan utama dibatalkan")
+        return response
+    
+    def start_run(self):
+        """Start a new run: fresh hedge budget and per-run usage totals"""
+        self.hedge_budget.reset()
+        self.usage_tracker.start_run()
+        return {"success": True}
+    
+    def reset_hedge_budget(self):
+        """Start a new hedging budget, e.g. at the start of a pipeline run"""
+        self.hedge_budget.reset()
+        return {"success": True, "hedge_budget": self.hedge_budget.get_stats()}
+    
     async def analyze_text(self, text: str, prompt: str = None, model: str = "smart") -> Dict[str, Any]:
         """
         Analyze text using a chat completion
@@ -221,96 +761,87 @@ class OpenRouterManager:
             {"role": "user", "content": text}
         ]
         
-        return await self.chat_completion(messages, model=model, temperature=0.3)
+        return await self.chat_completion(messages, model=model, temperature=0.3, tag="analyze_text")
     
-    async def generate_project_analysis(self, project_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def generate_project_analysis(self, project_data: Dict[str, Any], use_cache: bool = True,
+                                        prefer_free: Optional[bool] = None) -> Dict[str, Any]:
         """
         Generate comprehensive analysis for a crypto project
         
         Args:
             project_data: Project information including Twitter data, tokenomics, etc.
+            use_cache: Whether to check cache before making API request
+            prefer_free: Use the free analysis model for this request, defaults to self.prefer_free
             
         Returns:
             Analysis dictionary with various scores and insights
         """
-        # Format project data into a structured prompt
-        prompt = f"""
-        Project Name: {project_data.get('project_name', 'Unknown')}
-        Token Symbol: {project_data.get('token_symbol', 'Unknown')}
-        Description: {project_data.get('description', 'No description available')}
-        
-        Website: {project_data.get('website_url', 'Not provided')}
-        Twitter: {project_data.get('twitter_handle', 'Not provided')}
+        # Fields the prompt does not use (id, timestamps) must not split the cache key
+        project_data = self.project_analysis_input(project_data)
+        # Entries are partitioned by model and prompt template version
+        namespace = self.project_analysis_namespace(prefer_free)
         
-        ## Project Background
-        Team: {project_data.get('team_info', 'Limited information available')}
-        Founded: {project_data.get('founded_date', 'Unknown')}
-        Blockchain: {project_data.get('blockchain', 'Unknown')}
-        Previous Projects: {project_data.get('previous_projects', 'No information')}
+        # Check cache first if enabled
+        if use_cache:
+            cached = AnalysisCache.get_cached_entry(project_data, namespace=namespace)
+            if cached:
+                if cached["stale"]:
+                    # Answer with the stale analysis now, refresh it in the background
+                    self.refresh_stats["stale_served"] += 1
+                    self._schedule_refresh(project_data, namespace)
+                return {
+                    "success": True,
+                    "analysis": cached["analysis"],
+                    "source": "cache",
+                    "stale": cached["stale"]
+                }
         
-        ## Backing & Investors
-        Investors: {project_data.get('investors', 'No information available')}
-        Partnerships: {project_data.get('partnerships', 'No information available')}
-        Funding Rounds: {project_data.get('funding_rounds', 'No information available')}
-        Total Funding: {project_data.get('total_funding', 'Unknown')}
-        
-        ## Tokenomics
-        Total Supply: {project_data.get('total_supply', 'Unknown')}
-        Circulating Supply: {project_data.get('circulating_supply', 'Unknown')}
-        Token Distribution: {project_data.get('token_distribution', 'No information available')}
-        Vesting Schedule: {project_data.get('vesting_schedule', 'No information available')}
-        Token Utility: {project_data.get('token_utility', 'Unknown')}
-        Airdrop Percentage: {project_data.get('airdrop_percentage', 'Unknown')}
-        
-        ## Roadmap
-        Current Phase: {project_data.get('current_phase', 'Unknown')}
-        Upcoming Milestones: {project_data.get('upcoming_milestones', 'No information available')}
-        Recent Achievements: {project_data.get('recent_achievements', 'No information available')}
-        
-        ## Social Statistics
-        Twitter Followers: {project_data.get('twitter_followers', 'Unknown')}
-        Engagement Rate: {project_data.get('engagement_rate', 'Unknown')}
-        Tweet Frequency: {project_data.get('tweet_frequency', 'Unknown')}
-        Community Size: {project_data.get('community_size', 'Unknown')}
-        
-        Conduct a thorough analysis of this crypto project focusing on:
-        
-        1. BACKGROUND CHECK: Investigate the legitimacy of the team, evaluate previous projects, and identify any red flags in their history.
-        
-        2. INVESTOR ANALYSIS: Evaluate the quality and credibility of backing investors and partners. Assess if there are any notable VCs or established crypto entities supporting the project.
-        
-        3. TOKENOMICS ASSESSMENT: Analyze token distribution (is it fair or concentrated?), supply mechanics, inflation rate, and token utility model. Evaluate if the token design makes economic sense.
-        
-        4. ROADMAP EVALUATION: Assess project roadmap feasibility, evaluate progress to date against promises, and determine likelihood of meeting future milestones.
-        
-        5. AIRDROP POTENTIAL: Based on all data, estimate likelihood of an airdrop, potential value, and qualification requirements. Consider token allocations for community.
-        
-        6. RISK FACTORS: Identify specific risks including regulatory concerns, competition, centralization issues, and technical challenges.
-        
-        7. INVESTMENT OUTLOOK: Provide short and long-term growth potential assessment based on fundamentals, not hype.
-        
-        Structure your analysis as a JSON object with the following fields:
-        - legitimacy_score (1-10)
-        - team_assessment (text)
-        - investor_quality (text)
-        - tokenomics_rating (1-10 with explanation)
-        - roadmap_feasibility (1-10 with explanation)
-        - airdrop_likelihood (percentage)
-        - estimated_airdrop_value (range in USD)
-        - primary_risks (array of risk factors)
-        - growth_potential (text)
-        - recommendation (text)
-        - detailed_analysis (comprehensive text)
+        return await self._analyze_project(project_data, self._namespace_model(namespace),
+                                           namespace if use_cache else None)
+    
+    def _project_analysis_model(self, prefer_free: Optional[bool] = None) -> str:
+        """Resolved model name of project analyses, free if prefer_free (default self.prefer_free)"""
+        if prefer_free is None:
+            prefer_free = self.prefer_free
+        # Resolve here so the name no longer depends on self.prefer_free changing later
+        if prefer_free:
+            return self._get_model_name("smart", force_free=True)
+        return OPENROUTER_MODELS.get("smart")
+    
+    def project_analysis_input(self, project_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Project data as analyzed and cached: the fields of the project analysis template"""
+        return self.prompt_registry.get("project_analysis").select(project_data)
+    
+    def project_analysis_namespace(self, prefer_free: Optional[bool] = None) -> str:
+        """Cache namespace of project analyses with the current model and prompt template"""
+        template = self.prompt_registry.get("project_analysis")
+        return AnalysisCache.namespace_for(self._project_analysis_model(prefer_free), template.template_id)
+    
+    def _namespace_model(self, namespace: str) -> str:
+        """Model name a project analysis namespace was built for (see AnalysisCache.namespace_for)"""
+        _, _, model = namespace.partition("@")
+        if not model or model == "any":
+            return self._project_analysis_model()
+        return model
+    
+    async def _analyze_project(self, project_data: Dict[str, Any], model: str,
+                               namespace: Optional[str]) -> Dict[str, Any]:
         """
+        Request a project analysis from the API
         
-        messages = [
-            {"role": "system", "content": "You are an expert cryptocurrency analyst specializing in tokenomics, blockchain technology, and investment analysis. You have deep experience evaluating early-stage crypto projects and airdrops. Respond only with a valid JSON object based on the data provided."},
-            {"role": "user", "content": prompt}
-        ]
-        
-        # Use free model for analysis by default if prefer_free is enabled
-        model = "free-analysis" if self.prefer_free else "smart"
-        response = await self.chat_completion(messages, model=model, temperature=0.2, max_tokens=2000)
+        Args:
+            project_data: Project information
+            model: Resolved model name, the model of `namespace` when caching
+            namespace: Cache namespace for a successful result, None to skip caching
+            
+        Returns:
+            Analysis dictionary as returned by generate_project_analysis
+        """
+        # Static instructions form the cacheable prefix, only known project fields are sent
+        prompt = self.build_prompt("project_analysis", project_data, model=model)
+        response = await self.chat_completion(prompt["messages"], model=model, temperature=0.2,
+                                              max_tokens=prompt["max_tokens"], tag="project_analysis",
+                                              cache_prefix=1, template=prompt["template_id"])
         
         # Try to extract JSON from the response
         try:
@@ -319,9 +850,15 @@ class OpenRouterManager:
                 # Try to parse the JSON response
                 try:
                     analysis = json.loads(content)
+                    
+                    # Cache successful analysis results
+                    if namespace:
+                        AnalysisCache.cache_analysis(project_data, analysis, namespace=namespace)
+                    
                     return {
                         "success": True,
                         "analysis": analysis,
+                        "source": "api",
                         "raw_response": response
                     }
                 except json.JSONDecodeError:
@@ -343,6 +880,84 @@ class OpenRouterManager:
             "raw_response": response
         }
     
+    async def refresh_project_analysis(self, project_data: Dict[str, Any],
+                                       namespace: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Re-analyze a project and replace its cache entry
+        
+        Concurrent refreshes of the same project share one API call. The
+        analysis is requested from the model the namespace belongs to.
+        
+        Args:
+            project_data: Project information as stored with the cache entry
+            namespace: Cache namespace, defaults to the current project analysis namespace
+            
+        Returns:
+            Analysis dictionary as returned by generate_project_analysis
+        """
+        namespace = namespace or self.project_analysis_namespace()
+        model = self._namespace_model(namespace)
+        key = AnalysisCache._generate_cache_key(project_data, namespace)
+        result = await self._refresh_flight.do(key, lambda: self._analyze_project(project_data, model, namespace))
+        if not result.get("success"):
+            self.refresh_stats["failed"] += 1
+            print(f"[CACHE] Refresh gagal untuk {project_data.get('project_name')}: {result.get('error')}")
+        return result
+    
+    def _schedule_refresh(self, project_data: Dict[str, Any], namespace: str) -> None:
+        """Start a background refresh unless one is already running for the project"""
+        key = AnalysisCache._generate_cache_key(project_data, namespace)
+        if key in self._refresh_tasks:
+            return
+        self.refresh_stats["background"] += 1
+        # Keep a reference so the task is not garbage collected while running
+        task = asyncio.ensure_future(self.refresh_project_analysis(project_data, namespace))
+        self._refresh_tasks[key] = task
+        task.add_done_callback(lambda _: self._refresh_tasks.pop(key, None))
+    
+    async def refresh_popular_entries(self, limit: int = REFRESH_BATCH_SIZE, concurrency: int = 2) -> Dict[str, Any]:
+        """
+        Re-analyze frequently read cache entries that expire soon
+        
+        Args:
+            limit: Maximum number of entries refreshed
+            concurrency: Maximum number of refreshes running at once
+            
+        Returns:
+            Dictionary with the number of candidates, refreshed and failed entries
+        """
+        # Entries of older models or templates are left to expire
+        namespace = self.project_analysis_namespace()
+        candidates = AnalysisCache.get_refresh_candidates(limit=limit, namespace=namespace)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def refresh(candidate):
+            async with semaphore:
+                return await self.refresh_project_analysis(candidate["project_data"], namespace)
+        
+        results = await asyncio.gather(*(refresh(c) for c in candidates), return_exceptions=True)
+        refreshed = sum(1 for r in results if isinstance(r, dict) and r.get("success"))
+        self.refresh_stats["proactive"] += refreshed
+        return {"candidates": len(candidates), "refreshed": refreshed, "failed": len(results) - refreshed}
+    
+    async def run_cache_refresher(self, interval: float = REFRESH_INTERVAL_SECONDS):
+        """
+        Refresh popular cache entries periodically until cancelled
+        
+        Args:
+            interval: Seconds between refresh cycles
+        """
+        while True:
+            try:
+                result = await self.refresh_popular_entries()
+                if result["candidates"]:
+                    print(f"[CACHE] Refresh proaktif: {result['refreshed']}/{result['candidates']} entri diperbarui")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[CACHE] Refresh proaktif error: {str(e)}")
+            await asyncio.sleep(interval)
+    
     async def analyze_code(self, code: str, prompt: str = None) -> Dict[str, Any]:
         """
         Analyze or generate code using a specialized code model
@@ -366,7 +981,7 @@ class OpenRouterManager:
         
         # Use free code model by default if prefer_free is enabled
         model = "free-code" if self.prefer_free else "powerful"
-        return await self.chat_completion(messages, model=model, temperature=0.1, max_tokens=2000)
+        return await self.chat_completion(messages, model=model, temperature=0.1, max_tokens=2000, tag="code")
     
     async def scrape_assistant(self, query: str) -> Dict[str, Any]:
         """
@@ -390,62 +1005,55 @@ class OpenRouterManager:
         
         # Use free scraper model by default if prefer_free is enabled
         model = "free-scraper" if self.prefer_free else "fast"
-        return await self.chat_completion(messages, model=model, temperature=0.5, max_tokens=1500)
+        return await self.chat_completion(messages, model=model, temperature=0.5, max_tokens=1500, tag="scrape_assist")
     
     def reset_api_keys(self):
         """Reset all API keys to available state (e.g., daily reset)"""
         reset_all_keys()
+        self.rate_limiter.clear()
         self._refresh_api_key()
         return {"success": True, "message": "All API keys have been reset"}
     
+    def get_rate_limit_status(self) -> Dict[str, Any]:
+        """Get active cooldowns and rate limit buckets per key/model"""
+        return self.rate_limiter.get_status()
+    
+    def get_model_health(self) -> Dict[str, Any]:
+        """Get rolling latency, error rate and circuit state per model"""
+        return self.model_router.get_status()
+    
+    def get_prompt_stats(self) -> Dict[str, Any]:
+        """Get observed output lengths and derived max_tokens per prompt template"""
+        return self.prompt_registry.get_stats()
+    
+    def get_usage_stats(self) -> Dict[str, Any]:
+        """Get token/cost usage of today and the current run with budget status"""
+        return self.usage_tracker.get_stats()
+    
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """Get single-flight coalescing counters"""
+        return self.single_flight.get_stats()
+    
+    def get_hedge_stats(self) -> Dict[str, Any]:
+        """Get hedging counters for the current run"""
+        return {"enabled": self.hedge_enabled, **self.hedge_budget.get_stats()}
+    
     def set_prefer_free(self, prefer_free: bool):
         """Set whether to prefer free models"""
         self.prefer_free = prefer_free
         return {"success": True, "prefer_free": prefer_free}
     
-    async def _try_fallback_models(self, endpoint: str, payload: Dict[str, Any], method: str, attempt: int) -> Optional[Dict[str, Any]]:
-        """Try multiple fallback models when primary model fails"""
-        # List of free models to try in sequence
-        fallback_models = [
-            "mistralai/mistral-7b-instruct:free",
-            "meta-llama/llama-3.1-8b-instruct:free",
-            "google/gemma-3-4b-it:free",
-            "deepseek/deepseek-chat-v3-0324:free"
-        ]
-        
-        original_model = payload.get("model", "")
-        print(f"[SISTEM] Mencoba beberapa model AI gratis alternatif setelah gagal menggunakan model: {original_model}")
-        
-        # Try each fallback model in sequence
-        for idx, model in enumerate(fallback_models):
-            # Skip if this is the model that just failed
-            if model == original_model:
-                continue
-            
-            model_display_name = model.split("/")[0].capitalize()
-            model_version = model.split("/")[1].split(":")[0] if "/" in model else model
-            
-            print(f"[AI MODEL {idx+1}/4] Mencoba model gratis: {model_display_name} {model_version}...")
-            fallback_payload = payload.copy()
-            fallback_payload["model"] = model
-            
-            # Try with this fallback model
-            response = await self._make_request(endpoint, fallback_payload, method, attempt + 1)
-            
-            # If successful, store this as a successful model and return
-            if response and "error" not in response and "choices" in response:
-                print(f"[PROSES SUKSES] Model {model_display_name} {model_version} berhasil memproses data. Model ini akan digunakan untuk analisis berikutnya.")
-                # Store for future use if we have a model type key
-                for key, value in OPENROUTER_MODELS.items():
-                    if value == original_model:
-                        self.last_successful_models[key] = model
-                        print(f"[SISTEM] Menyimpan model sukses '{model_display_name}' untuk digunakan selanjutnya.")
-                        break
-                return response
-            else:
-                error_msg = response.get("error", "Unknown error") if isinstance(response, dict) else "Connection failed"
-                print(f"[AI MODEL ERROR] Model {model_display_name} {model_version} gagal: {error_msg}")
-        
-        # If all fallbacks fail, return the last error
-        print(f"[SISTEM GAGAL] Semua model alternatif tidak berhasil digunakan. Silakan coba lagi nanti atau hubungi administrator sistem.")
-        return {"error": "Semua model alternatif gagal digunakan", "tried_models": fallback_models} 
\ No newline at end of file
+    def invalidate_cache_namespace(self, namespace: Optional[str] = None):
+        """Invalidate a cache namespace, by default the current project analysis namespace"""
+        namespace = namespace or self.project_analysis_namespace()
+        version = AnalysisCache.invalidate_namespace(namespace)
+        return {"success": True, "namespace": namespace, "version": version}
+    
+    def clear_cache(self):
+        """Clear expired cache entries"""
+        cleared = AnalysisCache.clear_expired_cache()
+        return {"success": True, "cleared_entries": cleared}
+    
+    def get_cache_stats(self):
+        """Get statistics about the cache"""
+        return {**AnalysisCache.get_cache_stats(), "refresh": dict(self.refresh_stats)}
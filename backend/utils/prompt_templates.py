@@ -0,0 +1,386 @@
+"""
+Versioned prompt templates with token estimation and input truncation
+"""
+import math
+from collections import deque
+from typing import Dict, List, Any, Optional, Tuple
+
+# Rough average for English text and JSON, good enough for budgeting
+CHARS_PER_TOKEN = 4
+# Field values are never cut below this length
+MIN_FIELD_CHARS = 80
+TRUNCATION_MARKER = "..."
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens of a text without a tokenizer"""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _format_value(value: Any) -> Optional[str]:
+    """Turn a field value into prompt text, None for empty values"""
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple, set)):
+        parts = [str(v).strip() for v in value if v is not None and str(v).strip()]
+        return ", ".join(parts) if parts else None
+    if isinstance(value, dict):
+        parts = [f"{k}: {v}" for k, v in value.items() if v is not None and str(v).strip()]
+        return "; ".join(parts) if parts else None
+    text = str(value).strip()
+    return text or None
+
+
+def _truncate_values(values: Dict[str, str], budget_chars: int) -> List[str]:
+    """
+    Shorten the longest values until their total length fits the budget
+
+    Returns:
+        Keys of the values that were truncated
+    """
+    truncated = []
+    total = sum(len(v) for v in values.values())
+    while total > budget_chars:
+        key = max(values, key=lambda k: len(values[k]))
+        current = len(values[key])
+        # The marker counts against the budget as well
+        new_length = max(MIN_FIELD_CHARS, current - (total - budget_chars) - len(TRUNCATION_MARKER))
+        if new_length + len(TRUNCATION_MARKER) >= current:
+            break
+        values[key] = values[key][:new_length].rstrip() + TRUNCATION_MARKER
+        if key not in truncated:
+            truncated.append(key)
+        total = sum(len(v) for v in values.values())
+    return truncated
+
+
+class PromptTemplate:
+    """
+    A versioned prompt: static system instructions plus labelled data fields
+
+    Fields are grouped in sections; fields without a value are left out and
+    so are sections without any field, instead of sending placeholders.
+    """
+
+    def __init__(self, name: str, version: int, system: str,
+                 sections: List[Tuple[Optional[str], List[Tuple[str, str]]]],
+                 max_tokens: int = 1000, min_max_tokens: int = 256,
+                 quoted_fields: Tuple[str, ...] = ()):
+        """
+        Initialize the template
+
+        Args:
+            name: Template name, e.g. "tweet_analysis"
+            version: Version number, increase it whenever the wording changes
+            system: Static instructions (sent as the cacheable system message)
+            sections: List of (heading or None, [(label, data key), ...])
+            max_tokens: Output limit used until enough outputs were observed
+            min_max_tokens: Lower bound for the derived output limit
+            quoted_fields: Data keys whose values are wrapped in quotes
+        """
+        self.name = name
+        self.version = version
+        self.system = system
+        self.sections = sections
+        self.max_tokens = max_tokens
+        self.min_max_tokens = min_max_tokens
+        self.quoted_fields = quoted_fields
+
+    @property
+    def template_id(self) -> str:
+        return f"{self.name}:v{self.version}"
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """Data keys rendered by the template"""
+        return tuple(key for _, fields in self.sections for _, key in fields)
+
+    def select(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """The part of data the template renders; other keys do not change the prompt"""
+        return {key: data[key] for key in self.fields if key in data}
+
+    def render(self, data: Dict[str, Any], input_budget: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Render the variable part of the prompt
+
+        Args:
+            data: Field values by data key
+            input_budget: Maximum estimated tokens for the rendered data
+
+        Returns:
+            Dictionary with the "text", its estimated "input_tokens" and the
+            list of "truncated" fields
+        """
+        values = {}
+        for _, fields in self.sections:
+            for _, key in fields:
+                value = _format_value(data.get(key))
+                if value is not None:
+                    values[key] = value
+
+        truncated = []
+        if input_budget:
+            # Labels and headings also cost tokens, keep the values well inside the budget
+            overhead = sum(len(label) + 4 for _, fields in self.sections for label, _ in fields)
+            budget_chars = max(MIN_FIELD_CHARS, input_budget * CHARS_PER_TOKEN - overhead)
+            truncated = _truncate_values(values, budget_chars)
+
+        blocks = []
+        for heading, fields in self.sections:
+            lines = []
+            for label, key in fields:
+                if key not in values:
+                    continue
+                value = f'"{values[key]}"' if key in self.quoted_fields else values[key]
+                lines.append(f"{label}: {value}")
+            if not lines:
+                continue
+            blocks.append("\n".join(([f"## {heading}"] if heading else []) + lines))
+
+        text = "\n\n".join(blocks)
+        return {"text": text, "input_tokens": estimate_tokens(text), "truncated": truncated}
+
+
+class PromptRegistry:
+    """
+    Registry of prompt templates that also learns their output lengths
+
+    The output limit of a template is derived from the completion tokens
+    observed for it (95th percentile plus headroom), so short answers stop
+    reserving the full default budget.
+    """
+
+    def __init__(self, window: int = 50, min_samples: int = 5, headroom: float = 1.25):
+        """
+        Initialize the registry
+
+        Args:
+            window: Number of recent outputs kept per template
+            min_samples: Outputs needed before the limit is derived
+            headroom: Factor applied to the observed 95th percentile
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self.headroom = headroom
+        self._templates: Dict[str, Dict[int, PromptTemplate]] = {}
+        self._outputs: Dict[str, deque] = {}
+        self._truncated_outputs: Dict[str, int] = {}
+
+    def register(self, template: PromptTemplate) -> PromptTemplate:
+        """Add a template version to the registry"""
+        self._templates.setdefault(template.name, {})[template.version] = template
+        return template
+
+    def get(self, name: str, version: Optional[int] = None) -> PromptTemplate:
+        """Get a template by name, the latest version unless one is given"""
+        versions = self._templates.get(name)
+        if not versions:
+            raise KeyError(f"Unknown prompt template: {name}")
+        if version is None:
+            return versions[max(versions)]
+        if version not in versions:
+            raise KeyError(f"Unknown version {version} of prompt template {name}")
+        return versions[version]
+
+    def _find(self, template_id: str) -> Optional[PromptTemplate]:
+        name, _, version = template_id.partition(":v")
+        try:
+            return self.get(name, int(version))
+        except (KeyError, ValueError):
+            return None
+
+    def record_output(self, template_id: str, completion_tokens: int, hit_limit: bool = False) -> None:
+        """
+        Record the output length of a response rendered from a template
+
+        Args:
+            template_id: Template id ("name:vN")
+            completion_tokens: Completion tokens of the response
+            hit_limit: The response was cut off by max_tokens; the sample is
+                doubled so the derived limit grows again
+        """
+        if completion_tokens <= 0:
+            return
+        samples = self._outputs.setdefault(template_id, deque(maxlen=self.window))
+        if hit_limit:
+            self._truncated_outputs[template_id] = self._truncated_outputs.get(template_id, 0) + 1
+            completion_tokens *= 2
+        samples.append(completion_tokens)
+
+    def max_tokens_for(self, template: PromptTemplate) -> int:
+        """Output limit for a template based on the observed output lengths"""
+        samples = self._outputs.get(template.template_id)
+        if not samples or len(samples) < self.min_samples:
+            return template.max_tokens
+        ordered = sorted(samples)
+        p95 = ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+        return max(template.min_max_tokens, min(template.max_tokens, math.ceil(p95 * self.headroom)))
+
+    def build(self, name: str, data: Dict[str, Any], input_budget: Optional[int] = None,
+              version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Render a template into chat messages
+
+        Args:
+            name: Template name
+            data: Field values
+            input_budget: Maximum estimated tokens for the variable part
+            version: Template version (latest if omitted)
+
+        Returns:
+            Dictionary with "messages" (static system prefix first), the
+            derived "max_tokens", "template_id", "input_tokens" and "truncated"
+        """
+        template = self.get(name, version)
+        rendered = template.render(data, input_budget)
+        return {
+            "messages": [
+                {"role": "system", "content": template.system},
+                {"role": "user", "content": rendered["text"]}
+            ],
+            "max_tokens": self.max_tokens_for(template),
+            "template_id": template.template_id,
+            "input_tokens": estimate_tokens(template.system) + rendered["input_tokens"],
+            "truncated": rendered["truncated"]
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get observed output lengths and the derived limits per template"""
+        stats = {}
+        for name, versions in self._templates.items():
+            for template in versions.values():
+                samples = self._outputs.get(template.template_id, ())
+                stats[template.template_id] = {
+                    "samples": len(samples),
+                    "avg_output_tokens": round(sum(samples) / len(samples), 1) if samples else None,
+                    "max_tokens": self.max_tokens_for(template),
+                    "default_max_tokens": template.max_tokens,
+                    "outputs_cut_off": self._truncated_outputs.get(template.template_id, 0)
+                }
+        return stats
+
+
+TWEET_ANALYSIS_TEMPLATE = PromptTemplate(
+    name="tweet_analysis",
+    version=1,
+    system="""You are a cryptocurrency expert specializing in identifying legitimate airdrops and token opportunities. Be thorough but concise in your analysis.
+
+Analyze the cryptocurrency tweet in the user message for airdrop or token opportunity.
+
+Please provide the following assessment:
+1. Is this a legitimate airdrop or token opportunity? (Yes/No/Maybe)
+2. What cryptocurrency or blockchain is this related to?
+3. What action is required? (e.g., follow account, submit wallet, join community)
+4. Risk level (Low/Medium/High) and explanation
+5. Estimated value or potential (if determinable)
+6. Step-by-step guide for claiming (if applicable)
+7. Your confidence in this assessment from 0.0 (guessing) to 1.0 (certain)
+
+Format the response as a JSON object with the following structure:
+{
+  "is_legitimate": "Yes/No/Maybe",
+  "related_crypto": "Blockchain/Token name",
+  "required_action": "Description of required actions",
+  "risk_level": "Low/Medium/High",
+  "risk_explanation": "Brief explanation of risks",
+  "estimated_value": "Description or range if applicable",
+  "claim_steps": ["Step 1", "Step 2", ...],
+  "additional_notes": "Any other relevant information",
+  "confidence": 0.0-1.0
+}""",
+    sections=[
+        (None, [("Tweet", "text"), ("Author", "author"), ("URL", "tweet_url")])
+    ],
+    max_tokens=1000,
+    min_max_tokens=300,
+    quoted_fields=("text",)
+)
+
+PROJECT_ANALYSIS_TEMPLATE = PromptTemplate(
+    name="project_analysis",
+    version=1,
+    system="""You are an expert cryptocurrency analyst specializing in tokenomics, blockchain technology, and investment analysis. You have deep experience evaluating early-stage crypto projects and airdrops. Respond only with a valid JSON object based on the data provided.
+
+Conduct a thorough analysis of the crypto project described in the user message, focusing on:
+
+1. BACKGROUND CHECK: Investigate the legitimacy of the team, evaluate previous projects, and identify any red flags in their history.
+
+2. INVESTOR ANALYSIS: Evaluate the quality and credibility of backing investors and partners. Assess if there are any notable VCs or established crypto entities supporting the project.
+
+3. TOKENOMICS ASSESSMENT: Analyze token distribution (is it fair or concentrated?), supply mechanics, inflation rate, and token utility model. Evaluate if the token design makes economic sense.
+
+4. ROADMAP EVALUATION: Assess project roadmap feasibility, evaluate progress to date against promises, and determine likelihood of meeting future milestones.
+
+5. AIRDROP POTENTIAL: Based on all data, estimate likelihood of an airdrop, potential value, and qualification requirements. Consider token allocations for community.
+
+6. RISK FACTORS: Identify specific risks including regulatory concerns, competition, centralization issues, and technical challenges.
+
+7. INVESTMENT OUTLOOK: Provide short and long-term growth potential assessment based on fundamentals, not hype.
+
+Only known fields are listed in the project data; treat anything missing as unknown.
+
+Structure your analysis as a JSON object with the following fields:
+- legitimacy_score (1-10)
+- team_assessment (text)
+- investor_quality (text)
+- tokenomics_rating (1-10 with explanation)
+- roadmap_feasibility (1-10 with explanation)
+- airdrop_likelihood (percentage)
+- estimated_airdrop_value (range in USD)
+- primary_risks (array of risk factors)
+- growth_potential (text)
+- recommendation (text)
+- detailed_analysis (comprehensive text)""",
+    sections=[
+        (None, [
+            ("Project Name", "project_name"),
+            ("Token Symbol", "token_symbol"),
+            ("Description", "description"),
+            ("Website", "website_url"),
+            ("Twitter", "twitter_handle")
+        ]),
+        ("Project Background", [
+            ("Team", "team_info"),
+            ("Founded", "founded_date"),
+            ("Blockchain", "blockchain"),
+            ("Previous Projects", "previous_projects")
+        ]),
+        ("Backing & Investors", [
+            ("Investors", "investors"),
+            ("Partnerships", "partnerships"),
+            ("Funding Rounds", "funding_rounds"),
+            ("Total Funding", "total_funding")
+        ]),
+        ("Tokenomics", [
+            ("Total Supply", "total_supply"),
+            ("Circulating Supply", "circulating_supply"),
+            ("Token Distribution", "token_distribution"),
+            ("Vesting Schedule", "vesting_schedule"),
+            ("Token Utility", "token_utility"),
+            ("Airdrop Percentage", "airdrop_percentage")
+        ]),
+        ("Roadmap", [
+            ("Current Phase", "current_phase"),
+            ("Upcoming Milestones", "upcoming_milestones"),
+            ("Recent Achievements", "recent_achievements")
+        ]),
+        ("Social Statistics", [
+            ("Twitter Followers", "twitter_followers"),
+            ("Engagement Rate", "engagement_rate"),
+            ("Tweet Frequency", "tweet_frequency"),
+            ("Community Size", "community_size")
+        ])
+    ],
+    max_tokens=2000,
+    min_max_tokens=600
+)
+
+
+def create_default_registry() -> PromptRegistry:
+    """Create a registry with the built-in templates"""
+    registry = PromptRegistry()
+    registry.register(TWEET_ANALYSIS_TEMPLATE)
+    registry.register(PROJECT_ANALYSIS_TEMPLATE)
+    return registry
@@ -0,0 +1,272 @@
+"""
+Rate limit tracking for OpenRouter API keys and models
+"""
+import time
+import threading
+from typing import Dict, Optional, Any, Tuple, Mapping
+
+
+class TokenBucket:
+    """Token bucket fed from OpenRouter rate-limit headers"""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        """
+        Initialize the bucket
+
+        Args:
+            capacity: Maximum number of requests in the window
+            refill_per_second: How many requests are restored per second
+        """
+        self.capacity = max(1.0, float(capacity))
+        self.refill_per_second = max(0.0, float(refill_per_second))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+
+    def consume(self, amount: float = 1.0) -> bool:
+        """Take tokens from the bucket, returns False if not enough are left"""
+        self._refill()
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True
+        return False
+
+    def time_until_available(self, amount: float = 1.0) -> float:
+        """Seconds until the requested amount of tokens is available"""
+        self._refill()
+        if self.tokens >= amount:
+            return 0.0
+        if self.refill_per_second <= 0:
+            return float("inf")
+        return (amount - self.tokens) / self.refill_per_second
+
+    def sync(self, limit: float, remaining: float, reset_in: float) -> None:
+        """
+        Align the bucket with the limits reported by the server
+
+        Args:
+            limit: Requests allowed per window (X-RateLimit-Limit)
+            remaining: Requests left in the current window (X-RateLimit-Remaining)
+            reset_in: Seconds until the window resets
+        """
+        self.capacity = max(1.0, float(limit))
+        window = max(1.0, float(reset_in))
+        self.refill_per_second = self.capacity / window if reset_in > 0 else self.capacity / 60.0
+        self.tokens = min(self.capacity, max(0.0, float(remaining)))
+        self.updated_at = time.monotonic()
+
+
+class RateLimitTracker:
+    """
+    Track rate limits and cooldowns per API key and per (key, model) pair
+
+    Cooldowns registered for a key without a model apply to every model of
+    that key, the special model scope PAID_MODELS applies to every model
+    that is not a ":free" variant (e.g. exhausted credits). Cooldowns expire
+    on their own, so throttled capacity comes back without manual resets.
+    """
+
+    PAID_MODELS = "paid"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        # (key, model or "*") -> (cooldown_until, reason)
+        self._cooldowns: Dict[Tuple[str, str], Tuple[float, str]] = {}
+        self.stats = {
+            "throttled_skips": 0,
+            "cooldowns_started": 0,
+            "cooldowns_expired": 0
+        }
+
+    @staticmethod
+    def _parse_reset(value: Any) -> Optional[float]:
+        """Convert an X-RateLimit-Reset value to seconds from now"""
+        try:
+            reset = float(value)
+        except (TypeError, ValueError):
+            return None
+        now = time.time()
+        # OpenRouter reports the reset as a unix timestamp in milliseconds
+        if reset > 1e12:
+            reset = reset / 1000.0
+        if reset > 1e9:
+            return max(0.0, reset - now)
+        return max(0.0, reset)
+
+    @staticmethod
+    def _get_header(headers: Mapping[str, Any], name: str) -> Any:
+        if not headers:
+            return None
+        for header_name, value in headers.items():
+            if header_name.lower() == name.lower():
+                return value
+        return None
+
+    def update_from_headers(self, key: str, model: str, headers: Mapping[str, Any]) -> None:
+        """Feed the bucket of a key/model pair from rate-limit response headers"""
+        limit = self._get_header(headers, "X-RateLimit-Limit")
+        remaining = self._get_header(headers, "X-RateLimit-Remaining")
+        if limit is None or remaining is None:
+            return
+        try:
+            limit = float(limit)
+            remaining = float(remaining)
+        except (TypeError, ValueError):
+            return
+        reset_in = self._parse_reset(self._get_header(headers, "X-RateLimit-Reset")) or 60.0
+
+        with self._lock:
+            bucket = self._buckets.get((key, model))
+            if bucket is None:
+                bucket = TokenBucket(limit, limit / max(1.0, reset_in))
+                self._buckets[(key, model)] = bucket
+            bucket.sync(limit, remaining, reset_in)
+
+    def cooldown_from_error(self, headers: Mapping[str, Any], error_body: Dict[str, Any],
+                            default_seconds: float) -> float:
+        """
+        Work out how long to back off from a 429 response
+
+        Looks at Retry-After, the response headers and the headers OpenRouter
+        embeds in error.metadata.headers, falling back to default_seconds.
+        """
+        retry_after = self._get_header(headers, "Retry-After")
+        try:
+            if retry_after is not None:
+                return max(1.0, float(retry_after))
+        except (TypeError, ValueError):
+            pass
+
+        candidates = [headers or {}]
+        if isinstance(error_body, dict):
+            error = error_body.get("error", {})
+            if isinstance(error, dict):
+                metadata = error.get("metadata") or {}
+                if isinstance(metadata, dict) and isinstance(metadata.get("headers"), dict):
+                    candidates.append(metadata["headers"])
+
+        for source in candidates:
+            reset_in = self._parse_reset(self._get_header(source, "X-RateLimit-Reset"))
+            if reset_in:
+                return max(1.0, reset_in)
+        return default_seconds
+
+    def start_cooldown(self, key: str, model: Optional[str], seconds: float, reason: str) -> None:
+        """
+        Put a key on cooldown
+
+        Args:
+            key: API key
+            model: Model name, PAID_MODELS for all paid models, or None for
+                every model of the key
+            seconds: Length of the cooldown
+            reason: Short description shown in the status
+        """
+        until = time.time() + max(0.0, seconds)
+        with self._lock:
+            current = self._cooldowns.get((key, model or "*"))
+            if current and current[0] >= until:
+                return
+            self._cooldowns[(key, model or "*")] = (until, reason)
+            self.stats["cooldowns_started"] += 1
+            bucket = self._buckets.get((key, model)) if model else None
+            if bucket:
+                bucket.tokens = 0.0
+
+    def clear(self, key: Optional[str] = None) -> None:
+        """Drop cooldowns and buckets, for one key or for all keys"""
+        with self._lock:
+            if key is None:
+                self._cooldowns.clear()
+                self._buckets.clear()
+                return
+            for entry in [k for k in self._cooldowns if k[0] == key]:
+                del self._cooldowns[entry]
+            for entry in [k for k in self._buckets if k[0] == key]:
+                del self._buckets[entry]
+
+    def _scopes(self, key: str, model: Optional[str]):
+        scopes = [(key, "*")]
+        if model:
+            scopes.append((key, model))
+            if not model.endswith(":free"):
+                scopes.append((key, self.PAID_MODELS))
+        return scopes
+
+    def _active_cooldown(self, key: str, model: Optional[str]) -> Optional[Tuple[float, str]]:
+        now = time.time()
+        active = None
+        for scope in self._scopes(key, model):
+            entry = self._cooldowns.get(scope)
+            if not entry:
+                continue
+            if entry[0] <= now:
+                del self._cooldowns[scope]
+                self.stats["cooldowns_expired"] += 1
+                continue
+            if active is None or entry[0] > active[0]:
+                active = entry
+        return active
+
+    def cooldown_remaining(self, key: str, model: Optional[str] = None) -> float:
+        """Seconds until the key/model pair can be used again (0 if available)"""
+        with self._lock:
+            wait = 0.0
+            active = self._active_cooldown(key, model)
+            if active:
+                wait = active[0] - time.time()
+            bucket = self._buckets.get((key, model)) if model else None
+            if bucket:
+                wait = max(wait, bucket.time_until_available())
+            return max(0.0, wait)
+
+    def is_available(self, key: str, model: Optional[str] = None) -> bool:
+        """Check whether a request may be sent with this key/model pair"""
+        return self.cooldown_remaining(key, model) <= 0
+
+    def try_acquire(self, key: str, model: str) -> bool:
+        """Reserve one request on the key/model pair if it is not throttled"""
+        with self._lock:
+            if self._active_cooldown(key, model):
+                self.stats["throttled_skips"] += 1
+                return False
+            bucket = self._buckets.get((key, model))
+            if bucket and not bucket.consume():
+                self.stats["throttled_skips"] += 1
+                return False
+            return True
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get a snapshot of active cooldowns and buckets (keys are masked)"""
+        now = time.time()
+
+        def hint(key: str) -> str:
+            return f"{key[:8]}...{key[-4:]}" if len(key) > 12 else key
+
+        with self._lock:
+            cooldowns = [
+                {
+                    "key_hint": hint(key),
+                    "model": None if model == "*" else model,
+                    "reason": reason,
+                    "remaining_seconds": round(until - now, 1)
+                }
+                for (key, model), (until, reason) in self._cooldowns.items()
+                if until > now
+            ]
+            buckets = []
+            for (key, model), bucket in self._buckets.items():
+                bucket._refill()
+                buckets.append({
+                    "key_hint": hint(key),
+                    "model": model,
+                    "capacity": bucket.capacity,
+                    "tokens": round(bucket.tokens, 2)
+                })
+            return {"cooldowns": cooldowns, "buckets": buckets, **self.stats}
@@ -0,0 +1,72 @@
+"""
+Bounded retry planning for OpenRouter requests
+"""
+import random
+from typing import Dict, List, Any, Optional
+
+
+class RetryPlanner:
+    """
+    Compute the full attempt sequence for a request up front
+
+    The plan walks models in order and, for each model, every available key.
+    Each attempt after the first carries a full-jitter exponential backoff.
+    Execution is bounded by both an attempt budget and one total deadline,
+    so the worst-case latency of a call is known before it starts.
+    """
+
+    def __init__(self, max_attempts: int = 6, total_deadline: float = 90.0,
+                 attempt_timeout: float = 45.0, base_backoff: float = 0.5,
+                 max_backoff: float = 8.0, rng: Optional[random.Random] = None):
+        """
+        Initialize the planner
+
+        Args:
+            max_attempts: Maximum number of requests actually sent per call
+            total_deadline: Seconds a call may take in total, including backoff
+            attempt_timeout: Upper bound for a single request
+            base_backoff: Backoff base in seconds
+            max_backoff: Cap for a single backoff delay
+            rng: Random generator for the jitter (injectable for tests)
+        """
+        self.max_attempts = max_attempts
+        self.total_deadline = total_deadline
+        self.attempt_timeout = attempt_timeout
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._rng = rng or random.Random()
+
+    def backoff(self, retry_number: int) -> float:
+        """Full-jitter backoff before the given retry (1 = first retry)"""
+        if retry_number <= 0:
+            return 0.0
+        ceiling = min(self.max_backoff, self.base_backoff * (2 ** (retry_number - 1)))
+        return self._rng.uniform(0, ceiling)
+
+    def plan(self, models: List[str], keys: List[str]) -> List[Dict[str, Any]]:
+        """
+        Build the attempt sequence for a call
+
+        Args:
+            models: Candidate models, most preferred first
+            keys: Available API keys, most preferred first
+
+        Returns:
+            List of attempts with model, key and the delay to wait before it
+        """
+        steps = []
+        for model in dict.fromkeys(models):
+            for key in dict.fromkeys(keys):
+                steps.append({
+                    "step": len(steps) + 1,
+                    "model": model,
+                    "key": key,
+                    "delay": round(self.backoff(len(steps)), 3)
+                })
+        return steps
+
+    def worst_case_seconds(self, plan: List[Dict[str, Any]]) -> float:
+        """Upper bound for the time a plan can take"""
+        executed = plan[:self.max_attempts]
+        bound = sum(step["delay"] for step in executed) + len(executed) * self.attempt_timeout
+        return min(self.total_deadline, bound)
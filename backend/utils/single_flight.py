@@ -0,0 +1,86 @@
+"""
+Single-flight coalescing of identical in-flight requests
+"""
+import asyncio
+import copy
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict
+
+
+def make_request_key(payload: Dict[str, Any], fields=("model", "messages", "temperature", "max_tokens")) -> str:
+    """
+    Build a stable key for a request payload
+
+    Whitespace around message content and float noise in the temperature are
+    normalized so equivalent requests map to the same key.
+    """
+    normalized = {}
+    for field in fields:
+        value = payload.get(field)
+        if field == "messages" and isinstance(value, list):
+            value = [
+                {**message, "content": message["content"].strip()}
+                if isinstance(message, dict) and isinstance(message.get("content"), str) else message
+                for message in value
+            ]
+        elif field == "temperature" and isinstance(value, (int, float)):
+            value = round(float(value), 3)
+        normalized[field] = value
+    encoded = json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Share one in-flight call between concurrent callers with the same key
+
+    The first caller (leader) starts the work as a task; callers arriving
+    while it runs await the same task instead of issuing their own request.
+    The task is shielded, so a cancelled caller does not cancel the work for
+    the others.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `factory` for `key`, or join the call already in flight
+
+        Args:
+            key: Request key (see make_request_key)
+            factory: Coroutine factory performing the actual request
+
+        Returns:
+            The result of the shared call. Every caller, the leader included,
+            receives its own copy, so callers cannot mutate each other's results.
+        """
+        task = self._in_flight.get(key)
+        if task is not None and not task.done():
+            self.coalesced += 1
+            result = await asyncio.shield(task)
+            return copy.deepcopy(result)
+
+        self.leaders += 1
+        task = asyncio.ensure_future(factory())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._forget(key, task))
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+
+    def _forget(self, key: str, task: asyncio.Future) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing counters"""
+        total = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._in_flight),
+            "leader_calls": self.leaders,
+            "coalesced_calls": self.coalesced,
+            "coalesce_rate": round(self.coalesced / total, 3) if total else 0.0
+        }
@@ -0,0 +1,455 @@
+"""
+Postgrest-compatible client on a local SQLite database
+
+Lets DatabaseManager run without a Supabase project (offline runs, benchmarks,
+tests on an isolated machine). The client implements the part of the
+postgrest query builder the manager uses - select with embedded resources,
+insert, upsert, filters, order, limit/range and rpc - on the schema in
+database/sqlite_schema.sql, and returns responses with the same .data shape.
+"""
+import os
+import re
+import json
+import sqlite3
+import asyncio
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple, Union
+
+from .supabase_config import SQLITE_DATABASE_PATH
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "database", "sqlite_schema.sql")
+
+# Postgrest filter operators and their SQL equivalent
+OPERATORS = {"eq": "=", "neq": "!=", "lt": "<", "lte": "<=", "gt": ">", "gte": ">="}
+
+EMBED_PATTERN = re.compile(r"^(\w+)\((.*)\)$")
+
+
+class SQLiteResponse:
+    """Result of a query, shaped like the postgrest APIResponse"""
+
+    def __init__(self, data: List[Dict], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+    def __repr__(self):
+        return f"SQLiteResponse(data={self.data!r}, count={self.count!r})"
+
+
+def split_top_level(text: str) -> List[str]:
+    """Split on commas outside of parentheses and double quotes"""
+    parts, depth, quoted, current = [], 0, False, []
+    for i, char in enumerate(text):
+        if char == '"' and (i == 0 or text[i - 1] != "\\"):
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    if current:
+        parts.append("".join(current).strip())
+    return [part for part in parts if part]
+
+
+def parse_literal(text: str) -> Any:
+    """Value of a filter in a postgrest "or" expression"""
+    if text.startswith('"'):
+        return json.loads(text)
+    if text == "null":
+        return None
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+class AsyncSQLiteClient:
+    """
+    Drop-in replacement for AsyncPostgrestClient backed by SQLite
+
+    Queries run in a worker thread on a single connection, so they never
+    block the event loop. The schema is created on first use. Closing the
+    client closes the connection; it is reopened on the next query.
+    """
+
+    def __init__(self, path: str = SQLITE_DATABASE_PATH, schema_path: str = SCHEMA_PATH):
+        """
+        Args:
+            path: Database file, ":memory:" for a database that lives as long as the connection
+            schema_path: SQL script creating the tables (idempotent)
+        """
+        self.path = path
+        self.schema_path = schema_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._columns: Dict[str, Dict[str, str]] = {}
+        # Postgres functions callable through rpc()
+        self.functions = {
+            # project_rankings is a plain view in SQLite, always up to date
+            "refresh_project_rankings": lambda conn, params: None,
+            "get_watchlisted_project_ids": lambda conn, params: [
+                dict(row) for row in conn.execute(
+                    "SELECT project_id, COUNT(*) AS watchers FROM user_watchlist "
+                    "WHERE project_id IS NOT NULL GROUP BY project_id "
+                    "ORDER BY watchers DESC, project_id LIMIT ?",
+                    (params.get("max_count", 50),)
+                )
+            ]
+        }
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+            with open(self.schema_path, "r", encoding="utf-8") as f:
+                conn.executescript(f.read())
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._conn = conn
+            self._columns = {}
+        return self._conn
+
+    async def run(self, operation):
+        """Run operation(connection) in a worker thread, one at a time"""
+        def locked():
+            with self._lock:
+                return operation(self._connection())
+        return await asyncio.to_thread(locked)
+
+    def columns(self, conn: sqlite3.Connection, table: str) -> Dict[str, str]:
+        """Declared column types of a table or view, raises ValueError for unknown tables"""
+        if table not in self._columns:
+            info = conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+            if not info:
+                raise ValueError(f"Unknown table {table}")
+            self._columns[table] = {row["name"]: (row["type"] or "").upper() for row in info}
+        return self._columns[table]
+
+    def encode(self, conn: sqlite3.Connection, table: str, column: str, value: Any) -> Any:
+        """Python value as stored in a column"""
+        if value is None:
+            return None
+        kind = self.columns(conn, table).get(column, "")
+        if kind == "JSON":
+            return json.dumps(value)
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+
+    def decode(self, conn: sqlite3.Connection, table: str, row: sqlite3.Row) -> Dict[str, Any]:
+        """Stored row as returned by Postgrest (JSON parsed, booleans as bool)"""
+        kinds = self.columns(conn, table)
+        data = dict(row)
+        for column, value in data.items():
+            if value is None:
+                continue
+            kind = kinds.get(column, "")
+            if kind == "JSON" and isinstance(value, str):
+                try:
+                    data[column] = json.loads(value)
+                except ValueError:
+                    pass
+            elif kind == "BOOLEAN":
+                data[column] = bool(value)
+        return data
+
+    def table(self, table_name: str) -> "SQLiteQueryBuilder":
+        return SQLiteQueryBuilder(self, table_name)
+
+    from_ = table
+
+    def rpc(self, func: str, params: Optional[Dict] = None) -> "SQLiteRPC":
+        return SQLiteRPC(self, func, params or {})
+
+    async def aclose(self) -> None:
+        """Close the connection"""
+        def close():
+            with self._lock:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+        await asyncio.to_thread(close)
+
+
+class SQLiteRPC:
+    """Call of a function registered in AsyncSQLiteClient.functions"""
+
+    def __init__(self, client: AsyncSQLiteClient, func: str, params: Dict):
+        self.client = client
+        self.func = func
+        self.params = params
+
+    async def execute(self) -> SQLiteResponse:
+        if self.func not in self.client.functions:
+            raise ValueError(f"Unknown function {self.func}")
+        function = self.client.functions[self.func]
+        return SQLiteResponse(await self.client.run(lambda conn: function(conn, self.params)))
+
+
+class SQLiteQueryBuilder:
+    """Chainable query on one table, mirroring the postgrest request builders"""
+
+    def __init__(self, client: AsyncSQLiteClient, table: str):
+        self.client = client
+        self.table_name = table
+        self._method = "select"
+        self._select = "*"
+        self._rows: List[Dict] = []
+        self._on_conflict: List[str] = []
+        self._ignore_duplicates = False
+        # Filters as (column, operator, value), ("not", column, operator, value) or ("or", expression)
+        self._filters: List[Tuple] = []
+        self._negate_next = False
+        # Keyed by embedded table name, None for the queried table
+        self._order: Dict[Optional[str], List[Tuple[str, bool, Optional[bool]]]] = {}
+        self._limit: Dict[Optional[str], int] = {}
+        self._offset: Dict[Optional[str], int] = {}
+
+    # Statements
+
+    def select(self, *columns: str, count: Optional[str] = None) -> "SQLiteQueryBuilder":
+        self._method = "select"
+        self._select = ",".join(columns) if columns else "*"
+        return self
+
+    def insert(self, json: Union[Dict, List[Dict]], **kwargs) -> "SQLiteQueryBuilder":
+        self._method = "insert"
+        self._rows = json if isinstance(json, list) else [json]
+        return self
+
+    def upsert(self, json: Union[Dict, List[Dict]], on_conflict: str = "",
+               ignore_duplicates: bool = False, **kwargs) -> "SQLiteQueryBuilder":
+        self._method = "upsert"
+        self._rows = json if isinstance(json, list) else [json]
+        self._on_conflict = [c.strip() for c in on_conflict.split(",") if c.strip()] or ["id"]
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    # Filters
+
+    def _filter(self, column: str, operator: str, value: Any) -> "SQLiteQueryBuilder":
+        if self._negate_next:
+            self._negate_next = False
+            self._filters.append(("not", column, operator, value))
+        else:
+            self._filters.append((column, operator, value))
+        return self
+
+    @property
+    def not_(self) -> "SQLiteQueryBuilder":
+        """Negate the next filter, e.g. .not_.is_("column", "null")"""
+        self._negate_next = True
+        return self
+
+    def eq(self, column: str, value: Any) -> "SQLiteQueryBuilder":
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> "SQLiteQueryBuilder":
+        return self._filter(column, "neq", value)
+
+    def lt(self, column: str, value: Any) -> "SQLiteQueryBuilder":
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> "SQLiteQueryBuilder":
+        return self._filter(column, "lte", value)
+
+    def gt(self, column: str, value: Any) -> "SQLiteQueryBuilder":
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> "SQLiteQueryBuilder":
+        return self._filter(column, "gte", value)
+
+    def in_(self, column: str, values: List[Any]) -> "SQLiteQueryBuilder":
+        return self._filter(column, "in", list(values))
+
+    def is_(self, column: str, value: Optional[str]) -> "SQLiteQueryBuilder":
+        return self._filter(column, "is", value)
+
+    def or_(self, filters: str, reference_table: Optional[str] = None) -> "SQLiteQueryBuilder":
+        self._filters.append(("or", filters))
+        return self
+
+    # Modifiers
+
+    def order(self, column: str, *, desc: bool = False, nullsfirst: Optional[bool] = None,
+              foreign_table: Optional[str] = None) -> "SQLiteQueryBuilder":
+        self._order.setdefault(foreign_table, []).append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, size: int, *, foreign_table: Optional[str] = None) -> "SQLiteQueryBuilder":
+        self._limit[foreign_table] = size
+        return self
+
+    def range(self, start: int, end: int, foreign_table: Optional[str] = None) -> "SQLiteQueryBuilder":
+        self._offset[foreign_table] = start
+        self._limit[foreign_table] = end - start + 1
+        return self
+
+    async def execute(self) -> SQLiteResponse:
+        return SQLiteResponse(await self.client.run(self._execute))
+
+    # SQL generation
+
+    def _column(self, conn: sqlite3.Connection, table: str, column: str) -> str:
+        if column not in self.client.columns(conn, table):
+            raise ValueError(f"Unknown column {column} of {table}")
+        return f'"{column}"'
+
+    def _condition(self, conn: sqlite3.Connection, column: str, operator: str, value: Any) -> Tuple[str, List]:
+        name = self._column(conn, self.table_name, column)
+        if operator == "in":
+            if not value:
+                return "0", []
+            encoded = [self.client.encode(conn, self.table_name, column, v) for v in value]
+            return f"{name} IN ({', '.join('?' for _ in encoded)})", encoded
+        if operator == "is":
+            if value in (None, "null"):
+                return f"{name} IS NULL", []
+            return f"{name} IS ?", [{"true": 1, "false": 0}.get(str(value).lower(), value)]
+        if value is None:
+            return (f"{name} IS NULL", []) if operator == "eq" else (f"{name} IS NOT NULL", [])
+        return f"{name} {OPERATORS[operator]} ?", [self.client.encode(conn, self.table_name, column, value)]
+
+    def _logic_tree(self, conn: sqlite3.Connection, expression: str, joiner: str) -> Tuple[str, List]:
+        """SQL of a postgrest logic tree such as a.lt.1,and(a.eq.1,b.lt.2)"""
+        clauses, params = [], []
+        for part in split_top_level(expression):
+            group = re.match(r"^(and|or)\((.*)\)$", part)
+            if group:
+                sql, values = self._logic_tree(conn, group.group(2), group.group(1).upper())
+            else:
+                column, operator, literal = part.split(".", 2)
+                if operator not in OPERATORS and operator != "is":
+                    raise ValueError(f"Unsupported filter operator {operator}")
+                sql, values = self._condition(conn, column, operator, parse_literal(literal))
+            clauses.append(f"({sql})")
+            params.extend(values)
+        return f" {joiner} ".join(clauses), params
+
+    def _where(self, conn: sqlite3.Connection) -> Tuple[str, List]:
+        clauses, params = [], []
+        for item in self._filters:
+            if item[0] == "or":
+                sql, values = self._logic_tree(conn, item[1], "OR")
+            elif item[0] == "not":
+                sql, values = self._condition(conn, *item[1:])
+                sql = f"NOT ({sql})"
+            else:
+                sql, values = self._condition(conn, *item)
+            clauses.append(f"({sql})")
+            params.extend(values)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _order_limit(self, conn: sqlite3.Connection, table: str, key: Optional[str]) -> Tuple[str, List]:
+        sql, params = "", []
+        terms = []
+        for column, desc, nullsfirst in self._order.get(key, []):
+            # Postgres puts NULLs first in descending and last in ascending order
+            first = desc if nullsfirst is None else nullsfirst
+            terms.append(f"{self._column(conn, table, column)} {'DESC' if desc else 'ASC'} "
+                         f"NULLS {'FIRST' if first else 'LAST'}")
+        if terms:
+            sql += " ORDER BY " + ", ".join(terms)
+        if key in self._limit or key in self._offset:
+            sql += " LIMIT ? OFFSET ?"
+            params += [self._limit.get(key, -1), self._offset.get(key, 0)]
+        return sql, params
+
+    def _execute(self, conn: sqlite3.Connection) -> List[Dict]:
+        if self._method == "select":
+            return self._execute_select(conn)
+        return self._execute_write(conn)
+
+    def _execute_select(self, conn: sqlite3.Connection) -> List[Dict]:
+        columns, embeds = [], []
+        for item in split_top_level(self._select):
+            embed = EMBED_PATTERN.match(item)
+            if embed:
+                embeds.append(embed.group(1))
+            elif item == "*":
+                columns.append("*")
+            else:
+                columns.append(self._column(conn, self.table_name, item))
+
+        where, params = self._where(conn)
+        tail, tail_params = self._order_limit(conn, self.table_name, None)
+        rows = conn.execute(f'SELECT {", ".join(columns) or "*"} FROM "{self.table_name}"{where}{tail}',
+                            params + tail_params).fetchall()
+        data = [self.client.decode(conn, self.table_name, row) for row in rows]
+
+        for embedded in embeds:
+            self._embed(conn, embedded, data)
+        return data
+
+    def _embed(self, conn: sqlite3.Connection, child: str, parents: List[Dict]) -> None:
+        """Attach the related rows of child to every parent row, like a postgrest embedded resource"""
+        self.client.columns(conn, child)
+        many = True
+        relation = None
+        for fk in conn.execute(f'PRAGMA foreign_key_list("{child}")').fetchall():
+            if fk["table"] == self.table_name:
+                relation = (fk["from"], fk["to"] or "id")
+                # A foreign key with a unique constraint is a one-to-one relation
+                for index in conn.execute(f'PRAGMA index_list("{child}")').fetchall():
+                    if index["unique"]:
+                        indexed = [c["name"] for c in conn.execute(f'PRAGMA index_info("{index["name"]}")')]
+                        if indexed == [fk["from"]]:
+                            many = False
+                break
+        if relation is None:
+            for fk in conn.execute(f'PRAGMA foreign_key_list("{self.table_name}")').fetchall():
+                if fk["table"] == child:
+                    relation = (fk["to"] or "id", fk["from"])
+                    many = False
+                    break
+        if relation is None:
+            raise ValueError(f"No relationship between {self.table_name} and {child}")
+
+        child_column, parent_column = relation
+        tail, tail_params = self._order_limit(conn, child, child)
+        for parent in parents:
+            rows = conn.execute(f'SELECT * FROM "{child}" WHERE "{child_column}" = ?{tail}',
+                                [parent.get(parent_column)] + tail_params).fetchall()
+            related = [self.client.decode(conn, child, row) for row in rows]
+            parent[child] = related if many else (related[0] if related else None)
+
+    def _execute_write(self, conn: sqlite3.Connection) -> List[Dict]:
+        inserted = []
+        conn.execute("BEGIN")
+        try:
+            for row in self._rows:
+                names = [self._column(conn, self.table_name, column) for column in row]
+                values = [self.client.encode(conn, self.table_name, column, value) for column, value in row.items()]
+                sql = (f'INSERT INTO "{self.table_name}" ({", ".join(names)}) '
+                       f'VALUES ({", ".join("?" for _ in values)})')
+                if self._method == "upsert":
+                    target = ", ".join(self._column(conn, self.table_name, c) for c in self._on_conflict)
+                    updates = [f"{name} = excluded.{name}" for column, name in zip(row, names)
+                               if column not in self._on_conflict]
+                    if self._ignore_duplicates or not updates:
+                        sql += f" ON CONFLICT ({target}) DO NOTHING"
+                    else:
+                        sql += f" ON CONFLICT ({target}) DO UPDATE SET {', '.join(updates)}"
+                result = conn.execute(sql + " RETURNING *", values).fetchall()
+                inserted.extend(self.client.decode(conn, self.table_name, r) for r in result)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return inserted
@@ -0,0 +1,229 @@
+"""
+Token and cost accounting for OpenRouter requests
+"""
+import os
+import json
+import time
+import asyncio
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {
+        "requests": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "cached_tokens": 0,
+        "cost_usd": 0.0,
+        "latency_total": 0.0,
+        "cache_hit_requests": 0,
+        "latency_cached_total": 0.0
+    }
+
+
+def _add_usage(totals: Dict[str, Any], entry: Dict[str, Any]) -> None:
+    totals["requests"] += 1
+    totals["prompt_tokens"] += entry["prompt_tokens"]
+    totals["completion_tokens"] += entry["completion_tokens"]
+    totals["cached_tokens"] += entry.get("cached_tokens", 0)
+    totals["cost_usd"] = round(totals["cost_usd"] + entry["cost_usd"], 6)
+    totals["latency_total"] = round(totals["latency_total"] + entry["latency"], 3)
+    if entry.get("cached_tokens"):
+        # setdefault keeps aggregates written before these fields existed working
+        totals["cache_hit_requests"] = totals.setdefault("cache_hit_requests", 0) + 1
+        totals["latency_cached_total"] = round(totals.setdefault("latency_cached_total", 0.0) + entry["latency"], 3)
+
+
+def _prompt_cache_summary(totals: Dict[str, Any]) -> Dict[str, Any]:
+    """Cached vs uncached prompt tokens and latency of a totals block"""
+    hits = totals.get("cache_hit_requests", 0)
+    misses = totals["requests"] - hits
+    cached_latency = totals.get("latency_cached_total", 0.0)
+    return {
+        "cached_tokens": totals["cached_tokens"],
+        "uncached_prompt_tokens": totals["prompt_tokens"] - totals["cached_tokens"],
+        "cached_token_ratio": round(totals["cached_tokens"] / totals["prompt_tokens"], 3) if totals["prompt_tokens"] else 0.0,
+        "cache_hit_requests": hits,
+        "avg_latency_cached": round(cached_latency / hits, 3) if hits else None,
+        "avg_latency_uncached": round((totals["latency_total"] - cached_latency) / misses, 3) if misses else None
+    }
+
+
+class UsageTracker:
+    """
+    Record token usage per request and aggregate it per day and per run
+
+    Daily aggregates (per model, key and tag) are kept in a local JSON file,
+    the current run is kept in memory. Both are checked against budgets so
+    the manager can switch to free models before credits run out.
+    """
+
+    def __init__(self, store_path: str, pricing: Dict[str, Dict[str, float]],
+                 daily_cost_budget: Optional[float] = None,
+                 run_cost_budget: Optional[float] = None,
+                 daily_token_budget: Optional[int] = None,
+                 downgrade_ratio: float = 0.9,
+                 retention_days: int = 30,
+                 save_interval: float = 10.0):
+        """
+        Initialize the tracker
+
+        Args:
+            store_path: JSON file for the daily aggregates
+            pricing: USD per million tokens per model ({"prompt": x, "completion": y})
+            daily_cost_budget: Maximum spend per day in USD (None = unlimited)
+            run_cost_budget: Maximum spend per pipeline run in USD (None = unlimited)
+            daily_token_budget: Maximum tokens per day (None = unlimited)
+            downgrade_ratio: Fraction of a budget after which paid models are avoided
+            retention_days: Number of days of aggregates kept in the store
+            save_interval: Minimum seconds between writes of the store
+        """
+        self.store_path = store_path
+        self.pricing = pricing
+        self.daily_cost_budget = daily_cost_budget
+        self.run_cost_budget = run_cost_budget
+        self.daily_token_budget = daily_token_budget
+        self.downgrade_ratio = downgrade_ratio
+        self.retention_days = retention_days
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+        self._dirty = False
+        self._daily = self._load()
+        self.run = {"started_at": datetime.now().isoformat(), "totals": _empty_totals(), "models": {}}
+
+    def _load(self) -> Dict[str, Any]:
+        if not os.path.exists(self.store_path):
+            return {}
+        try:
+            with open(self.store_path, "r") as f:
+                return json.load(f).get("daily", {})
+        except (json.JSONDecodeError, IOError):
+            return {}
+
+    def save(self) -> None:
+        """Write the daily aggregates to the store"""
+        with self._lock:
+            cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+            self._daily = {day: data for day, data in self._daily.items() if day >= cutoff}
+            snapshot = json.dumps({"daily": self._daily}, indent=2)
+            self._dirty = False
+            self._last_save = time.monotonic()
+        try:
+            with open(self.store_path, "w") as f:
+                f.write(snapshot)
+        except IOError as e:
+            print(f"Error writing usage stats: {e}")
+
+    def estimate_cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """Estimate the cost in USD from the pricing table (free models cost nothing)"""
+        if not model or model.endswith(":free"):
+            return 0.0
+        price = self.pricing.get(model)
+        if not price:
+            return 0.0
+        return (prompt_tokens * price.get("prompt", 0) + completion_tokens * price.get("completion", 0)) / 1_000_000
+
+    def record(self, model: str, usage: Optional[Dict[str, Any]], latency: float,
+               key_hint: Optional[str] = None, tag: str = "default") -> Dict[str, Any]:
+        """
+        Record the usage block of one response
+
+        Args:
+            model: Model that answered
+            usage: The "usage" block of the response (may be missing)
+            latency: Seconds the call took
+            key_hint: Masked API key used for the call
+            tag: Caller category, e.g. "tweet_analysis" or "project_analysis"
+
+        Returns:
+            The normalized usage entry
+        """
+        usage = usage or {}
+        prompt_tokens = int(usage.get("prompt_tokens") or 0)
+        completion_tokens = int(usage.get("completion_tokens") or 0)
+        details = usage.get("prompt_tokens_details") or {}
+        cost = usage.get("cost")
+        entry = {
+            "model": model,
+            "tag": tag,
+            "key_hint": key_hint,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached_tokens": int(details.get("cached_tokens") or 0),
+            "cost_usd": float(cost) if cost is not None else self.estimate_cost(model, prompt_tokens, completion_tokens),
+            "latency": latency
+        }
+
+        today = datetime.now().strftime("%Y-%m-%d")
+        with self._lock:
+            day = self._daily.setdefault(today, {"totals": _empty_totals(), "models": {}, "keys": {}, "tags": {}})
+            _add_usage(day["totals"], entry)
+            _add_usage(day["models"].setdefault(model, _empty_totals()), entry)
+            _add_usage(day["tags"].setdefault(tag, _empty_totals()), entry)
+            if key_hint:
+                _add_usage(day["keys"].setdefault(key_hint, _empty_totals()), entry)
+            _add_usage(self.run["totals"], entry)
+            _add_usage(self.run["models"].setdefault(model, _empty_totals()), entry)
+            self._dirty = True
+            should_save = time.monotonic() - self._last_save >= self.save_interval
+
+        if should_save:
+            try:
+                # Write in a worker thread when called from the event loop
+                asyncio.get_running_loop().run_in_executor(None, self.save)
+            except RuntimeError:
+                self.save()
+        return entry
+
+    def start_run(self) -> None:
+        """Start new per-run totals (e.g. at the start of a pipeline cycle)"""
+        with self._lock:
+            self.run = {"started_at": datetime.now().isoformat(), "totals": _empty_totals(), "models": {}}
+
+    def _today_totals(self) -> Dict[str, Any]:
+        today = datetime.now().strftime("%Y-%m-%d")
+        return self._daily.get(today, {}).get("totals", _empty_totals())
+
+    def budget_status(self) -> Dict[str, Any]:
+        """Current spend compared to the configured budgets"""
+        with self._lock:
+            today = self._today_totals()
+            run = self.run["totals"]
+            daily_tokens = today["prompt_tokens"] + today["completion_tokens"]
+            ratios = []
+            if self.daily_cost_budget:
+                ratios.append(today["cost_usd"] / self.daily_cost_budget)
+            if self.run_cost_budget:
+                ratios.append(run["cost_usd"] / self.run_cost_budget)
+            if self.daily_token_budget:
+                ratios.append(daily_tokens / self.daily_token_budget)
+            usage_ratio = max(ratios) if ratios else 0.0
+            return {
+                "daily_cost_usd": today["cost_usd"],
+                "daily_cost_budget_usd": self.daily_cost_budget,
+                "daily_tokens": daily_tokens,
+                "daily_token_budget": self.daily_token_budget,
+                "run_cost_usd": run["cost_usd"],
+                "run_cost_budget_usd": self.run_cost_budget,
+                "usage_ratio": round(usage_ratio, 3),
+                "should_downgrade": usage_ratio >= self.downgrade_ratio
+            }
+
+    def should_downgrade(self) -> bool:
+        """Whether paid models should be replaced with free ones"""
+        return self.budget_status()["should_downgrade"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Usage of today and of the current run, plus prompt cache effect and budget status"""
+        today = datetime.now().strftime("%Y-%m-%d")
+        with self._lock:
+            daily = json.loads(json.dumps(self._daily.get(today, {})))
+            run = json.loads(json.dumps(self.run))
+        prompt_cache = {
+            "today": _prompt_cache_summary(daily.get("totals", _empty_totals())),
+            "run": _prompt_cache_summary(run["totals"])
+        }
+        return {"today": daily, "run": run, "prompt_cache": prompt_cache, "budget": self.budget_status()}
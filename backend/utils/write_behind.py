@@ -0,0 +1,208 @@
+"""
+Write-behind buffer for database inserts
+
+Callers enqueue rows per table and continue right away. A background flusher
+writes them in batches once a table has a full batch or the flush interval
+has passed, so ingestion is not gated on the latency of every single insert.
+"""
+import time
+import asyncio
+from typing import Dict, List, Any, Callable, Awaitable, Optional
+
+from .supabase_config import (
+    TABLE_TWITTER_DATA,
+    TABLE_AI_ANALYSIS,
+    TABLE_TOKENOMICS,
+    WRITE_BUFFER_BATCH_SIZE,
+    WRITE_BUFFER_FLUSH_SECONDS,
+    WRITE_BUFFER_MAX_ROWS,
+    WRITE_BUFFER_MAX_RETRIES,
+    WRITE_BUFFER_RETRY_SECONDS,
+    WRITE_BUFFER_RANKINGS_SECONDS
+)
+
+
+class WriteBehindBuffer:
+    """
+    Batches inserts per table and writes them in the background
+
+    Rows are written with the idempotent bulk methods of DatabaseManager
+    (upserts on the natural key of each table), so a batch that failed
+    halfway can be retried without creating duplicates. When more than
+    max_rows rows are waiting, put() blocks until the flusher catches up.
+    Once AI analyses were written, the project_rankings view is refreshed,
+    at most every rankings_interval seconds by the background flusher and
+    always on an explicit flush().
+    """
+
+    def __init__(self, db, batch_size: int = WRITE_BUFFER_BATCH_SIZE,
+                 flush_interval: float = WRITE_BUFFER_FLUSH_SECONDS,
+                 max_rows: int = WRITE_BUFFER_MAX_ROWS,
+                 max_retries: int = WRITE_BUFFER_MAX_RETRIES,
+                 retry_delay: float = WRITE_BUFFER_RETRY_SECONDS,
+                 rankings_interval: float = WRITE_BUFFER_RANKINGS_SECONDS):
+        """
+        Args:
+            db: DatabaseManager used to write the batches
+            batch_size: Rows per batch and per table
+            flush_interval: Maximum seconds a row waits before it is written
+            max_rows: Rows waiting (queued or being written) before put() blocks
+            max_retries: Retries of a failed batch before it is dropped
+            retry_delay: Seconds before the first retry, doubled on every retry
+            rankings_interval: Minimum seconds between rankings refreshes of the flusher
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.rankings_interval = rankings_interval
+        self.refresh_rankings: Callable[[], Awaitable[Dict]] = db.refresh_project_rankings
+        self._rankings_stale = False
+        self._rankings_refreshed_at = 0.0
+        self.writers: Dict[str, Callable[[List[Dict]], Awaitable[Dict]]] = {
+            TABLE_TWITTER_DATA: db.bulk_upsert_twitter_data,
+            TABLE_AI_ANALYSIS: db.bulk_add_ai_analysis,
+            TABLE_TOKENOMICS: db.bulk_upsert_tokenomics
+        }
+        self._queues: Dict[str, List[Dict]] = {table: [] for table in self.writers}
+        self._pending = 0
+        self._space: Optional[asyncio.Condition] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "retries": 0,
+            "failed": 0,
+            "backpressure_waits": 0,
+            "rankings_refreshes": 0
+        }
+
+    def _ensure_started(self) -> None:
+        """Create the asyncio primitives and the flusher on the running loop"""
+        if self._task is None or self._task.done() or self._task.get_loop() is not asyncio.get_running_loop():
+            self._closing = False
+            self._space = asyncio.Condition()
+            self._wake = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+
+    async def put(self, table: str, row: Dict) -> None:
+        """
+        Queue a row for insertion, waiting while the buffer is full
+
+        Args:
+            table: One of the tables in self.writers
+            row: Row as accepted by the bulk method of the table
+        """
+        if table not in self.writers:
+            raise ValueError(f"No bulk writer for table {table}")
+        self._ensure_started()
+
+        async with self._space:
+            if self._pending >= self.max_rows:
+                self.stats["backpressure_waits"] += 1
+                self._wake.set()
+                await self._space.wait_for(lambda: self._pending < self.max_rows)
+            self._pending += 1
+            self._queues[table].append(row)
+            self.stats["enqueued"] += 1
+
+        if len(self._queues[table]) >= self.batch_size:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        """Flush on every full batch and at least every flush interval"""
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self._flush()
+                await self._refresh_rankings(self.rankings_interval)
+            except Exception as e:
+                print(f"[WRITE BUFFER] Flush failed: {e}")
+
+    async def flush(self) -> None:
+        """Write every queued row now and refresh the rankings if analyses were written"""
+        await self._flush()
+        await self._refresh_rankings()
+
+    async def _flush(self) -> None:
+        if self._flush_lock is None:
+            return
+        async with self._flush_lock:
+            for table, queue in self._queues.items():
+                while queue:
+                    batch = queue[:self.batch_size]
+                    del queue[:self.batch_size]
+                    await self._write_batch(table, batch)
+
+    async def _write_batch(self, table: str, batch: List[Dict]) -> None:
+        """Write one batch, retrying with backoff and dropping it after max_retries"""
+        try:
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+                try:
+                    result = await self.writers[table](batch)
+                except Exception as e:
+                    result = {"error": str(e)}
+                if "error" not in result:
+                    self.stats["batches"] += 1
+                    self.stats["written"] += len(batch)
+                    if table == TABLE_AI_ANALYSIS:
+                        self._rankings_stale = True
+                    return
+                print(f"[WRITE BUFFER] Writing {len(batch)} rows to {table} failed "
+                      f"(attempt {attempt + 1}/{self.max_retries + 1}): {result['error']}")
+            self.stats["failed"] += len(batch)
+        finally:
+            async with self._space:
+                self._pending -= len(batch)
+                self._space.notify_all()
+
+    async def _refresh_rankings(self, min_interval: float = 0) -> None:
+        """Refresh project_rankings after new analyses, unless it was refreshed less than min_interval ago"""
+        if not self._rankings_stale or time.monotonic() - self._rankings_refreshed_at < min_interval:
+            return
+        self._rankings_stale = False
+        result = await self.refresh_rankings()
+        if "error" in result:
+            # Retried on the next flush
+            self._rankings_stale = True
+            print(f"[WRITE BUFFER] Refreshing project rankings failed: {result['error']}")
+            return
+        self._rankings_refreshed_at = time.monotonic()
+        self.stats["rankings_refreshes"] += 1
+
+    async def aclose(self) -> None:
+        """Stop the flusher and write everything still queued"""
+        if self._task is None:
+            return
+        if self._task.get_loop() is asyncio.get_running_loop():
+            # Let the flusher finish its current batch instead of cancelling it midway
+            self._closing = True
+            self._wake.set()
+            await self._task
+        else:
+            # The flusher died with the event loop it was started on
+            self._space = asyncio.Condition()
+            self._flush_lock = asyncio.Lock()
+        await self.flush()
+        self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters of the buffer and the rows currently waiting"""
+        return {
+            **self.stats,
+            "pending": self._pending,
+            "queued": {table: len(queue) for table, queue in self._queues.items()}
+        }
@@ -16,6 +16,9 @@ CREATE TABLE projects (
 -- Indeks untuk pencarian project_name
 CREATE INDEX idx_projects_name ON projects (project_name);
 
+-- Indeks untuk paginasi keyset /projects/latest (discovery_date, id)
+CREATE INDEX idx_projects_discovery ON projects (discovery_date DESC, id DESC);
+
 -- Tabel untuk menyimpan data dari Twitter
 CREATE TABLE twitter_data (
   id SERIAL PRIMARY KEY,
@@ -101,6 +104,8 @@ CREATE INDEX idx_watchlist_user_id ON user_watchlist (user_id);
 CREATE INDEX idx_watchlist_project_id ON user_watchlist (project_id);
 
 -- Constraints tambahan untuk memastikan uniqueness
+-- (project_name harus unik untuk upsert massal di pipeline; hapus duplikat lama sebelum menambahkan constraint)
+ALTER TABLE projects ADD CONSTRAINT unique_project_name UNIQUE (project_name);
 ALTER TABLE twitter_data ADD CONSTRAINT unique_tweet_per_project UNIQUE (project_id, tweet_id);
 ALTER TABLE ai_analysis ADD CONSTRAINT unique_analysis_per_project UNIQUE (project_id, analysis_date);
 ALTER TABLE tokenomics ADD CONSTRAINT unique_tokenomics_per_project UNIQUE (project_id);
@@ -150,4 +155,75 @@ FOR EACH ROW EXECUTE FUNCTION update_project_last_updated();
 
 CREATE TRIGGER update_project_last_updated_on_market_data
 AFTER INSERT OR UPDATE ON market_data
-FOR EACH ROW EXECUTE FUNCTION update_project_last_updated(); 
\ No newline at end of file
+FOR EACH ROW EXECUTE FUNCTION update_project_last_updated(); 
+-- Materialized view peringkat proyek berdasarkan analisis AI terbaru per proyek,
+-- supaya /projects/top tidak perlu membaca seluruh tabel projects.
+-- Analisis tanpa analysis_date diabaikan: DESC menaruh NULL di depan sehingga
+-- analisis itu terpilih sebagai yang terbaru, dan cursor paginasi tidak bisa menunjuk NULL
+CREATE MATERIALIZED VIEW project_rankings AS
+SELECT DISTINCT ON (a.project_id)
+  p.id,
+  p.project_name,
+  p.token_symbol,
+  a.overall_rating,
+  a.analysis_date
+FROM ai_analysis a
+JOIN projects p ON p.id = a.project_id
+WHERE a.overall_rating IS NOT NULL
+  AND a.analysis_date IS NOT NULL
+ORDER BY a.project_id, a.analysis_date DESC;
+
+-- Indeks unik diperlukan untuk REFRESH ... CONCURRENTLY
+CREATE UNIQUE INDEX idx_project_rankings_id ON project_rankings (id);
+-- Indeks untuk paginasi keyset /projects/top (overall_rating, analysis_date, id)
+CREATE INDEX idx_project_rankings_rating ON project_rankings (overall_rating DESC, analysis_date DESC, id DESC);
+
+GRANT SELECT ON project_rankings TO anon, authenticated;
+
+-- Waktu refresh peringkat terakhir (satu baris), hanya dibaca/diubah oleh refresh_project_rankings()
+CREATE TABLE project_rankings_refresh (
+  id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+  refreshed_at TIMESTAMPTZ NOT NULL
+);
+INSERT INTO project_rankings_refresh (refreshed_at) VALUES ('-infinity');
+ALTER TABLE project_rankings_refresh ENABLE ROW LEVEL SECURITY;
+
+-- Fungsi untuk memperbarui peringkat tanpa mengunci pembacaan (dipanggil setelah pipeline menyimpan analisis).
+-- Refresh yang kurang dari 30 detik setelah refresh sebelumnya dilewati, supaya pemanggilan
+-- berulang lewat /rpc tidak membebani database; baris yang terkunci membuat pemanggil serentak
+-- menunggu lalu melewati refresh
+CREATE OR REPLACE FUNCTION refresh_project_rankings()
+RETURNS VOID AS $$
+BEGIN
+  UPDATE project_rankings_refresh SET refreshed_at = NOW()
+  WHERE refreshed_at < NOW() - INTERVAL '30 seconds';
+  IF NOT FOUND THEN
+    RETURN;
+  END IF;
+  REFRESH MATERIALIZED VIEW CONCURRENTLY project_rankings;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Hanya pipeline yang boleh memanggil refresh. Pipeline memakai anon key (SUPABASE_KEY di
+-- utils/supabase_config.py), jadi anon tetap diberi EXECUTE dan throttle di atas yang membatasi beban;
+-- pengguna yang login (authenticated) tidak perlu memanggilnya
+REVOKE EXECUTE ON FUNCTION refresh_project_rankings() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION refresh_project_rankings() TO anon, service_role;
+
+-- Opsional, jika ekstensi pg_cron aktif: perbarui peringkat setiap 15 menit
+-- SELECT cron.schedule('refresh-project-rankings', '*/15 * * * *', 'SELECT refresh_project_rankings()');
+
+-- Proyek yang paling banyak dimasukkan ke watchlist, dihitung di server.
+-- SECURITY DEFINER supaya hitungan mencakup watchlist semua pengguna meskipun ada RLS;
+-- yang keluar hanya id proyek dan jumlah pengguna, bukan isi watchlist
+CREATE OR REPLACE FUNCTION get_watchlisted_project_ids(max_count INTEGER DEFAULT 50)
+RETURNS TABLE (project_id INTEGER, watchers BIGINT) AS $$
+  SELECT w.project_id, COUNT(*) AS watchers
+  FROM user_watchlist w
+  WHERE w.project_id IS NOT NULL
+  GROUP BY w.project_id
+  ORDER BY watchers DESC, w.project_id
+  LIMIT max_count;
+$$ LANGUAGE sql STABLE SECURITY DEFINER SET search_path = public;
+
+GRANT EXECUTE ON FUNCTION get_watchlisted_project_ids(INTEGER) TO anon, authenticated;